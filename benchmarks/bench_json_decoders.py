@@ -0,0 +1,79 @@
+"""Wall time of reading manifest.json with every installed json decoder.
+
+``json text`` is the previous loader, ``json.load`` on a text mode file. The
+other rows read the file as bytes and decode it with ``loader.JSON_DECODERS``;
+install orjson or pysimdjson to compare them. Each decoder is timed
+``--repeat`` times and the fastest run is kept.
+
+    python -m benchmarks.bench_json_decoders --models 2000 10000 --other-nodes 5
+"""
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+
+from yoda_dbt2looker import loader
+from .synthetic import generate_manifest
+
+
+def _load_text(manifest_path):
+    with open(manifest_path, "r") as f:
+        return json.load(f)
+
+
+def measure(load, manifest_path, repeat):
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        manifest = load(manifest_path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        del manifest
+    return best
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--models", nargs="+", type=int, default=[2000, 10000])
+    argparser.add_argument("--columns", type=int, default=20)
+    argparser.add_argument("--other-nodes", type=int, default=5, help="Non model nodes per model")
+    argparser.add_argument("--compiled-sql-bytes", type=int, default=2000)
+    argparser.add_argument("--repeat", type=int, default=3)
+    args = argparser.parse_args()
+
+    loaders = {"json text": _load_text}
+    for name in loader.available_decoders():
+        loaders[name] = lambda manifest_path, name=name: loader.load_json(manifest_path, name)
+    print(f"installed decoders: {', '.join(loader.available_decoders())}, auto picks {loader.get_decoder()[0]}")
+    print(f"{'models':>7} {'MB':>7} {'decoder':>10} {'seconds':>9} {'MB/s':>8} {'speedup':>8}")
+    for models in args.models:
+        raw_manifest = generate_manifest(
+            models=models,
+            columns=args.columns,
+            exposures=max(1, models // 100),
+            other_nodes_per_model=args.other_nodes,
+            compiled_sql_bytes=args.compiled_sql_bytes,
+        )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            manifest_path = os.path.join(tmp_dir, "manifest.json")
+            with open(manifest_path, "w") as f:
+                json.dump(raw_manifest, f)
+            size_mb = os.path.getsize(manifest_path) / 1024 / 1024
+            for name, load in loaders.items():
+                assert load(manifest_path) == raw_manifest
+            del raw_manifest
+            baseline = None
+            for name, load in loaders.items():
+                elapsed = measure(load, manifest_path, args.repeat)
+                baseline = baseline or elapsed
+                print(
+                    f"{models:>7} {size_mb:>7.1f} {name:>10} {elapsed:>9.3f} "
+                    f"{size_mb / elapsed:>8.1f} {baseline / elapsed:>7.2f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
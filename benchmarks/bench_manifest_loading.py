@@ -0,0 +1,75 @@
+"""Peak memory and wall time of the full, memory mapped and streaming manifest loaders.
+
+Each loader runs in a fresh interpreter so peak RSS is not shared between
+the measurements. ``--decoder`` picks the json decoder of the full and memory
+mapped loaders, the fastest installed one by default.
+
+    python -m benchmarks.bench_manifest_loading --models 2000 --other-nodes 5
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+from yoda_dbt2looker import loader
+from .synthetic import generate_manifest
+
+
+def _measure(manifest_path, options, results):
+    start = time.perf_counter()
+    manifest = loader.load_manifest(manifest_path, **options)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results.put((elapsed, peak, len(manifest["nodes"])))
+
+
+def measure(manifest_path, options):
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_measure, args=(manifest_path, options, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--models", type=int, default=2000)
+    argparser.add_argument("--columns", type=int, default=20)
+    argparser.add_argument("--other-nodes", type=int, default=5, help="Non model nodes per model")
+    argparser.add_argument("--macros", type=int, default=2000)
+    argparser.add_argument("--compiled-sql-bytes", type=int, default=2000)
+    argparser.add_argument("--decoder", choices=loader.available_decoders(), default=loader.get_decoder()[0])
+    args = argparser.parse_args()
+
+    raw_manifest = generate_manifest(
+        models=args.models,
+        columns=args.columns,
+        exposures=max(1, args.models // 100),
+        other_nodes_per_model=args.other_nodes,
+        macros=args.macros,
+        compiled_sql_bytes=args.compiled_sql_bytes,
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manifest_path = os.path.join(tmp_dir, "manifest.json")
+        with open(manifest_path, "w") as f:
+            json.dump(raw_manifest, f)
+        del raw_manifest
+        size_mb = os.path.getsize(manifest_path) / 1024 / 1024
+        print(f"manifest: {size_mb:.1f} MB")
+        print(f"{'loader':>16} {'nodes kept':>11} {'seconds':>9} {'peak RSS MB':>12}")
+        for name, options in (
+            (f"{args.decoder} read", {"decoder": args.decoder}),
+            (f"{args.decoder} mmap", {"decoder": args.decoder, "use_mmap": True}),
+            ("streaming", {"streaming": True}),
+        ):
+            elapsed, peak_kb, nodes = measure(manifest_path, options)
+            print(f"{name:>16} {nodes:>11} {elapsed:>9.2f} {peak_kb / 1024:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
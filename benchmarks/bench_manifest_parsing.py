@@ -0,0 +1,67 @@
+"""How many times the manifest is validated into DbtManifest, and what it costs.
+
+Compares passing the raw manifest dict to every parser entry point (each one
+validates it on its own) with parsing it once and sharing the DbtManifest.
+
+    python -m benchmarks.bench_manifest_parsing --nodes 1000 5000 20000
+"""
+import argparse
+import time
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from yoda_dbt2looker import models, parser
+from .synthetic import PROJECT_NAME, generate_manifest
+
+
+@contextmanager
+def count_manifest_validations():
+    counter = {"validations": 0}
+    original_init = models.DbtManifest.__init__
+
+    def counting_init(self, **data):
+        counter["validations"] += 1
+        original_init(self, **data)
+
+    with patch.object(models.DbtManifest, "__init__", counting_init):
+        yield counter
+
+
+def per_entry_point(raw_manifest):
+    parser.parse_typed_models(raw_manifest, PROJECT_NAME, tag="bench")
+    parser.parse_exposures(raw_manifest, tag="bench")
+    parser.parse_adapter_type(raw_manifest)
+    parser.parse_manifest(raw_manifest)
+
+
+def shared(raw_manifest):
+    manifest = parser.parse_manifest(raw_manifest)
+    parser.parse_typed_models(manifest, PROJECT_NAME, tag="bench")
+    parser.parse_exposures(manifest, tag="bench")
+    parser.parse_adapter_type(manifest)
+
+
+def measure(fn, raw_manifest):
+    with count_manifest_validations() as counter:
+        start = time.perf_counter()
+        fn(raw_manifest)
+        elapsed = time.perf_counter() - start
+    return counter["validations"], elapsed
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--nodes", nargs="+", type=int, default=[500, 2000, 8000])
+    argparser.add_argument("--columns", type=int, default=20)
+    args = argparser.parse_args()
+
+    print(f"{'nodes':>8} {'mode':>16} {'validations':>12} {'seconds':>10}")
+    for nodes in args.nodes:
+        raw_manifest = generate_manifest(models=nodes, columns=args.columns, exposures=max(1, nodes // 100))
+        for name, fn in (("per_entry_point", per_entry_point), ("shared", shared)):
+            validations, elapsed = measure(fn, raw_manifest)
+            print(f"{nodes:>8} {name:>16} {validations:>12} {elapsed:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
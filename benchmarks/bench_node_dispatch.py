@@ -0,0 +1,81 @@
+"""DbtManifest parsing when models are a small share of the nodes.
+
+Compares the previous ``Union[DbtModel, DbtNode]`` declaration, which tries
+every test node as a model first, with dispatching on ``resource_type``.
+By default models are 10% of the nodes. The second set of columns parses
+the same manifest without its model nodes, which is the part the dispatch
+speeds up.
+
+    python -m benchmarks.bench_node_dispatch --models 200 1000 5000 --other-nodes 9
+"""
+import argparse
+import time
+from typing import Dict, Union
+
+from pydantic import BaseModel
+
+from yoda_dbt2looker import models
+from .synthetic import generate_manifest
+
+
+class UnionDbtManifest(BaseModel):
+    nodes: Dict[str, Union[models.DbtModel, models.DbtNode]]
+    exposures: Dict[str, Union[models.DbtExposure, models.DbtNode]]
+    metadata: models.DbtManifestMetadata
+
+
+def measure(manifest_class, raw_manifest, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        manifest = manifest_class(**raw_manifest)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return manifest, best
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--models", nargs="+", type=int, default=[200, 1000, 5000])
+    argparser.add_argument("--other-nodes", type=int, default=9, help="Non model nodes per model")
+    argparser.add_argument("--columns", type=int, default=20)
+    argparser.add_argument("--repeat", type=int, default=3)
+    args = argparser.parse_args()
+
+    print(
+        f"{'nodes':>8} {'models':>7} {'union s':>9} {'dispatch s':>11} {'speedup':>8} "
+        f"{'non-model union s':>18} {'dispatch s':>11} {'speedup':>8}"
+    )
+    for model_count in args.models:
+        raw_manifest = generate_manifest(
+            models=model_count,
+            columns=args.columns,
+            exposures=max(1, model_count // 20),
+            other_nodes_per_model=args.other_nodes,
+        )
+        union_manifest, union_elapsed = measure(UnionDbtManifest, raw_manifest, args.repeat)
+        manifest, dispatch_elapsed = measure(models.DbtManifest, raw_manifest, args.repeat)
+        assert {key: type(node) for key, node in manifest.nodes.items()} == {
+            key: type(node) for key, node in union_manifest.nodes.items()
+        }
+        assert manifest.dict() == union_manifest.dict()
+        other_nodes_manifest = dict(
+            raw_manifest,
+            nodes={
+                unique_id: node
+                for unique_id, node in raw_manifest["nodes"].items()
+                if node["resource_type"] != "model"
+            },
+        )
+        _, other_union_elapsed = measure(UnionDbtManifest, other_nodes_manifest, args.repeat)
+        _, other_dispatch_elapsed = measure(models.DbtManifest, other_nodes_manifest, args.repeat)
+        print(
+            f"{len(raw_manifest['nodes']):>8} {model_count:>7} {union_elapsed:>9.3f} "
+            f"{dispatch_elapsed:>11.3f} {union_elapsed / dispatch_elapsed:>7.1f}x "
+            f"{other_union_elapsed:>18.3f} {other_dispatch_elapsed:>11.3f} "
+            f"{other_union_elapsed / other_dispatch_elapsed:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Scaling of view and explore generation with the number of processes.
+
+    python -m benchmarks.bench_parallel_views --models 2000 --max-jobs 8
+"""
+import argparse
+import functools
+import os
+import time
+
+from yoda_dbt2looker import generator, parallel, parser
+from .synthetic import PROJECT_NAME, generate_manifest
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--models", type=int, default=1000)
+    argparser.add_argument("--columns", type=int, default=40)
+    argparser.add_argument("--max-jobs", type=int, default=os.cpu_count() or 1)
+    args = argparser.parse_args()
+
+    raw_manifest = generate_manifest(
+        models=args.models,
+        columns=args.columns,
+        exposures=max(1, args.models // 10),
+        tagged_ratio=0.0,
+    )
+    manifest = parser.parse_manifest(raw_manifest)
+    dbt_models = parser.parse_models(manifest)
+    exposures = parser.parse_exposures(manifest)
+    generate_view = functools.partial(
+        generator.lookml_view_from_dbt_model,
+        adapter_type=parser.parse_adapter_type(manifest),
+    )
+    generate_explore = functools.partial(
+        generator.lookml_model_from_index,
+        model_filenames=generator.exposure_model_filenames(manifest, PROJECT_NAME),
+        dbt_project_name=PROJECT_NAME,
+    )
+
+    reference = None
+    print(f"{'jobs':>5} {'views s':>9} {'explores s':>11} {'speedup':>8}")
+    for jobs in range(1, args.max_jobs + 1):
+        start = time.perf_counter()
+        views = parallel.map_in_pool(generate_view, dbt_models, jobs)
+        views_elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        explores = parallel.map_in_pool(generate_explore, exposures, jobs)
+        explores_elapsed = time.perf_counter() - start
+        output = [f.contents for f in views + explores]
+        if reference is None:
+            reference = (output, views_elapsed + explores_elapsed)
+        assert output == reference[0], "parallel output differs from the serial output"
+        speedup = reference[1] / (views_elapsed + explores_elapsed)
+        print(f"{jobs:>5} {views_elapsed:>9.2f} {explores_elapsed:>11.2f} {speedup:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
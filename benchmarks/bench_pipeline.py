@@ -0,0 +1,236 @@
+"""Stage by stage timings of the dbt2looker pipeline on synthetic manifests.
+
+Every scenario (one per adapter and model count) runs in a fresh interpreter
+so the peak RSS of one scenario does not leak into the next. Stages are
+timed ``--repeat`` times and the fastest run is kept.
+
+    python -m benchmarks.bench_pipeline --models 100 1000 --adapters spark bigquery --output results.json
+    python -m benchmarks.bench_pipeline --models 100 1000 --adapters spark bigquery --compare results.json
+"""
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from importlib.metadata import PackageNotFoundError, version
+
+import lkml
+
+from yoda_dbt2looker import generator, loader, parser, writer
+from .synthetic import COLUMN_TYPES, PROJECT_NAME, generate_manifest, write_project
+
+RESULTS_VERSION = 1
+STAGES = ("load", "validate", "parse", "exposures", "views", "dump", "explores", "write")
+# Stages faster than this are too noisy to flag as regressions
+NOISE_FLOOR_SECONDS = 0.05
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes everywhere else
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def run_pipeline(manifest_path, output_dir):
+    """Run every stage once, returns ``{stage: (seconds, items, peak RSS MB)}``."""
+    timings = {}
+
+    def stage(name, fn):
+        start = time.perf_counter()
+        result, items = fn()
+        timings[name] = (time.perf_counter() - start, items, _peak_rss_mb())
+        return result
+
+    raw_manifest = stage("load", lambda: _counted(loader.load_manifest(manifest_path), "nodes"))
+    stage("validate", lambda: (parser.validate_manifest(raw_manifest, parser.manifest_schema()), len(raw_manifest["nodes"])))
+    manifest = stage("parse", lambda: (parser.parse_manifest(raw_manifest), len(raw_manifest["nodes"])))
+    adapter_type = parser.parse_adapter_type(manifest)
+
+    def resolve_exposures():
+        typed_models = parser.parse_typed_models(manifest, PROJECT_NAME)
+        exposures = list(parser.parse_exposures(manifest))
+        model_filenames = generator.exposure_model_filenames(manifest, PROJECT_NAME)
+        explore_exposures, _ = generator.split_by_exposure(exposures, model_filenames)
+        return (typed_models, explore_exposures, model_filenames), len(typed_models) + len(exposures)
+
+    typed_models, explore_exposures, model_filenames = stage("exposures", resolve_exposures)
+    view_data = stage("views", lambda: _counted([
+        generator.lookml_view_data_from_dbt_model(model, adapter_type) for model in typed_models
+    ]))
+    contents = stage("dump", lambda: _counted([lkml.dump(lookml) for lookml in view_data]))
+    explores = stage("explores", lambda: _counted([
+        generator.lookml_model_from_index(exposure, model_filenames, PROJECT_NAME)
+        for exposure in explore_exposures
+    ]))
+    lookml_files = {
+        f"views/{model.name}.view.lkml": view_contents
+        for model, view_contents in zip(typed_models, contents)
+    }
+    lookml_files.update((explore.filename, explore.contents) for explore in explores)
+    stage("write", lambda: _counted(writer.write_to_directory(lookml_files, output_dir).written))
+    return timings
+
+
+def _counted(result, key=None):
+    return result, len(result[key] if key else result)
+
+
+def _run_scenario(manifest_path, output_dir, repeat, results):
+    best = {}
+    for run in range(repeat):
+        timings = run_pipeline(manifest_path, os.path.join(output_dir, f"run_{run}"))
+        for name, (seconds, items, peak_rss_mb) in timings.items():
+            previous = best.get(name)
+            best[name] = (
+                min(seconds, previous[0]) if previous else seconds,
+                items,
+                max(peak_rss_mb, previous[2]) if previous else peak_rss_mb,
+            )
+    results.put(best)
+
+
+def run_scenario(params, repeat):
+    raw_manifest = generate_manifest(
+        models=params["models"],
+        columns=params["columns"],
+        adapter_type=params["adapter"],
+        exposures=params["exposures"],
+        joins=params["joins"],
+        measures=params["measures"],
+        other_nodes_per_model=params["other_nodes"],
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manifest_path = write_project(tmp_dir, raw_manifest)
+        del raw_manifest
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        process = context.Process(
+            target=_run_scenario,
+            args=(manifest_path, os.path.join(tmp_dir, "lookml"), repeat, results),
+        )
+        process.start()
+        best = results.get()
+        process.join()
+        manifest_bytes = os.path.getsize(manifest_path)
+    stages = {
+        name: {
+            "seconds": round(seconds, 6),
+            "items": items,
+            "items_per_second": round(items / seconds, 1) if seconds else None,
+            "peak_rss_mb": round(peak_rss_mb, 1),
+        }
+        for name, (seconds, items, peak_rss_mb) in ((name, best[name]) for name in STAGES)
+    }
+    return {
+        "name": f"{params['adapter']}-{params['models']}m-{params['columns']}c-{params['exposures']}e",
+        "params": params,
+        "manifest_bytes": manifest_bytes,
+        "total_seconds": round(sum(stage["seconds"] for stage in stages.values()), 6),
+        "peak_rss_mb": max(stage["peak_rss_mb"] for stage in stages.values()),
+        "stages": stages,
+    }
+
+
+def print_scenario(scenario):
+    print(f"{scenario['name']} ({scenario['manifest_bytes'] / 1024 / 1024:.1f} MB manifest)")
+    print(f"{'stage':>10} {'seconds':>9} {'items':>8} {'items/s':>10} {'peak RSS MB':>12}")
+    for name, stage in scenario["stages"].items():
+        print(
+            f"{name:>10} {stage['seconds']:>9.3f} {stage['items']:>8} "
+            f"{stage['items_per_second'] or 0:>10.0f} {stage['peak_rss_mb']:>12.1f}"
+        )
+    print(f"{'total':>10} {scenario['total_seconds']:>9.3f}")
+
+
+def compare(results, baseline, max_slowdown):
+    """Print the time ratio to the baseline of every stage, returns the regressions."""
+    baseline_scenarios = {scenario["name"]: scenario for scenario in baseline["scenarios"]}
+    regressions = []
+    print(f"{'scenario':>30} {'stage':>10} {'baseline s':>11} {'current s':>10} {'ratio':>6}")
+    for scenario in results["scenarios"]:
+        baseline_scenario = baseline_scenarios.get(scenario["name"])
+        if baseline_scenario is None:
+            print(f"{scenario['name']:>30} not in baseline")
+            continue
+        for name, stage in scenario["stages"].items():
+            baseline_seconds = baseline_scenario["stages"].get(name, {}).get("seconds")
+            if not baseline_seconds:
+                continue
+            ratio = stage["seconds"] / baseline_seconds
+            regressed = ratio > 1 + max_slowdown and stage["seconds"] > NOISE_FLOOR_SECONDS
+            print(
+                f"{scenario['name']:>30} {name:>10} {baseline_seconds:>11.3f} "
+                f"{stage['seconds']:>10.3f} {ratio:>6.2f}{' REGRESSION' if regressed else ''}"
+            )
+            if regressed:
+                regressions.append((scenario["name"], name, ratio))
+    return regressions
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--models", nargs="+", type=int, default=[100, 1000])
+    argparser.add_argument("--adapters", nargs="+", choices=sorted(COLUMN_TYPES), default=["spark"])
+    argparser.add_argument("--columns", type=int, default=20)
+    argparser.add_argument("--exposures", type=int, default=None, help="Default is one per 20 models")
+    argparser.add_argument("--joins", type=int, default=2)
+    argparser.add_argument("--measures", type=int, default=5)
+    argparser.add_argument("--other-nodes", type=int, default=2, help="Non model nodes per model")
+    argparser.add_argument("--repeat", type=int, default=3)
+    argparser.add_argument("--output", help="Write the results as json to this file")
+    argparser.add_argument("--compare", help="Results json of a previous run to compare against")
+    argparser.add_argument(
+        "--max-slowdown", type=float, default=0.2,
+        help="Exit with an error when a stage is this much slower than in --compare. Default is 0.2 (20%%)",
+    )
+    args = argparser.parse_args()
+
+    try:
+        package_version = version("yoda-dbt2looker")
+    except PackageNotFoundError:
+        package_version = "unknown"
+    results = {
+        "version": RESULTS_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "dbt2looker": package_version,
+        "json_decoder": loader.get_decoder()[0],
+        "schema": parser.manifest_schema(),
+        "repeat": args.repeat,
+        "scenarios": [],
+    }
+    for adapter in args.adapters:
+        for models in args.models:
+            params = {
+                "adapter": adapter,
+                "models": models,
+                "columns": args.columns,
+                "exposures": args.exposures if args.exposures is not None else max(1, models // 20),
+                "joins": args.joins,
+                "measures": args.measures,
+                "other_nodes": args.other_nodes,
+            }
+            scenario = run_scenario(params, args.repeat)
+            print_scenario(scenario)
+            results["scenarios"].append(scenario)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.max_slowdown):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Wall time of validating manifests against the full and the slim schema.
+
+``full`` is ``parser.MANIFEST_SCHEMA``, which checks every section and node of
+the manifest. ``slim`` is ``parser.SLIM_MANIFEST_SCHEMA``, which only checks
+the metadata, model nodes and exposures dbt2looker reads. Both are timed with
+every number of ``--jobs``, more than one validates the node and exposure
+entries in a process pool. Each run is repeated ``--repeat`` times and the
+fastest one is kept.
+
+    python -m benchmarks.bench_validation --models 1000 5000 --other-nodes 5 --macros 2000 --jobs 1 4 16
+"""
+import argparse
+import gc
+import time
+
+from yoda_dbt2looker import parser
+from .synthetic import generate_manifest
+
+SCHEMAS = {"full": parser.MANIFEST_SCHEMA, "slim": parser.SLIM_MANIFEST_SCHEMA}
+
+
+def measure(raw_manifest, schema_name, jobs, repeat):
+    # Compile the validator outside of the timed runs, it is cached per process
+    parser.get_manifest_validator(schema_name)
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        parser.validate_manifest(raw_manifest, schema_name, jobs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--models", nargs="+", type=int, default=[1000, 5000])
+    argparser.add_argument("--columns", type=int, default=20)
+    argparser.add_argument("--other-nodes", type=int, default=5, help="Non model nodes per model")
+    argparser.add_argument("--macros", type=int, default=2000)
+    argparser.add_argument("--jobs", nargs="+", type=int, default=[1])
+    argparser.add_argument("--repeat", type=int, default=3)
+    args = argparser.parse_args()
+
+    print(f"{'models':>7} {'nodes':>7} {'schema':>6} {'jobs':>5} {'seconds':>9} {'speedup':>8}")
+    for models in args.models:
+        raw_manifest = generate_manifest(
+            models=models,
+            columns=args.columns,
+            exposures=max(1, models // 100),
+            other_nodes_per_model=args.other_nodes,
+            macros=args.macros,
+        )
+        baseline = None
+        for name, schema_name in SCHEMAS.items():
+            for jobs in args.jobs:
+                elapsed = measure(raw_manifest, schema_name, jobs, args.repeat)
+                baseline = baseline or elapsed
+                print(
+                    f"{models:>7} {len(raw_manifest['nodes']):>7} {name:>6} {jobs:>5} "
+                    f"{elapsed:>9.3f} {baseline / elapsed:>7.2f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
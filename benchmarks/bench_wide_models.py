@@ -0,0 +1,70 @@
+"""Time and memory of validating wide models with and without column copies.
+
+``copy`` runs the previous ``case_insensitive_column_names`` validator on top
+of the current one: every validated ``DbtModelColumn`` is copied with its name
+lowercased. ``in place`` is the current validator, which only copies the raw
+column dicts whose name is not lowercase (``--uppercase`` sets their share).
+
+    python -m benchmarks.bench_wide_models --models 50 --columns 200 1000 5000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Dict
+
+from pydantic import validator
+
+from yoda_dbt2looker import models
+from .synthetic import generate_manifest
+
+
+class CopyingDbtModel(models.DbtModel):
+    @validator("columns")
+    def copy_column_names(cls, v: Dict[str, models.DbtModelColumn]):
+        return {
+            name.lower(): column.copy(update={"name": column.name.lower()})
+            for name, column in v.items()
+        }
+
+
+def measure(model_class, raw_models):
+    # Timed without tracing, tracemalloc slows allocations down several times
+    gc.collect()
+    start = time.perf_counter()
+    parsed = [model_class(**raw_model) for raw_model in raw_models]
+    elapsed = time.perf_counter() - start
+    del parsed
+    gc.collect()
+    tracemalloc.start()
+    parsed = [model_class(**raw_model) for raw_model in raw_models]
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, current, peak
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--models", type=int, default=50)
+    argparser.add_argument("--columns", nargs="+", type=int, default=[200, 1000, 5000])
+    argparser.add_argument("--uppercase", type=float, default=0.0, help="Share of columns with an uppercase name")
+    args = argparser.parse_args()
+
+    print(f"{'columns':>8} {'mode':>9} {'seconds':>9} {'kept MB':>8} {'peak MB':>8}")
+    for columns in args.columns:
+        raw_manifest = generate_manifest(models=args.models, columns=columns)
+        raw_models = [node for node in raw_manifest["nodes"].values() if node["resource_type"] == "model"]
+        for raw_model in raw_models:
+            uppercase = int(columns * args.uppercase)
+            for column in list(raw_model["columns"].values())[:uppercase]:
+                column["name"] = column["name"].upper()
+        for name, model_class in (("copy", CopyingDbtModel), ("in place", models.DbtModel)):
+            elapsed, current, peak = measure(model_class, raw_models)
+            print(
+                f"{columns:>8} {name:>9} {elapsed:>9.3f} "
+                f"{current / 1024 / 1024:>8.1f} {peak / 1024 / 1024:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Writing thousands of LookML files: plain serial writes vs the writer module.
+
+    python -m benchmarks.bench_writer --files 5000 --threads 1 8 16
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from yoda_dbt2looker import writer
+
+
+def serial_write(files):
+    for file_path, contents in files:
+        with open(file_path, "w") as f:
+            f.write(contents)
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--files", type=int, default=5000)
+    argparser.add_argument("--size", type=int, default=4000, help="Bytes per file")
+    argparser.add_argument("--threads", nargs="+", type=int, default=[1, 4, 8, 16])
+    argparser.add_argument("--dir", default=None, help="Directory to write in, e.g. on a network filesystem")
+    args = argparser.parse_args()
+
+    base_dir = tempfile.mkdtemp(dir=args.dir)
+    try:
+        def files_in(name):
+            directory = os.path.join(base_dir, name)
+            os.makedirs(directory)
+            return [
+                (os.path.join(directory, f"view_{i:06d}.view.lkml"), f"view: view_{i} {{\n" + "#" * args.size + "\n}\n")
+                for i in range(args.files)
+            ]
+
+        print(f"{'mode':>22} {'seconds':>9} {'files/s':>10}")
+
+        def report(name, elapsed):
+            print(f"{name:>22} {elapsed:>9.3f} {args.files / elapsed:>10.0f}")
+
+        files = files_in("serial")
+        start = time.perf_counter()
+        serial_write(files)
+        report("serial open/write", time.perf_counter() - start)
+
+        for threads in args.threads:
+            files = files_in(f"threads_{threads}")
+            start = time.perf_counter()
+            writer.write_files(files, threads=threads)
+            report(f"atomic, {threads} threads", time.perf_counter() - start)
+            start = time.perf_counter()
+            writer.write_files(files, threads=threads)
+            report(f"unchanged, {threads} thr", time.perf_counter() - start)
+    finally:
+        shutil.rmtree(base_dir)
+
+
+if __name__ == "__main__":
+    main()
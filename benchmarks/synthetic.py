@@ -0,0 +1,276 @@
+"""Synthetic dbt manifest generator used by the benchmarks.
+
+The generated manifests are shaped like the output of ``dbt docs generate``:
+model nodes carry typed columns, tags and meta, the remaining nodes are tests
+and seeds, and exposures reference models through ``ref('...')``.
+
+Write a manifest and a matching dbt_project.yml to run dbt2looker on:
+
+    python -m benchmarks.synthetic --models 2000 --exposures 50 --output-dir /tmp/bench
+    dbt2looker --target-dir /tmp/bench/target --project-dir /tmp/bench
+"""
+import argparse
+import json
+import os
+import random
+from typing import Any, Dict
+
+PROJECT_NAME = "bench"
+
+COLUMN_TYPES = {
+    "spark": ["string", "bigint", "int", "double", "decimal(38,2)", "boolean", "timestamp", "date"],
+    "databricks": ["string", "bigint", "int", "double", "decimal(38,2)", "boolean", "timestamp", "date"],
+    "bigquery": ["STRING", "INT64", "FLOAT64", "NUMERIC", "BOOL", "TIMESTAMP", "DATETIME", "DATE"],
+    "snowflake": ["VARCHAR", "NUMBER", "FLOAT", "BOOLEAN", "TIMESTAMP_NTZ", "DATE", "VARIANT"],
+    "redshift": ["VARCHAR", "INTEGER", "BIGINT", "DOUBLE PRECISION", "BOOLEAN", "TIMESTAMP", "DATE"],
+    "postgres": ["TEXT", "INTEGER", "BIGINT", "NUMERIC", "BOOLEAN", "TIMESTAMP", "DATE"],
+}
+
+
+def model_name(index: int) -> str:
+    return f"model_{index:06d}"
+
+
+def _column(name: str, data_type: str, with_measure: bool) -> Dict[str, Any]:
+    meta = {}
+    if with_measure:
+        meta["measures"] = {f"sum_{name}": {"type": "sum"}}
+    return {
+        "name": name,
+        "description": f"Column {name}",
+        "meta": meta,
+        "data_type": data_type,
+        "constraints": [],
+        "quote": None,
+        "tags": [],
+    }
+
+
+def _common_node(unique_id: str, name: str, resource_type: str) -> Dict[str, Any]:
+    return {
+        "database": "hive_metastore",
+        "schema": "analytics",
+        "name": name,
+        "resource_type": resource_type,
+        "package_name": PROJECT_NAME,
+        "path": f"{name}.sql",
+        "original_file_path": f"models/{name}.sql",
+        "unique_id": unique_id,
+        "fqn": [PROJECT_NAME, name],
+        "alias": name,
+        "checksum": {"name": "sha256", "checksum": "0" * 64},
+    }
+
+
+def _model_node(index: int, columns: int, adapter_type: str, tag: str, rng: random.Random) -> Dict[str, Any]:
+    name = model_name(index)
+    unique_id = f"model.{PROJECT_NAME}.{name}"
+    types = COLUMN_TYPES[adapter_type]
+    node = _common_node(unique_id, name, "model")
+    node.update({
+        "relation_name": f"analytics.{name}",
+        "description": f"Synthetic model {name}",
+        "columns": {
+            f"col_{c}": _column(f"col_{c}", rng.choice(types), c % 10 == 1)
+            for c in range(columns)
+        },
+        "tags": [tag],
+        "config": {"tags": [tag], "meta": {}},
+        "meta": {},
+        "depends_on": {
+            "macros": [],
+            "nodes": [f"model.{PROJECT_NAME}.{model_name(index - 1)}"] if index else [],
+        },
+        "raw_code": f"select * from {{{{ ref('{model_name(index - 1)}') }}}}" if index else "select 1",
+    })
+    return node
+
+
+def _macro(index: int, macro_sql_bytes: int) -> Dict[str, Any]:
+    name = f"macro_{index:06d}"
+    return {
+        "name": name,
+        "resource_type": "macro",
+        "package_name": PROJECT_NAME,
+        "path": f"macros/{name}.sql",
+        "original_file_path": f"macros/{name}.sql",
+        "unique_id": f"macro.{PROJECT_NAME}.{name}",
+        "macro_sql": "-" * macro_sql_bytes,
+    }
+
+
+def _test_node(index: int, model_index: int) -> Dict[str, Any]:
+    name = f"not_null_{model_name(model_index)}_col_{index}"
+    unique_id = f"test.{PROJECT_NAME}.{name}"
+    node = _common_node(unique_id, name, "test")
+    node.update({
+        "description": "",
+        "columns": {},
+        "tags": [],
+        "meta": {},
+        "depends_on": {"macros": [], "nodes": [f"model.{PROJECT_NAME}.{model_name(model_index)}"]},
+    })
+    return node
+
+
+def _exposure(index: int, models: int, joins: int, measures: int, rng: random.Random) -> Dict[str, Any]:
+    name = f"exposure_{index:05d}"
+    main_model = model_name(rng.randrange(models))
+    joined = [model_name(rng.randrange(models)) for _ in range(joins)]
+    return {
+        "name": name,
+        "resource_type": "exposure",
+        "package_name": PROJECT_NAME,
+        "path": f"exposures/{name}.yml",
+        "original_file_path": f"models/exposures/{name}.yml",
+        "unique_id": f"exposure.{PROJECT_NAME}.{name}",
+        "fqn": [PROJECT_NAME, name],
+        "type": "dashboard",
+        "owner": {"email": "bench@example.com", "name": "bench"},
+        "description": f"Synthetic exposure {name}",
+        "tags": ["bench"],
+        "depends_on": {
+            "macros": [],
+            "nodes": [f"model.{PROJECT_NAME}.{m}" for m in [main_model] + joined],
+        },
+        "meta": {
+            "looker": {
+                "main_model": f"ref('{main_model}')",
+                "connection": "bench_connection",
+                "joins": [
+                    {
+                        "join": f"ref('{joined_model}')",
+                        "sql_on": f"${{ref('{main_model}').col_0}} = ${{ref('{joined_model}').col_0}}",
+                    }
+                    for joined_model in joined
+                ],
+                "measures": [
+                    {
+                        "name": f"{name}_measure_{m}",
+                        "model": f"ref('{main_model}')",
+                        "type": "number",
+                        "sql": f"SUM(${{ref('{main_model}').col_1}}) / COUNT(${{ref('{main_model}').col_0}})",
+                    }
+                    for m in range(measures)
+                ],
+            }
+        },
+    }
+
+
+def generate_manifest(
+    models: int = 100,
+    columns: int = 20,
+    adapter_type: str = "spark",
+    exposures: int = 0,
+    joins: int = 1,
+    measures: int = 2,
+    other_nodes_per_model: int = 0,
+    tagged_ratio: float = 1.0,
+    compiled_sql_bytes: int = 0,
+    macros: int = 0,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Return a raw manifest dict with the given shape.
+
+    ``other_nodes_per_model`` adds test nodes for every model so that models
+    are only a fraction of ``nodes``, ``tagged_ratio`` controls the share of
+    models tagged ``bench`` (the rest are tagged ``other``).
+    ``compiled_sql_bytes`` and ``macros`` pad the manifest with the kind of
+    payload dbt2looker never reads.
+    """
+    rng = random.Random(seed)
+    nodes = {}
+    tagged = int(models * tagged_ratio)
+    for index in range(models):
+        node = _model_node(index, columns, adapter_type, "bench" if index < tagged else "other", rng)
+        if compiled_sql_bytes:
+            node["compiled_code"] = "-" * compiled_sql_bytes
+        nodes[node["unique_id"]] = node
+        for other in range(other_nodes_per_model):
+            test = _test_node(other, index)
+            if compiled_sql_bytes:
+                test["compiled_code"] = "-" * compiled_sql_bytes
+            nodes[test["unique_id"]] = test
+    all_exposures = {}
+    for index in range(exposures):
+        exposure = _exposure(index, models, joins, measures, rng)
+        all_exposures[exposure["unique_id"]] = exposure
+    child_map = {unique_id: [] for unique_id in nodes}
+    parent_map = {unique_id: list(node.get("depends_on", {}).get("nodes", [])) for unique_id, node in nodes.items()}
+    for unique_id, parents in parent_map.items():
+        for parent in parents:
+            child_map[parent].append(unique_id)
+    return {
+        "metadata": {
+            "dbt_schema_version": "https://schemas.getdbt.com/dbt/manifest/v12.json",
+            "dbt_version": "1.8.0",
+            "adapter_type": adapter_type,
+        },
+        "nodes": nodes,
+        "sources": {},
+        "macros": {
+            macro["unique_id"]: macro
+            for macro in (_macro(index, compiled_sql_bytes) for index in range(macros))
+        },
+        "docs": {},
+        "exposures": all_exposures,
+        "metrics": {},
+        "groups": {},
+        "selectors": {},
+        "disabled": {},
+        "parent_map": parent_map,
+        "child_map": child_map,
+        "group_map": {},
+        "saved_queries": {},
+        "semantic_models": {},
+        "unit_tests": {},
+    }
+
+
+def write_project(output_dir: str, raw_manifest: Dict[str, Any]) -> str:
+    """Write ``target/manifest.json`` and ``dbt_project.yml`` under ``output_dir``.
+
+    Returns the path of the manifest.
+    """
+    target_dir = os.path.join(output_dir, "target")
+    os.makedirs(target_dir, exist_ok=True)
+    manifest_path = os.path.join(target_dir, "manifest.json")
+    with open(manifest_path, "w") as f:
+        json.dump(raw_manifest, f)
+    with open(os.path.join(output_dir, "dbt_project.yml"), "w") as f:
+        f.write(f"name: {PROJECT_NAME}\n")
+    return manifest_path
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--output-dir", required=True)
+    argparser.add_argument("--models", type=int, default=100)
+    argparser.add_argument("--columns", type=int, default=20)
+    argparser.add_argument("--adapter", choices=sorted(COLUMN_TYPES), default="spark")
+    argparser.add_argument("--exposures", type=int, default=0)
+    argparser.add_argument("--joins", type=int, default=1)
+    argparser.add_argument("--measures", type=int, default=2)
+    argparser.add_argument("--other-nodes", type=int, default=0, help="Non model nodes per model")
+    argparser.add_argument("--seed", type=int, default=0)
+    args = argparser.parse_args()
+
+    manifest_path = write_project(
+        args.output_dir,
+        generate_manifest(
+            models=args.models,
+            columns=args.columns,
+            adapter_type=args.adapter,
+            exposures=args.exposures,
+            joins=args.joins,
+            measures=args.measures,
+            other_nodes_per_model=args.other_nodes,
+            seed=args.seed,
+        ),
+    )
+    print(f"Wrote {manifest_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,7 @@ class TestGenerator:
     @patch('yoda_dbt2looker.core.generator.lookml_view_from_dbt_model')
     def test_generate_lookml_views(self, mock_lookml_view_from_dbt_model, mock_write_list_of_lookml_views):
         mock_dbt_model = MagicMock(spec=DbtModel)
-        mock_lookml_view = MagicMock(spec=LookViewFile)
+        mock_lookml_view = LookViewFile(filename="a.view.lkml", contents="view: a {}")
         mock_lookml_view_from_dbt_model.return_value = mock_lookml_view
 
         generator.generate_lookml_views([mock_dbt_model], "snowflake", "output/dir")
@@ -19,6 +19,25 @@ class TestGenerator:
         mock_lookml_view_from_dbt_model.assert_called_once_with(mock_dbt_model, SupportedDbtAdapters.snowflake)
         mock_write_list_of_lookml_views.assert_called_once_with([mock_lookml_view], "output/dir")
 
+    @patch('yoda_dbt2looker.core.generator.write_list_of_lookml_views')
+    @patch('yoda_dbt2looker.core.generator.lookml_view_from_dbt_model')
+    def test_generate_lookml_views_in_memory(self, mock_lookml_view_from_dbt_model, mock_write_list_of_lookml_views):
+        mock_lookml_view_from_dbt_model.return_value = LookViewFile(filename="a.view.lkml", contents="view: a {}")
+
+        files = generator.generate_lookml_views([MagicMock(spec=DbtModel)], "snowflake", "output/dir", in_memory=True)
+
+        assert files == {"a.view.lkml": "view: a {}"}
+        mock_write_list_of_lookml_views.assert_not_called()
+
+    @patch('yoda_dbt2looker.core.generator.write_archive')
+    @patch('yoda_dbt2looker.core.generator.lookml_view_from_dbt_model')
+    def test_generate_lookml_views_to_archive(self, mock_lookml_view_from_dbt_model, mock_write_archive):
+        mock_lookml_view_from_dbt_model.return_value = LookViewFile(filename="a.view.lkml", contents="view: a {}")
+
+        generator.generate_lookml_views([MagicMock(spec=DbtModel)], "snowflake", "output/dir", output_archive="lookml.zip")
+
+        mock_write_archive.assert_called_once_with({"a.view.lkml": "view: a {}"}, "lookml.zip")
+
     @patch('yoda_dbt2looker.core.generator.lkml.dump')
     def test_lookml_view_from_dbt_model_without_migrated_from_model(self, mock_lkml_dump):
         mock_dbt_model = MagicMock(spec=DbtModel)
@@ -36,6 +55,7 @@ class TestGenerator:
         assert isinstance(result, LookViewFile)
         assert result.filename == "test_model.view.lkml"
         assert result.contents == "lookml_content"
+        assert result.unsupported_column_types == {}
         mock_lkml_dump.assert_called_once_with({'view': {'name': 'test_model', 'sql_table_name': 'test_model', 'dimension_groups': [], 'dimensions': [], 'measures': []}})
     
     @patch('yoda_dbt2looker.core.generator.lkml.dump')
@@ -108,7 +128,7 @@ class TestGenerator:
 
     @patch('yoda_dbt2looker.core.generator.lookml_date_time_dimension_group')
     @patch('yoda_dbt2looker.core.generator.lookml_date_dimension_group')
-    @patch('yoda_dbt2looker.core.generator.map_adapter_type_to_looker')
+    @patch('yoda_dbt2looker.generator.map_adapter_type_to_looker')
     def test_lookml_dimension_groups_from_model(self, mock_map_adapter_type_to_looker, mock_lookml_date_dimension_group,
                                                 mock_lookml_date_time_dimension_group):
         mock_dbt_model = MagicMock(spec=DbtModel)
@@ -121,14 +141,10 @@ class TestGenerator:
         mock_dbt_model.columns = {"col1": mock_column_1, "col2": mock_column_2}
 
         mock_map_adapter_type_to_looker.side_effect = [
-            "timestamp",
             "timestamp",
             "datetime",
-            "datetime",
-            "timestamp",
             "timestamp",
             "datetime",
-            "datetime",
         ]
         mock_lookml_date_time_dimension_group.return_value = "datetime_group"
 
@@ -136,7 +152,8 @@ class TestGenerator:
 
         assert result == ["datetime_group", "datetime_group"]
         mock_lookml_date_time_dimension_group.assert_has_calls(
-            [call(mock_column_1, SupportedDbtAdapters.spark), call(mock_column_2, SupportedDbtAdapters.spark)])
+            [call(mock_column_1, SupportedDbtAdapters.spark, "timestamp"),
+             call(mock_column_2, SupportedDbtAdapters.spark, "datetime")])
 
         result = generator.lookml_dimension_groups_from_model(
             mock_dbt_model, SupportedDbtAdapters.databricks.value
@@ -145,12 +162,12 @@ class TestGenerator:
         assert result == ["datetime_group", "datetime_group"]
         mock_lookml_date_time_dimension_group.assert_has_calls(
             [
-                call(mock_column_1, SupportedDbtAdapters.databricks),
-                call(mock_column_2, SupportedDbtAdapters.databricks),
+                call(mock_column_1, SupportedDbtAdapters.databricks, "timestamp"),
+                call(mock_column_2, SupportedDbtAdapters.databricks, "datetime"),
             ]
         )
 
-    @patch('yoda_dbt2looker.core.generator.map_adapter_type_to_looker')
+    @patch('yoda_dbt2looker.generator.map_adapter_type_to_looker')
     def test_lookml_dimensions_from_model(self, mock_map_adapter_type_to_looker):
         mock_dbt_model = MagicMock(spec=DbtModel)
         mock_column = MagicMock()
@@ -177,8 +194,7 @@ class TestGenerator:
             'description': "test column"
         }
         assert result == [expected_dimension]
-        mock_map_adapter_type_to_looker.assert_has_calls([call(SupportedDbtAdapters.spark, "integer")
-                                                             , call(SupportedDbtAdapters.spark, "integer")])
+        mock_map_adapter_type_to_looker.assert_has_calls([call(SupportedDbtAdapters.spark, "integer")])
         result = generator.lookml_dimensions_from_model(
             mock_dbt_model, SupportedDbtAdapters.databricks
         )
@@ -191,8 +207,6 @@ class TestGenerator:
         }
         assert result == [expected_dimension]
         mock_map_adapter_type_to_looker.assert_has_calls(
-            [
-                call(SupportedDbtAdapters.databricks, "integer"),
-                call(SupportedDbtAdapters.databricks, "integer"),
-            ]
+            [call(SupportedDbtAdapters.databricks, "integer")]
         )
+        assert mock_map_adapter_type_to_looker.call_count == 2
@@ -129,3 +129,26 @@ class TestParser:
         raw_manifest["nodes"]["model.playground.example_domain_stg__daily_model_a"].pop("name")
         with pytest.raises(SystemExit):
             parser.parse_models(raw_manifest)
+
+    def test_parse_adapter_type_accepts_parsed_manifest(self):
+        manifest = parser.parse_manifest({"metadata": {"adapter_type": "spark"}, "nodes": {}})
+        assert parser.parse_adapter_type(manifest) == "spark"
+        assert parser.parse_adapter_type({"metadata": {"adapter_type": "spark"}, "nodes": {}}) == "spark"
+
+
+class TestSelectRawManifest:
+
+    def test_select_raw_manifest_uses_config_tags(self):
+        raw_manifest = {
+            "metadata": {"adapter_type": "spark"},
+            "nodes": {
+                "model.p.a": {"resource_type": "model", "name": "a", "tags": [], "config": {"tags": ["tag1"]}},
+                "model.p.b": {"resource_type": "model", "name": "b", "tags": ["tag1"], "config": {"tags": []}},
+                "model.p.c": {"resource_type": "model", "name": "c", "tags": []},
+                "seed.p.d": {"resource_type": "seed", "name": "d", "config": {"tags": ["tag1"]}},
+            },
+        }
+        selected = parser.select_raw_manifest(raw_manifest, tag="tag1")
+        # c has no config tags to decide on and is left to the typed parse
+        assert sorted(selected["nodes"]) == ["model.p.a", "model.p.c"]
+        assert parser.select_raw_manifest(raw_manifest) is raw_manifest
@@ -5,6 +5,7 @@ import yaml
 from pathlib import Path
 from unittest.mock import mock_open, patch
 from yoda_dbt2looker.core.config import config
+from yoda_dbt2looker import parser
 from yoda_dbt2looker.core import utils
 
 
@@ -44,18 +45,11 @@ class TestUtils:
             datefmt='%H:%M:%S',
         )
 
-    @patch('builtins.open', new_callable=mock_open)
-    def test_write_lookml_file(self, mock_file):
-        file_path = 'test_file.lkml'
-        contents = 'test contents'
-        utils.write_lookml_file(file_path, contents)
-        mock_file.assert_called_once_with(file_path, 'w')
-        mock_file().write.assert_called_once_with(contents)
-
-    @patch("yoda_dbt2looker.core.utils.open", new_callable=mock_open, read_data=json.dumps({"key": "value"}))
+    @patch("yoda_dbt2looker.loader.open", new_callable=mock_open, read_data=json.dumps({"key": "value"}).encode())
     def test_load_json_file(self, mock_file):
         result = utils.load_json_file(Path("dummy_path.json"))
         assert result == {"key": "value"}
+        mock_file.assert_called_once_with(Path("dummy_path.json"), "rb")
 
     @patch("yoda_dbt2looker.core.utils.open", new_callable=mock_open, read_data=yaml.dump({"key": "value"}))
     def test_load_yaml_file(self, mock_file):
@@ -94,3 +88,27 @@ class TestUtils:
     def test_get_dbt_project_config_file_not_found(self, mock_load_yaml_file):
         with pytest.raises(SystemExit):
             utils.get_dbt_project_config("dummy_prefix")
+
+    @patch("yoda_dbt2looker.core.utils.load_streamed_manifest")
+    @patch("yoda_dbt2looker.core.utils.load_json_file")
+    @patch("yoda_dbt2looker.parser.validate_manifest")
+    def test_get_manifest_streaming(self, mock_validate_manifest, mock_load_json_file, mock_load_streamed_manifest,
+                                    mock_manifest):
+        mock_load_streamed_manifest.return_value = mock_manifest
+        result = utils.get_manifest("dummy_prefix", streaming=True)
+        assert result == mock_manifest
+        mock_load_json_file.assert_not_called()
+        mock_validate_manifest.assert_called_once_with(mock_manifest, parser.SLIM_MANIFEST_SCHEMA, 1)
+
+    @patch("yoda_dbt2looker.parser.validate_manifest")
+    def test_get_manifest_validation_cache(self, mock_validate_manifest, mock_manifest, tmp_path):
+        (tmp_path / config.MANIFEST_FILENAME).write_text(json.dumps(mock_manifest))
+        cache_dir = str(tmp_path / "cache")
+        for _ in range(2):
+            assert utils.get_manifest(str(tmp_path), validation_cache_dir=cache_dir) == mock_manifest
+        utils.get_manifest(str(tmp_path))
+        assert mock_validate_manifest.call_count == 2
+
+    def test_load_streamed_manifest_not_found(self):
+        with pytest.raises(SystemExit):
+            utils.load_streamed_manifest(Path("dummy_path.json"))
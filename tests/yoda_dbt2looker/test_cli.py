@@ -16,6 +16,47 @@ def test__run_convert():
     assert_folders_equal("tests/resources/expected_lookml", "lookml")
 
 
+def _model(name, tag):
+    return {
+        "unique_id": f"model.project.{name}",
+        "resource_type": "model",
+        "relation_name": f"schema.{name}",
+        "schema": "schema",
+        "name": name,
+        "description": "",
+        "columns": {"id": {"name": "id", "description": "", "meta": {}, "data_type": "string"}},
+        "tags": [tag],
+        "meta": {},
+    }
+
+
+def _raw_manifest(*nodes):
+    return {
+        "metadata": {"adapter_type": "spark"},
+        "nodes": {node["unique_id"]: node for node in nodes},
+        "exposures": {},
+    }
+
+
+def test_run_convert_incremental_tag_runs_keep_files_of_other_tags(tmp_path):
+    (tmp_path / "dbt_project.yml").write_text("name: project\n")
+    output_dir = tmp_path / "lookml"
+    raw_manifest = _raw_manifest(_model("orders", "a"), _model("users", "b"))
+    for tag in ["a", "b"]:
+        run_convert(
+            project_dir=str(tmp_path), output_dir=str(output_dir), tag=tag,
+            incremental_run=True, raw_manifest=raw_manifest,
+        )
+    assert sorted(os.listdir(output_dir / "views")) == ["orders.view.lkml", "users.view.lkml"]
+
+    # Untagged runs still remove the files of models gone from the project
+    run_convert(
+        project_dir=str(tmp_path), output_dir=str(output_dir),
+        incremental_run=True, raw_manifest=_raw_manifest(_model("orders", "a")),
+    )
+    assert os.listdir(output_dir / "views") == ["orders.view.lkml"]
+
+
 def remove_folder_contents(folder_path):
     # Remove the contents of the folder, but keep the folder itself
     if os.path.exists(folder_path):
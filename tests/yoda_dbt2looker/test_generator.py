@@ -1,3 +1,4 @@
+import pytest
 from yoda_dbt2looker import generator, models
 from unittest.mock import MagicMock, patch, call
 
@@ -39,11 +40,15 @@ def test__convert_all_refs_to_relation_name():
     )
 
 
-def test__generate_dimensions_no_column_enabled_returns_empty_list():
+@patch("yoda_dbt2looker.generator.map_adapter_type_to_looker")
+def test__generate_dimensions_no_column_enabled_returns_empty_list(
+    map_adapter_type_to_looker_mock,
+):
     model = MagicMock()
     column = MagicMock()
     model.columns = {"col1": column}
     column.meta.dimension.enabled = False
+    map_adapter_type_to_looker_mock.return_value = "number"
     assert generator._generate_dimensions(model, None) == []
 
 
@@ -90,10 +95,7 @@ def test__generate_dimensions_column_enabled_has_sql_returns_dimension(
             "description": "col1 description",
         }
     ]
-    assert map_adapter_type_to_looker_mock.mock_calls == [
-        call(adapter_type, data_type),
-        call(adapter_type, data_type),
-    ]
+    assert map_adapter_type_to_looker_mock.mock_calls == [call(adapter_type, data_type)]
 
 
 @patch("yoda_dbt2looker.generator._extract_column_label")
@@ -123,10 +125,7 @@ def test__generate_dimensions_column_enabled_no_sql_returns_dimension(
             "description": "col1 description",
         }
     ]
-    assert map_adapter_type_to_looker_mock.mock_calls == [
-        call(adapter_type, data_type),
-        call(adapter_type, data_type),
-    ]
+    assert map_adapter_type_to_looker_mock.mock_calls == [call(adapter_type, data_type)]
 
 
 @patch("yoda_dbt2looker.generator._extract_column_label")
@@ -158,10 +157,7 @@ def test__generate_dimensions_column_enabled_is_primary_key_returns_dimension(
             "primary_key": "yes",
         }
     ]
-    assert map_adapter_type_to_looker_mock.mock_calls == [
-        call(adapter_type, data_type),
-        call(adapter_type, data_type),
-    ]
+    assert map_adapter_type_to_looker_mock.mock_calls == [call(adapter_type, data_type)]
 
 
 @patch("yoda_dbt2looker.generator._extract_column_label")
@@ -194,10 +190,7 @@ def test__generate_dimensions_column_enabled_is_primary_key_returns_dimension_co
             "label": "label1",
         }
     ]
-    assert map_adapter_type_to_looker_mock.mock_calls == [
-        call(adapter_type, data_type),
-        call(adapter_type, data_type),
-    ]
+    assert map_adapter_type_to_looker_mock.mock_calls == [call(adapter_type, data_type)]
 
 
 @patch("yoda_dbt2looker.generator._extract_column_label")
@@ -227,11 +220,7 @@ def test__generate_dimensions_column_enabled_col_has_value_format_name_but_not_n
             "description": "col1 description",
         }
     ]
-    assert map_adapter_type_to_looker_mock.mock_calls == [
-        call(adapter_type, data_type),
-        call(adapter_type, data_type),
-        call(adapter_type, data_type),
-    ]
+    assert map_adapter_type_to_looker_mock.mock_calls == [call(adapter_type, data_type)]
 
 
 @patch("yoda_dbt2looker.generator._extract_column_label")
@@ -262,11 +251,7 @@ def test__generate_dimensions_column_enabled_col_has_value_format_name(
             "value_format_name": "format1",
         }
     ]
-    assert map_adapter_type_to_looker_mock.mock_calls == [
-        call(adapter_type, data_type),
-        call(adapter_type, data_type),
-        call(adapter_type, data_type),
-    ]
+    assert map_adapter_type_to_looker_mock.mock_calls == [call(adapter_type, data_type)]
 
 
 def test__generate_compound_no_primary_key_returns_none():
@@ -303,7 +288,7 @@ def test_lookml_dimensions_from_model_no_compound_key_return_only_dimensions(
     model = MagicMock()
     adapter_type = MagicMock()
     assert generator.lookml_dimensions_from_model(model, adapter_type) == [dimension1]
-    assert generate_dimensions_mock.mock_calls == [call(model, adapter_type)]
+    assert generate_dimensions_mock.mock_calls == [call(model, adapter_type, None)]
     assert generate_compound_primary_key_if_needed_mock.mock_calls == [call(model)]
 
 
@@ -322,7 +307,7 @@ def test_lookml_dimensions_from_model_has_compound_key_return_joined_list(
         dimension1,
         dimension2,
     ]
-    assert generate_dimensions_mock.mock_calls == [call(model, adapter_type)]
+    assert generate_dimensions_mock.mock_calls == [call(model, adapter_type, None)]
     assert generate_compound_primary_key_if_needed_mock.mock_calls[0] == call(model)
 
 
@@ -692,3 +677,122 @@ def test_map_adapter_type_to_looker_timestamp_ntz():
         "timestamp_ntz"
     )
     assert looker_type == "timestamp"
+
+
+def test_map_adapter_type_to_looker_resolves_each_type_once():
+    generator._resolve_looker_type.cache_clear()
+    with patch(
+        "yoda_dbt2looker.generator.normalise_spark_types",
+        wraps=generator.normalise_spark_types,
+    ) as normalise_spark_types_mock:
+        for _ in range(3):
+            assert generator.map_adapter_type_to_looker("spark", "decimal(38,2)") == "number"
+            assert generator.map_adapter_type_to_looker("spark", "map<string,int>") is None
+    assert normalise_spark_types_mock.call_count == 2
+
+
+def _typed_model(unique_id, data_types):
+    model = MagicMock()
+    model.unique_id = unique_id
+    model.columns = {}
+    for index, data_type in enumerate(data_types):
+        column = MagicMock()
+        column.data_type = data_type
+        model.columns[f"col{index}"] = column
+    return model
+
+
+def _view(filename, unsupported_column_types):
+    return models.LookViewFile(
+        filename=filename, contents="", unsupported_column_types=unsupported_column_types
+    )
+
+
+def test_count_unsupported_columns_counts_per_type():
+    model = _typed_model("model.p.model_1", ["string", "interval", "interval", None, "array<int>"])
+    classified = generator.classify_columns(model, "spark")
+    assert generator.count_unsupported_columns(classified) == {"interval": 2, "array<int>": 1}
+
+
+def test_unsupported_column_types_counts_columns_once_per_view():
+    view_1 = _view("model_1.view.lkml", {"interval": 2})
+    view_2 = _view("model_2.view.lkml", {"array<int>": 1, "interval": 1})
+    assert generator.unsupported_column_types(
+        [view_1, view_2, view_1]
+    ) == {"interval": 3, "array<int>": 1}
+
+
+def test_log_unsupported_column_types_warns_once_per_type(caplog):
+    view = _view("model_1.view.lkml", {"interval": 2})
+    generator.log_unsupported_column_types([view], "spark")
+    warnings = [r.getMessage() for r in caplog.records if r.levelname == "WARNING"]
+    assert warnings == [
+        "Column type interval not supported for conversion from spark to looker. "
+        "No dimension will be created for 2 columns."
+    ]
+
+
+def test_classify_columns_buckets_columns_in_one_pass():
+    model = _typed_model(
+        "model.p.model_1",
+        ["timestamp", "string", "date", "interval", None, "bigint", "timestamp_ntz"],
+    )
+    columns = list(model.columns.values())
+    with patch(
+        "yoda_dbt2looker.generator.map_adapter_type_to_looker",
+        wraps=generator.map_adapter_type_to_looker,
+    ) as map_adapter_type_to_looker_mock:
+        classified = generator.classify_columns(model, "spark")
+    assert map_adapter_type_to_looker_mock.call_count == len(columns)
+    assert classified.date_times == [
+        (columns[0], "timestamp"),
+        (columns[2], "datetime"),
+        (columns[6], "timestamp"),
+    ]
+    assert classified.dates == []
+    assert classified.scalars == [(columns[1], "string"), (columns[5], "number")]
+    assert classified.unsupported == [columns[3]]
+
+
+def _named_node(name):
+    node = MagicMock()
+    node.name = name
+    return node
+
+
+def test_exposure_model_filenames_indexes_project_exposures():
+    manifest = MagicMock()
+    manifest.exposures = {
+        "exposure.project.orders": MagicMock(original_file_path="models/orders_explore.yml"),
+        "exposure.other_project.users": MagicMock(original_file_path="models/users.yml"),
+    }
+    assert generator.exposure_model_filenames(manifest, "project") == {
+        "orders": "orders_explore.model.lkml"
+    }
+
+
+def test_split_by_exposure():
+    orders, users = _named_node("orders"), _named_node("users")
+    assert generator.split_by_exposure(
+        [orders, users], {"orders": "orders.model.lkml"}
+    ) == ([orders], [users])
+
+
+@patch("yoda_dbt2looker.generator.lookml_model_data_from_dbt_model")
+def test_lookml_model_from_dbt_model_without_exposure_raises(lookml_model_data_mock):
+    manifest = MagicMock()
+    manifest.exposures = {}
+    with pytest.raises(ValueError, match="exposure.project.orders"):
+        generator.lookml_model_from_dbt_model(manifest, _named_node("orders"), "project")
+    lookml_model_data_mock.assert_not_called()
+
+
+@patch("yoda_dbt2looker.generator.lookml_model_data_from_dbt_model", return_value="explore: orders {}")
+def test_lookml_model_from_dbt_model_names_file_after_exposure(lookml_model_data_mock):
+    manifest = MagicMock()
+    manifest.exposures = {
+        "exposure.project.orders": MagicMock(original_file_path="models/orders_explore.yml")
+    }
+    look_model = generator.lookml_model_from_dbt_model(manifest, _named_node("orders"), "project")
+    assert look_model.filename == "orders_explore.model.lkml"
+    assert look_model.contents == "explore: orders {}"
@@ -0,0 +1,137 @@
+import json
+import os
+from unittest.mock import MagicMock
+
+from yoda_dbt2looker import incremental, models
+
+
+def _node(unique_id, name, content):
+    node = MagicMock()
+    node.unique_id = unique_id
+    node.name = name
+    node.content = content
+    return node
+
+
+def _generate(output_dir, nodes):
+    state = incremental.IncrementalState.load(str(output_dir))
+    generate = MagicMock(
+        side_effect=lambda node: models.LookViewFile(
+            filename=f"{node.name}.view.lkml", contents=node.content
+        )
+    )
+    generated = state.generate(
+        nodes,
+        key=lambda node: node.unique_id,
+        fingerprint=lambda node: incremental.fingerprint(node.name, node.content),
+        generate=generate,
+        directory="views",
+    )
+    os.makedirs(output_dir / "views", exist_ok=True)
+    for view in generated:
+        (output_dir / "views" / view.filename).write_text(view.contents)
+    removed = state.remove_stale()
+    state.save()
+    return generate, removed
+
+
+def test_fingerprint_depends_on_content_and_order():
+    config_a = models.DbtProjectConfig(name="a")
+    config_b = models.DbtProjectConfig(name="b")
+    assert incremental.fingerprint(config_a, "spark") == incremental.fingerprint(
+        models.DbtProjectConfig(name="a"), "spark"
+    )
+    assert incremental.fingerprint(config_a, "spark") != incremental.fingerprint(
+        config_a, "bigquery"
+    )
+    assert incremental.fingerprint(config_a, config_b) != incremental.fingerprint(
+        config_b, config_a
+    )
+
+
+def test_incremental_state_skips_unchanged_nodes(tmp_path):
+    nodes = [_node("model.p.a", "a", "view a"), _node("model.p.b", "b", "view b")]
+    generate, _ = _generate(tmp_path, nodes)
+    assert generate.call_count == 2
+
+    generate, _ = _generate(tmp_path, nodes)
+    generate.assert_not_called()
+
+    nodes[1].content = "view b changed"
+    generate, _ = _generate(tmp_path, nodes)
+    generate.assert_called_once_with(nodes[1])
+    assert (tmp_path / "views" / "b.view.lkml").read_text() == "view b changed"
+
+
+def test_incremental_state_regenerates_missing_files(tmp_path):
+    nodes = [_node("model.p.a", "a", "view a")]
+    _generate(tmp_path, nodes)
+    os.remove(tmp_path / "views" / "a.view.lkml")
+    generate, _ = _generate(tmp_path, nodes)
+    generate.assert_called_once_with(nodes[0])
+
+
+def test_incremental_state_last_node_with_same_key_wins(tmp_path):
+    nodes = [_node("model.p.a", "a", "first"), _node("model.p.a", "a", "second")]
+    generate, _ = _generate(tmp_path, nodes)
+    generate.assert_called_once_with(nodes[1])
+    assert (tmp_path / "views" / "a.view.lkml").read_text() == "second"
+
+
+def test_incremental_state_removes_outputs_of_deleted_nodes(tmp_path):
+    nodes = [_node("model.p.a", "a", "view a"), _node("model.p.b", "b", "view b")]
+    _generate(tmp_path, nodes)
+    generate, removed = _generate(tmp_path, nodes[:1])
+    generate.assert_not_called()
+    assert removed == [os.path.join("views", "b.view.lkml")]
+    assert not (tmp_path / "views" / "b.view.lkml").exists()
+    assert (tmp_path / "views" / "a.view.lkml").exists()
+
+
+def test_incremental_state_ignores_state_of_other_version(tmp_path):
+    nodes = [_node("model.p.a", "a", "view a")]
+    _generate(tmp_path, nodes)
+    state_path = tmp_path / incremental.STATE_FILENAME
+    raw_state = json.loads(state_path.read_text())
+    raw_state["version"] = incremental.STATE_VERSION + 1
+    state_path.write_text(json.dumps(raw_state))
+    generate, _ = _generate(tmp_path, nodes)
+    generate.assert_called_once_with(nodes[0])
+
+
+def test_incremental_state_keeps_unvisited_entries(tmp_path):
+    _generate(tmp_path, [_node("model.a", "a", "1"), _node("model.b", "b", "1")])
+
+    state = incremental.IncrementalState.load(str(tmp_path))
+    state.generate(
+        [_node("model.a", "a", "1")],
+        key=lambda node: node.unique_id,
+        fingerprint=lambda node: incremental.fingerprint(node.name, node.content),
+        generate=MagicMock(),
+        directory="views",
+    )
+    state.keep_unvisited()
+    state.save()
+
+    generate, removed = _generate(tmp_path, [_node("model.a", "a", "1"), _node("model.b", "b", "1")])
+    generate.assert_not_called()
+    assert removed == []
+
+
+def test_incremental_state_nodes_sharing_an_output_keep_the_last_one(tmp_path):
+    def run(nodes):
+        state = incremental.IncrementalState.load(str(tmp_path))
+        generated = state.generate(
+            nodes,
+            key=lambda node: f"{node.name}.view.lkml",
+            fingerprint=lambda node: incremental.fingerprint(node.unique_id, node.content),
+            generate=lambda node: models.LookViewFile(filename=f"{node.name}.view.lkml", contents=node.content),
+        )
+        for view in generated:
+            (tmp_path / view.filename).write_text(view.contents)
+        state.save()
+        return generated
+
+    run([_node("model.p.a", "a", "model"), _node("exposure.p.a", "a", "exposure")])
+    assert run([_node("model.p.a", "a", "changed model"), _node("exposure.p.a", "a", "exposure")]) == []
+    assert (tmp_path / "a.view.lkml").read_text() == "exposure"
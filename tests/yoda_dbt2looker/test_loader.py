@@ -0,0 +1,114 @@
+import io
+import json
+
+import pytest
+from yoda_dbt2looker import loader
+
+MANIFEST = {
+    "metadata": {"adapter_type": "spark", "dbt_version": "1.8.0"},
+    "nodes": {
+        "model.project.model_1": {"resource_type": "model", "name": "model_1", "rows": -12.5e3},
+        "test.project.test_1": {"resource_type": "test", "name": "test_1"},
+        "seed.project.seed_1": {"resource_type": "seed", "name": "seed_1"},
+    },
+    "macros": {"macro.project.macro_1": {"macro_sql": "select 1"}},
+    "exposures": {"exposure.project.exposure_1": {"name": "exposure_1"}},
+    "parent_map": {"model.project.model_1": []},
+    "disabled": None,
+}
+
+EXPECTED = {
+    "metadata": MANIFEST["metadata"],
+    "nodes": {"model.project.model_1": MANIFEST["nodes"]["model.project.model_1"]},
+    "macros": {},
+    "exposures": MANIFEST["exposures"],
+    "parent_map": {},
+    "disabled": None,
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 16, loader.STREAM_CHUNK_SIZE])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_stream_manifest_keeps_only_models_exposures_and_metadata(chunk_size, indent):
+    f = io.StringIO(json.dumps(MANIFEST, indent=indent))
+    assert loader.stream_manifest(f, chunk_size=chunk_size) == EXPECTED
+
+
+def test_stream_manifest_empty_sections():
+    f = io.StringIO('{"metadata": {}, "nodes": {}, "exposures": { }}')
+    assert loader.stream_manifest(f, chunk_size=2) == {
+        "metadata": {},
+        "nodes": {},
+        "exposures": {},
+    }
+
+
+def test_stream_manifest_truncated_file_raises():
+    f = io.StringIO(json.dumps(MANIFEST)[:-20])
+    with pytest.raises(ValueError):
+        loader.stream_manifest(f, chunk_size=8)
+
+
+def test_load_manifest(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps(MANIFEST))
+    assert loader.load_manifest(str(manifest_path)) == MANIFEST
+    assert loader.load_manifest(str(manifest_path), streaming=True) == EXPECTED
+
+
+def test_get_decoder_defaults_to_first_installed(monkeypatch):
+    monkeypatch.setattr(loader, "JSON_DECODERS", {"fast": json.loads, "json": json.loads})
+    assert loader.get_decoder()[0] == "fast"
+    assert loader.get_decoder(loader.AUTO_DECODER)[0] == "fast"
+    assert loader.get_decoder("json")[0] == "json"
+    with pytest.raises(ValueError, match="orjson is not available"):
+        loader.get_decoder("orjson")
+
+
+def test_load_manifest_reads_bytes_with_the_decoder(tmp_path, monkeypatch):
+    decoded = []
+
+    def fast(data):
+        decoded.append(data)
+        return json.loads(data)
+
+    monkeypatch.setitem(loader.JSON_DECODERS, "fast", fast)
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps(MANIFEST))
+    assert loader.load_manifest(str(manifest_path), decoder="fast") == MANIFEST
+    assert decoded == [manifest_path.read_bytes()]
+    assert loader.load_manifest(str(manifest_path), decoder="json") == MANIFEST
+
+
+def test_decode_json_falls_back_to_json(monkeypatch):
+    def strict(data):
+        raise ValueError("Integer exceeds 64-bit range")
+
+    monkeypatch.setitem(loader.JSON_DECODERS, "strict", strict)
+    assert loader.decode_json(b'{"id": 18446744073709551616}', "strict") == {"id": 2 ** 64}
+    with pytest.raises(ValueError):
+        loader.decode_json(b'{"id": ', "strict")
+
+
+@pytest.mark.parametrize("decoder,expected_type", [("orjson", memoryview), ("simdjson", bytes)])
+def test_load_manifest_with_mmap_hands_buffers_to_decoders(tmp_path, monkeypatch, decoder, expected_type):
+    received = []
+
+    def fake_decoder(data):
+        received.append(type(data))
+        return json.loads(bytes(data))
+
+    monkeypatch.setitem(loader.JSON_DECODERS, decoder, fake_decoder)
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps(MANIFEST))
+    assert loader.load_manifest(str(manifest_path), decoder=decoder, use_mmap=True) == MANIFEST
+    assert received == [expected_type]
+
+
+def test_load_manifest_with_mmap_and_json(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_bytes(b"\xef\xbb\xbf" + json.dumps({"name": "café"}, ensure_ascii=False).encode())
+    assert loader.load_manifest(str(manifest_path), decoder="json", use_mmap=True) == {"name": "café"}
+    manifest_path.write_bytes(b"")
+    with pytest.raises(ValueError):
+        loader.load_manifest(str(manifest_path), decoder="json", use_mmap=True)
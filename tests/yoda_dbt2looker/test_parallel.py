@@ -0,0 +1,23 @@
+from unittest.mock import patch
+
+from yoda_dbt2looker import parallel
+
+
+def test_resolve_jobs():
+    with patch("yoda_dbt2looker.parallel.os.cpu_count", return_value=8):
+        assert parallel.resolve_jobs(0) == 8
+        assert parallel.resolve_jobs(None) == 8
+    assert parallel.resolve_jobs(3) == 3
+    assert parallel.resolve_jobs(-2) == 1
+
+
+def test_map_in_pool_serial_does_not_start_a_pool():
+    with patch("yoda_dbt2looker.parallel.ProcessPoolExecutor") as executor_mock:
+        assert parallel.map_in_pool(abs, [-1, 2, -3], jobs=1) == [1, 2, 3]
+        assert parallel.map_in_pool(abs, [-1], jobs=4) == [1]
+    executor_mock.assert_not_called()
+
+
+def test_map_in_pool_keeps_item_order():
+    items = list(range(-50, 50))
+    assert parallel.map_in_pool(abs, items, jobs=3) == [abs(item) for item in items]
@@ -1,7 +1,8 @@
-from unittest.mock import MagicMock
+import importlib.resources
+from unittest.mock import MagicMock, patch
 
 import pytest
-from yoda_dbt2looker import models
+from yoda_dbt2looker import models, parser
 from yoda_dbt2looker.parser import (
     _extract_measures_models,
     _extract_exposure_models,
@@ -77,3 +78,302 @@ def test__assign_model_labels():
     assert model_node.model_labels == model_labels
     with pytest.raises(Exception, match="Exposure model_labels should be a list of one element for model model1"):
         _assign_model_labels({"model1": [model_labels, model_labels]}, "model1", model_node)
+
+
+def _raw_manifest():
+    column = {"name": "id", "description": "", "meta": {}, "data_type": "string"}
+    return {
+        "metadata": {"adapter_type": "spark"},
+        "nodes": {
+            "model.project.model_1": {
+                "unique_id": "model.project.model_1",
+                "resource_type": "model",
+                "relation_name": "schema.model_1",
+                "schema": "schema",
+                "name": "model_1",
+                "description": "",
+                "columns": {"id": column},
+                "tags": ["tag1"],
+                "meta": {},
+            },
+        },
+        "exposures": {
+            "exposure.project.exposure_1": {
+                "unique_id": "exposure.project.exposure_1",
+                "resource_type": "exposure",
+                "name": "exposure_1",
+                "description": "",
+                "tags": ["tag1"],
+                "depends_on": {"macros": [], "nodes": ["model.project.model_1"]},
+                "meta": {
+                    "looker": {
+                        "main_model": "ref('model_1')",
+                        "connection": "connection",
+                    }
+                },
+                "original_file_path": "models/exposure_1.yml",
+                "path": "exposure_1.yml",
+            },
+        },
+    }
+
+
+def test_parse_typed_models_accepts_parsed_manifest():
+    manifest = parser.parse_manifest(_raw_manifest())
+    with patch("yoda_dbt2looker.parser.parse_manifest") as parse_manifest_mock:
+        dbt_models = parser.parse_typed_models(manifest, "project", tag="tag1")
+        assert parser.parse_adapter_type(manifest) == "spark"
+        assert len(parser.parse_exposures(manifest, tag="tag1")) == 1
+    parse_manifest_mock.assert_not_called()
+    assert [model.name for model in dbt_models] == ["model_1", "model_1"]
+
+
+def test_parse_typed_models_does_not_mutate_shared_manifest_nodes():
+    manifest = parser.parse_manifest(_raw_manifest())
+    tagged_model, exposure_model = parser.parse_typed_models(
+        manifest, "project", tag="tag1"
+    )
+    assert tagged_model.create_explorer
+    assert not exposure_model.create_explorer
+    assert manifest.nodes["model.project.model_1"].create_explorer
+
+
+def test_get_manifest_validator_is_cached_per_schema():
+    parser._load_manifest_validator.cache_clear()
+    with patch(
+        "yoda_dbt2looker.parser.importlib.resources.open_text", wraps=importlib.resources.open_text
+    ) as open_text_mock:
+        validator = parser.get_manifest_validator()
+        assert parser.get_manifest_validator(parser.MANIFEST_SCHEMA) is validator
+        assert parser.get_manifest_validator("manifest_v1.json") is not validator
+    assert open_text_mock.call_count == 2
+
+
+def test_parse_manifest_dispatches_nodes_on_resource_type():
+    raw_manifest = _raw_manifest()
+    raw_manifest["nodes"]["test.project.not_null_model_1_id"] = {
+        "unique_id": "test.project.not_null_model_1_id",
+        "resource_type": "test",
+    }
+    raw_manifest["nodes"]["model.project.empty"] = {
+        "unique_id": "model.project.empty",
+        "resource_type": "model",
+    }
+    model_inits = []
+    original_init = models.DbtModel.__init__
+
+    def counting_init(self, **data):
+        model_inits.append(data["unique_id"])
+        original_init(self, **data)
+
+    with patch.object(models.DbtModel, "__init__", counting_init):
+        manifest = parser.parse_manifest(raw_manifest)
+
+    assert type(manifest.nodes["model.project.model_1"]) is models.DbtModel
+    assert type(manifest.nodes["test.project.not_null_model_1_id"]) is models.DbtNode
+    assert type(manifest.nodes["model.project.empty"]) is models.DbtNode
+    assert type(manifest.exposures["exposure.project.exposure_1"]) is models.DbtExposure
+    # The test node is never tried as a model
+    assert model_inits == ["model.project.model_1", "model.project.empty"]
+
+
+def test_parse_manifest_lowercases_column_names_without_touching_the_input():
+    raw_manifest = _raw_manifest()
+    raw_columns = raw_manifest["nodes"]["model.project.model_1"]["columns"]
+    raw_columns["Amount"] = {"name": "Amount", "description": "", "meta": {}, "data_type": "int"}
+    column = models.DbtModelColumn(name="Price", description="", data_type="int", meta={})
+
+    manifest = parser.parse_manifest(raw_manifest)
+    model = models.DbtModel(**dict(raw_manifest["nodes"]["model.project.model_1"], columns={"Price": column}))
+
+    columns = manifest.nodes["model.project.model_1"].columns
+    assert {name: column.name for name, column in columns.items()} == {"id": "id", "amount": "amount"}
+    assert raw_columns["Amount"]["name"] == "Amount"
+    assert model.columns["price"].name == "price"
+    assert column.name == "Price"
+
+
+def _raw_model(name, tags, path=None):
+    return {
+        "unique_id": f"model.project.{name}",
+        "resource_type": "model",
+        "name": name,
+        "tags": tags,
+        "original_file_path": path or f"models/{name}.sql",
+    }
+
+
+def test_select_raw_manifest_keeps_selected_and_exposure_models():
+    raw_manifest = _raw_manifest()
+    raw_manifest["nodes"]["model.project.model_1"]["tags"] = []
+    for raw_node in [
+        _raw_model("tagged", ["tag1"]),
+        _raw_model("untagged", []),
+        {"unique_id": "model.project.empty", "resource_type": "model"},
+        {"unique_id": "test.project.test_1", "resource_type": "test", "name": "test_1", "tags": ["tag1"]},
+    ]:
+        raw_manifest["nodes"][raw_node["unique_id"]] = raw_node
+
+    selected = parser.select_raw_manifest(raw_manifest, tag="tag1")
+
+    # model_1 is not tagged but exposure_1 refers to it
+    assert sorted(selected["nodes"]) == [
+        "model.project.empty", "model.project.model_1", "model.project.tagged"
+    ]
+    assert selected["exposures"] is raw_manifest["exposures"]
+    assert len(raw_manifest["nodes"]) == 5
+    assert parser.select_raw_manifest(raw_manifest) is raw_manifest
+
+
+def test_select_raw_manifest_by_name_and_path():
+    raw_manifest = _raw_manifest()
+    raw_manifest["exposures"] = {}
+    for raw_node in [
+        _raw_model("orders", [], "models/marts/orders.sql"),
+        _raw_model("stg_orders", [], "models/staging/stg_orders.sql"),
+        _raw_model("marts_users", [], "models/marts_users.sql"),
+    ]:
+        raw_manifest["nodes"][raw_node["unique_id"]] = raw_node
+
+    by_path = parser.select_raw_manifest(raw_manifest, paths=["models/marts/"])
+    assert list(by_path["nodes"]) == ["model.project.orders"]
+    by_name = parser.select_raw_manifest(raw_manifest, names={"stg_orders", "model_1"})
+    assert sorted(by_name["nodes"]) == ["model.project.model_1", "model.project.stg_orders"]
+
+
+def test_parse_models_only_validates_selected_models():
+    raw_manifest = _raw_manifest()
+    raw_manifest["exposures"] = {}
+    raw_manifest["nodes"]["model.project.untagged"] = _raw_model("untagged", ["other"])
+    with patch("yoda_dbt2looker.parser.parse_manifest", wraps=parser.parse_manifest) as parse_manifest_mock:
+        dbt_models = parser.parse_models(raw_manifest, tag="tag1")
+    assert [model.name for model in dbt_models] == ["model_1"]
+    assert list(parse_manifest_mock.call_args.args[0]["nodes"]) == ["model.project.model_1"]
+
+
+def test_select_raw_manifest_keeps_exposures_sharing_selected_models():
+    raw_manifest = _raw_manifest()
+    for name in ["model_2", "model_3", "model_4"]:
+        raw_manifest["nodes"][f"model.project.{name}"] = _raw_model(name, ["tag1"])
+    exposure = raw_manifest["exposures"]["exposure.project.exposure_1"]
+    raw_manifest["exposures"] = {
+        f"exposure.project.{name}": {**exposure, "unique_id": f"exposure.project.{name}", "name": name, "meta": meta}
+        for name, meta in [
+            ("exposure_1", {"looker": {"main_model": "ref('model_1')", "joins": [{"sql_on": "ref('model_2')"}]}}),
+            ("exposure_2", {"looker": {"main_model": "ref('model_2')"}}),
+            ("exposure_3", {"looker": {"main_model": "ref('model_3')"}}),
+            ("model_4", {"looker": {"main_model": "ref('model_3')"}}),
+        ]
+    }
+
+    selected = parser.select_raw_manifest(raw_manifest, tag="tag1", names={"model_1"}, exposure_ids=set())
+    # exposure_2 shares model_2 with exposure_1, which refers to model_1
+    assert sorted(selected["exposures"]) == ["exposure.project.exposure_1", "exposure.project.exposure_2"]
+    assert sorted(selected["nodes"]) == ["model.project.model_1", "model.project.model_2"]
+
+    selected = parser.select_raw_manifest(raw_manifest, tag="tag1", names={"model_4"}, exposure_ids=set())
+    # model_4 is explored through the exposure named after it
+    assert sorted(selected["exposures"]) == ["exposure.project.exposure_3", "exposure.project.model_4"]
+    assert sorted(selected["nodes"]) == ["model.project.model_3", "model.project.model_4"]
+
+
+def test_parsed_node_cache_reuses_unchanged_nodes():
+    raw_manifest = _raw_manifest()
+    raw_manifest["nodes"]["model.project.model_2"] = {
+        **raw_manifest["nodes"]["model.project.model_1"],
+        "unique_id": "model.project.model_2",
+        "name": "model_2",
+    }
+    cache = parser.ParsedNodeCache()
+    first = cache.parse_manifest(raw_manifest)
+
+    changed = _raw_manifest()
+    changed["nodes"]["model.project.model_2"] = {
+        **raw_manifest["nodes"]["model.project.model_2"],
+        "description": "changed",
+    }
+    model_inits = []
+    original_init = models.DbtModel.__init__
+
+    def counting_init(self, **data):
+        model_inits.append(data["unique_id"])
+        original_init(self, **data)
+
+    with patch.object(models.DbtModel, "__init__", counting_init):
+        second = cache.parse_manifest(changed)
+
+    assert model_inits == ["model.project.model_2"]
+    assert second.nodes["model.project.model_2"].description == "changed"
+    assert second.nodes["model.project.model_1"] == first.nodes["model.project.model_1"]
+    assert second == parser.parse_manifest(changed)
+
+
+def _load_schema(schema_name):
+    return parser.get_manifest_validator(schema_name).schema
+
+
+def test_slim_manifest_schema_matches_the_full_schema_on_what_it_checks():
+    full = _load_schema(parser.MANIFEST_SCHEMA)
+    slim = _load_schema(parser.SLIM_MANIFEST_SCHEMA)
+    assert slim["properties"]["metadata"] == full["properties"]["metadata"]
+    assert slim["properties"]["exposures"] == full["properties"]["exposures"]
+    full_model = next(
+        branch
+        for branch in full["properties"]["nodes"]["additionalProperties"]["anyOf"]
+        if branch.get("title") == "Model"
+    )
+    assert slim["properties"]["nodes"]["additionalProperties"]["then"] == full_model
+
+
+def test_slim_manifest_schema_only_checks_model_nodes():
+    raw_manifest = {
+        "metadata": {},
+        "nodes": {
+            "test.a": {"unique_id": "test.a", "resource_type": "test"},
+            "model.a": {"unique_id": "model.a", "resource_type": "model"},
+        },
+        "exposures": {},
+        "macros": {"macro.a": {}},
+    }
+    slim_errors = list(parser.get_manifest_validator(parser.SLIM_MANIFEST_SCHEMA).iter_errors(raw_manifest))
+    assert slim_errors
+    assert {tuple(error.absolute_path) for error in slim_errors} == {("nodes", "model.a")}
+    full_errors = list(parser.get_manifest_validator(parser.MANIFEST_SCHEMA).iter_errors(raw_manifest))
+    assert {tuple(error.absolute_path)[:2] for error in full_errors} > {("nodes", "model.a")}
+
+
+def test_validate_manifest_with_slim_schema_reports_missing_sections():
+    with pytest.raises(ValueError):
+        parser.validate_manifest({"nodes": {}}, parser.SLIM_MANIFEST_SCHEMA)
+
+
+def _error_report(caplog, raw_manifest, jobs):
+    caplog.clear()
+    with pytest.raises(ValueError):
+        parser.validate_manifest(raw_manifest, parser.MANIFEST_SCHEMA, jobs=jobs)
+    return sorted(record.getMessage() for record in caplog.records)
+
+
+def test_validate_manifest_in_processes_reports_the_same_errors(caplog):
+    raw_manifest = {
+        "metadata": {"dbt_version": 1},
+        "nodes": {
+            "test.a": {"unique_id": "test.a", "resource_type": "test"},
+            "model.a": {"unique_id": "model.a", "resource_type": "model"},
+        },
+        "exposures": {"exposure.a": {"name": "a"}},
+        "macros": {"macro.a": {}},
+    }
+    serial = _error_report(caplog, raw_manifest, jobs=1)
+    assert "Error in manifest at metadata.dbt_version: 1 is not of type 'string'" in serial
+    assert "  Error in manifest at nodes.model.a: 'name' is a required property" in serial
+    assert "Error in manifest at exposures.exposure.a: 'type' is a required property" in serial
+    assert _error_report(caplog, raw_manifest, jobs=2) == serial
+
+
+def test_validate_manifest_in_processes_shards_entries():
+    raw_manifest = {"metadata": {}, "nodes": {"test.a": {}}, "exposures": {}}
+    with patch("yoda_dbt2looker.parallel.map_in_pool", return_value=[[]]) as map_mock:
+        assert parser.validate_manifest(raw_manifest, parser.SLIM_MANIFEST_SCHEMA, jobs=4)
+    assert map_mock.call_args.args[1] == [("nodes", "test.a", {})]
+    assert map_mock.call_args.args[2] == 4
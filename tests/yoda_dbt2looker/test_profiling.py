@@ -0,0 +1,80 @@
+import json
+import pstats
+import tracemalloc
+
+from yoda_dbt2looker import profiling
+
+
+def test_stage_profiler_records_stages(tmp_path):
+    profiler = profiling.stage_profiler("run_convert", str(tmp_path / "report.json"))
+    assert profiler.enabled
+    with profiler.stage("parse") as stage:
+        stage.count(models=2, columns=10)
+        stage.count(models=1)
+        stage.note(json_decoder="json")
+    with profiler.stage("write"):
+        pass
+
+    profiler.write(str(tmp_path / "report.json"))
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert report["version"] == profiling.REPORT_VERSION
+    assert report["command"] == "run_convert"
+    assert [stage["name"] for stage in report["stages"]] == ["parse", "write"]
+    assert report["stages"][0]["counts"] == {"models": 3, "columns": 10}
+    assert report["stages"][1]["counts"] == {}
+    assert report["stages"][0]["info"] == {"json_decoder": "json"}
+    assert report["stages"][1]["info"] == {}
+    for stage in report["stages"]:
+        assert stage["wall_seconds"] >= 0
+        assert stage["cpu_seconds"] >= 0
+        assert stage["peak_rss_mb"] > 0
+
+
+def test_stage_is_recorded_when_it_fails():
+    profiler = profiling.StageProfiler("convert")
+    try:
+        with profiler.stage("load"):
+            raise SystemExit("Failed")
+    except SystemExit:
+        pass
+    assert [stage["name"] for stage in profiler.report()["stages"]] == ["load"]
+
+
+def test_null_profiler_without_report(tmp_path):
+    profiler = profiling.stage_profiler("run_convert", None)
+    assert profiler is profiling.NULL_PROFILER
+    assert not profiler.enabled
+    with profiler.stage("parse") as stage:
+        stage.count(models=2)
+    assert stage.counts == {}
+    profiler.write(str(tmp_path / "report.json"))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_profiled_writes_cprofile_and_tracemalloc_reports(tmp_path):
+    @profiling.profiled
+    def convert(size):
+        profiler = profiling.stage_profiler("convert", None)
+        with profiler.stage("parse"):
+            data = [str(i) for i in range(size)]
+        return len(data)
+
+    cprofile_output = str(tmp_path / "convert.pstats")
+    tracemalloc_output = str(tmp_path / "convert.tracemalloc.txt")
+    assert convert(1000, cprofile_output=cprofile_output, tracemalloc_output=tracemalloc_output, tracemalloc_top=3) == 1000
+
+    stats = pstats.Stats(cprofile_output)
+    assert any(function == "convert" for _, _, function in stats.stats)
+    report = (tmp_path / "convert.tracemalloc.txt").read_text().splitlines()
+    assert report[0].startswith("Peak traced memory:")
+    assert "parse stage" in report[1]
+    assert len(report) <= 5
+    assert not tracemalloc.is_tracing()
+
+
+def test_profiled_without_outputs_calls_through():
+    @profiling.profiled
+    def convert(size):
+        return profiling.stage_profiler("convert", None)
+
+    assert convert(1) is profiling.NULL_PROFILER
@@ -0,0 +1,27 @@
+from yoda_dbt2looker import refs
+
+
+def test_resolve_refs_returns_refs_and_sql():
+    resolved = refs.resolve_refs("ref('model_a').id=ref( 'model_b' ).id")
+    assert resolved.refs == ("model_a", "model_b")
+    assert resolved.sql == "model_a.id = model_b.id"
+
+
+def test_resolve_refs_without_handle_spaces():
+    resolved = refs.resolve_refs("${ref('a').x}and${ref('a').y}", False)
+    assert resolved.refs == ("a", "a")
+    assert resolved.sql == "${a.x} and ${a.y}"
+
+
+def test_resolve_refs_without_refs_returns_string_unchanged():
+    assert refs.resolve_refs("${a.x}and${a.y}") == refs.ResolvedRefs((), "${a.x}and${a.y}")
+
+
+def test_resolve_refs_is_cached_per_string():
+    refs._resolve_refs.cache_clear()
+    refs.resolve_refs("ref('a').x = 1")
+    refs.resolve_refs("ref('a').x = 1")
+    refs.resolve_refs("ref('a').x = 1", True)
+    refs.resolve_refs("ref('a').x = 1", False)
+    info = refs._resolve_refs.cache_info()
+    assert (info.hits, info.misses) == (2, 2)
@@ -0,0 +1,113 @@
+import pytest
+
+from yoda_dbt2looker import selection
+
+
+def _node(name, parents=(), tags=(), path=None, resource_type="model"):
+    return {
+        "unique_id": f"{resource_type}.project.{name}",
+        "resource_type": resource_type,
+        "name": name,
+        "tags": list(tags),
+        "original_file_path": path or f"models/{name}.sql",
+        "depends_on": {"macros": [], "nodes": [f"model.project.{parent}" for parent in parents]},
+    }
+
+
+def _raw_manifest():
+    # stg_orders -> orders -> revenue, orders is also tested and exposed
+    nodes = [
+        _node("stg_orders", path="models/staging/stg_orders.sql"),
+        _node("orders", ["stg_orders"], tags=["finance"], path="models/marts/orders.sql"),
+        _node("revenue", ["orders"], tags=["finance"], path="models/marts/revenue.sql"),
+        _node("users", path="models/marts/users.sql"),
+        _node("not_null_orders_id", ["orders"], resource_type="test"),
+    ]
+    exposure = _node("orders_dashboard", resource_type="exposure")
+    exposure["depends_on"]["nodes"] = []
+    exposure["meta"] = {"looker": {"main_model": "ref('orders')"}}
+    return {
+        "metadata": {"adapter_type": "spark"},
+        "nodes": {node["unique_id"]: node for node in nodes},
+        "exposures": {exposure["unique_id"]: exposure},
+    }
+
+
+def _select(select=None, exclude=None, previous_manifest=None, raw_manifest=None):
+    graph = selection.ManifestGraph(raw_manifest or _raw_manifest())
+    selected = selection.select_nodes(graph, select, exclude, previous_manifest)
+    return sorted(unique_id.split(".")[-1] for unique_id in selected)
+
+
+@pytest.mark.parametrize(
+    "selector,expected",
+    [
+        ("orders", ["orders"]),
+        ("tag:finance", ["orders", "revenue"]),
+        ("path:models/marts", ["orders", "revenue", "users"]),
+        ("path:models/mart", []),
+        ("orders+", ["orders", "orders_dashboard", "revenue"]),
+        ("+orders", ["orders", "stg_orders"]),
+        ("stg_orders+1", ["orders", "stg_orders"]),
+        ("+revenue", ["orders", "revenue", "stg_orders"]),
+        ("1+revenue", ["orders", "revenue"]),
+        ("tag:finance,path:models/marts/orders.sql", ["orders"]),
+        ("users revenue", ["revenue", "users"]),
+    ],
+)
+def test_select_nodes(selector, expected):
+    assert _select([selector]) == expected
+
+
+def test_select_nodes_excludes_and_defaults_to_everything():
+    assert _select() == ["orders", "orders_dashboard", "revenue", "stg_orders", "users"]
+    assert _select(exclude=["tag:finance"]) == ["orders_dashboard", "stg_orders", "users"]
+    assert _select(["stg_orders+"], exclude=["orders_dashboard"]) == ["orders", "revenue", "stg_orders"]
+
+
+def test_select_nodes_does_not_match_missing_tags():
+    raw_manifest = _raw_manifest()
+    raw_manifest["nodes"]["model.project.users"]["tags"] = None
+    del raw_manifest["exposures"]["exposure.project.orders_dashboard"]["tags"]
+    assert _select(["tag:finance"], raw_manifest=raw_manifest) == ["orders", "revenue"]
+    assert _select(exclude=["tag:finance"], raw_manifest=raw_manifest) == [
+        "orders_dashboard", "stg_orders", "users"
+    ]
+
+
+def test_select_nodes_uses_child_map():
+    raw_manifest = _raw_manifest()
+    raw_manifest["nodes"]["model.project.users"]["depends_on"]["nodes"] = []
+    raw_manifest["child_map"] = {"model.project.revenue": ["model.project.users"]}
+    assert _select(["revenue+"], raw_manifest=raw_manifest) == ["revenue", "users"]
+
+
+def test_select_nodes_by_state():
+    previous_manifest = _raw_manifest()
+    raw_manifest = _raw_manifest()
+    raw_manifest["nodes"]["model.project.orders"]["description"] = "changed"
+    raw_manifest["nodes"]["model.project.users"]["created_at"] = 1.0
+    del previous_manifest["nodes"]["model.project.revenue"]
+
+    assert _select(["state:modified"], previous_manifest=previous_manifest, raw_manifest=raw_manifest) == [
+        "orders", "revenue"
+    ]
+    assert _select(["state:new"], previous_manifest=previous_manifest, raw_manifest=raw_manifest) == ["revenue"]
+    assert _select(["state:modified+"], previous_manifest=previous_manifest, raw_manifest=raw_manifest) == [
+        "orders", "orders_dashboard", "revenue"
+    ]
+
+
+@pytest.mark.parametrize("selector", ["fqn:orders", "state:unknown", "orders++", "state:modified"])
+def test_select_nodes_rejects_invalid_selectors(selector):
+    with pytest.raises(ValueError):
+        _select([selector])
+
+
+def test_split_selection():
+    graph = selection.ManifestGraph(_raw_manifest())
+    names, exposure_ids = selection.split_selection(
+        graph, selection.select_nodes(graph, ["orders+"])
+    )
+    assert names == {"orders", "revenue"}
+    assert exposure_ids == {"exposure.project.orders_dashboard"}
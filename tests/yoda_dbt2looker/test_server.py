@@ -0,0 +1,146 @@
+import http.client
+import json
+import logging
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from yoda_dbt2looker import server
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = server.LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats() == {"entries": 2, "max_entries": 2, "hits": 3, "misses": 1}
+
+
+@pytest.fixture
+def service(tmp_path):
+    with patch("yoda_dbt2looker.parser.validate_manifest") as validate_mock, \
+            patch("yoda_dbt2looker.cli.run_convert", return_value={"x.model.lkml": "x"}) as run_convert_mock:
+        service = server.ConversionService(str(tmp_path), max_manifests=1, max_results=2)
+        service.validate_mock = validate_mock
+        service.run_convert_mock = run_convert_mock
+        yield service
+
+
+def test_conversion_service_caches_manifests_and_results(service, tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text('{"nodes": {}}')
+
+    key, manifest = service.manifest_from_path(str(manifest_path))
+    assert service.convert(key, manifest, tag="a") == {"x.model.lkml": "x"}
+    assert service.manifest_from_path(str(manifest_path)) == (key, manifest)
+    service.convert(key, manifest, tag="a")
+    service.convert(key, manifest, tag="b")
+
+    assert service.validate_mock.call_count == 1
+    assert [call.kwargs["tag"] for call in service.run_convert_mock.call_args_list] == ["a", "b"]
+    assert service.run_convert_mock.call_args.kwargs["raw_manifest"] == {"nodes": {}}
+
+    # A manifest sent as the body evicts the one read from the path
+    body_key, _ = service.manifest_from_body(b'{"nodes": {}}')
+    assert body_key != key
+    service.manifest_from_path(str(manifest_path))
+    assert service.validate_mock.call_count == 3
+
+
+def test_conversion_service_reports_logged_errors(service, tmp_path):
+    def failing_convert(**kwargs):
+        logging.error("Exposure model is missing")
+        raise SystemExit("Failed")
+
+    service.run_convert_mock.side_effect = failing_convert
+    key, manifest = service.manifest_from_body(b"{}")
+    with pytest.raises(server.ConversionError) as e:
+        service.convert(key, manifest)
+    assert e.value.errors == ["Exposure model is missing"]
+    with pytest.raises(server.ConversionError):
+        service.manifest_from_body(b"not json")
+    with pytest.raises(server.ConversionError):
+        service.manifest_from_path(str(tmp_path / "missing.json"))
+    with pytest.raises(ValueError):
+        service.convert(key, manifest, engine="core", select=["a"])
+
+
+def test_conversion_service_invalidates_results_of_an_edited_project(service, tmp_path):
+    project_path = tmp_path / "dbt_project.yml"
+    project_path.write_text("name: a\n")
+    key, manifest = service.manifest_from_body(b"{}")
+    service.convert(key, manifest)
+    service.convert(key, manifest)
+    project_path.write_text("name: renamed\n")
+    service.convert(key, manifest)
+    assert service.run_convert_mock.call_count == 2
+
+
+def test_conversion_errors_only_collects_the_current_thread():
+    def log_error():
+        logging.error("Error of another request")
+
+    with pytest.raises(server.ConversionError) as e:
+        with server._conversion_errors():
+            other = threading.Thread(target=log_error)
+            other.start()
+            other.join()
+            logging.error("Error of this request")
+            raise SystemExit("Failed")
+    assert e.value.errors == ["Error of this request"]
+
+
+def test_conversion_service_loads_a_manifest_once(service):
+    started = threading.Event()
+    release = threading.Event()
+    loads = []
+
+    def load():
+        loads.append(1)
+        started.set()
+        release.wait(5)
+        return {}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(service._manifest("key", load))) for _ in range(2)]
+    threads[0].start()
+    started.wait(5)
+    threads[1].start()
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(loads) == 1
+    assert results[0] is results[1]
+
+
+def _request(port, method, path, body=None):
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    connection.request(method, path, body=body)
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_server_converts_manifest_body(service):
+    http_server = server.make_server(service, port=0)
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    port = http_server.server_address[1]
+    try:
+        assert _request(port, "POST", "/convert?tag=a&select=b&select=c", b"{}") == (
+            200, {"files": {"x.model.lkml": "x"}}
+        )
+        assert service.run_convert_mock.call_args.kwargs["select"] == ["b", "c"]
+        assert _request(port, "POST", "/convert?engine=other", b"{}")[0] == 400
+        assert _request(port, "POST", "/convert")[0] == 400
+        assert _request(port, "POST", "/other", b"{}")[0] == 404
+        status, health = _request(port, "GET", "/health")
+        assert status == 200
+        assert health["cache"]["results"]["entries"] == 1
+    finally:
+        http_server.shutdown()
+        http_server.server_close()
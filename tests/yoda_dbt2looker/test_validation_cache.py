@@ -0,0 +1,121 @@
+import os
+from unittest.mock import patch
+
+import pytest
+from yoda_dbt2looker import parser, profiling, validation_cache, watch
+
+SCHEMA = parser.SLIM_MANIFEST_SCHEMA
+
+
+def _validate(cache, manifest_path, raw_manifest=None):
+    return validation_cache.validate_manifest(
+        raw_manifest or {}, SCHEMA, 1, cache, str(manifest_path), watch.file_signature(str(manifest_path))
+    )
+
+
+def test_validate_manifest_skips_an_identical_manifest(tmp_path):
+    cache = validation_cache.ValidationCache(str(tmp_path / "cache"))
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text('{"nodes": {}}')
+    with patch("yoda_dbt2looker.parser.validate_manifest") as validate_mock:
+        assert not _validate(cache, manifest_path)
+        assert _validate(cache, manifest_path)
+        # Same bytes at another path
+        other_path = tmp_path / "other.json"
+        other_path.write_text('{"nodes": {}}')
+        assert _validate(cache, other_path)
+        manifest_path.write_text('{"nodes": {"a": {}}}')
+        assert not _validate(cache, manifest_path)
+    assert validate_mock.call_count == 2
+
+
+def test_validate_manifest_keys_on_the_schema(tmp_path):
+    cache = validation_cache.ValidationCache(str(tmp_path / "cache"))
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text("{}")
+    key = cache.key(str(manifest_path), SCHEMA)
+    assert cache.key(str(manifest_path), parser.MANIFEST_SCHEMA) != key
+    with patch("yoda_dbt2looker.parser.validate_manifest"):
+        _validate(cache, manifest_path)
+    assert cache.contains(key)
+    assert not cache.contains(cache.key(str(manifest_path), parser.MANIFEST_SCHEMA))
+
+
+def test_validate_manifest_does_not_record_failures(tmp_path):
+    cache = validation_cache.ValidationCache(str(tmp_path / "cache"))
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text("{}")
+    with pytest.raises(ValueError):
+        _validate(cache, manifest_path)
+    with pytest.raises(ValueError):
+        _validate(cache, manifest_path)
+
+
+def test_validate_manifest_ignores_a_manifest_changed_since_it_was_read(tmp_path):
+    cache = validation_cache.ValidationCache(str(tmp_path / "cache"))
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text("{}")
+    signature = watch.file_signature(str(manifest_path))
+    manifest_path.write_text('{"nodes": {}}')
+    with patch("yoda_dbt2looker.parser.validate_manifest"):
+        assert not validation_cache.validate_manifest({}, SCHEMA, 1, cache, str(manifest_path), signature)
+    assert not os.path.exists(cache.cache_dir)
+
+
+def test_evict_removes_the_least_recently_used_entries(tmp_path):
+    cache = validation_cache.ValidationCache(str(tmp_path / "cache"), max_entries=2)
+    for mtime, key in enumerate(["a", "b"]):
+        cache.record(key)
+        os.utime(os.path.join(cache.cache_dir, key + validation_cache.MARKER_SUFFIX), (mtime, mtime))
+    assert cache.contains("a")
+    cache.record("c")
+    assert sorted(os.listdir(cache.cache_dir)) == ["a.validated", "c.validated"]
+
+
+def test_evict_leaves_other_files_alone(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    user_files = [f"notes_{i}.txt" for i in range(5)]
+    for name in user_files:
+        (cache_dir / name).write_text("keep me")
+    cache = validation_cache.ValidationCache(str(cache_dir), max_entries=1)
+    cache.record("a")
+    cache.record("b")
+    assert sorted(os.listdir(cache_dir)) == ["b.validated"] + user_files
+
+
+def test_record_warns_when_the_cache_is_not_writable(tmp_path, caplog):
+    blocker = tmp_path / "cache"
+    blocker.write_text("")
+    cache = validation_cache.ValidationCache(str(blocker))
+    cache.record("a")
+    assert "Could not record the manifest validation" in caplog.text
+
+
+def test_default_cache_dir_follows_xdg_cache_home():
+    with patch.dict(os.environ, {"XDG_CACHE_HOME": "/tmp/xdg"}):
+        assert validation_cache.default_cache_dir() == "/tmp/xdg/dbt2looker/validation"
+
+
+def test_validate_manifest_keeps_streamed_manifests_apart(tmp_path):
+    cache = validation_cache.ValidationCache(str(tmp_path / "cache"))
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text("{}")
+    signature = watch.file_signature(str(manifest_path))
+    with patch("yoda_dbt2looker.parser.validate_manifest") as validate_mock:
+        validation_cache.validate_manifest({}, SCHEMA, 1, cache, str(manifest_path), signature, streaming=True)
+        assert not validation_cache.validate_manifest({}, SCHEMA, 1, cache, str(manifest_path), signature)
+        assert validation_cache.validate_manifest({}, SCHEMA, 1, cache, str(manifest_path), signature)
+    assert validate_mock.call_count == 2
+
+
+@pytest.mark.parametrize("report", [False, True])
+def test_load_validated_manifest_reports_missing_sections(tmp_path, caplog, report):
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text("{}")
+    profiler = profiling.stage_profiler("run_convert", str(tmp_path / "report.json") if report else None)
+    with pytest.raises(ValueError):
+        validation_cache.load_validated_manifest(
+            str(manifest_path), lambda path, streaming, decoder, use_mmap: {}, profiler=profiler
+        )
+    assert "'nodes' is a required property" in caplog.text
@@ -0,0 +1,70 @@
+import os
+from unittest.mock import MagicMock
+
+from yoda_dbt2looker import watch
+
+
+def _touch(path, contents):
+    path.write_text(contents)
+    # Some file systems have a coarse mtime, the size tells the writes apart
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_file_signature(tmp_path):
+    path = tmp_path / "manifest.json"
+    assert watch.file_signature(str(path)) is None
+    _touch(path, "{}")
+    signature = watch.file_signature(str(path))
+    assert signature[1] == 2
+    _touch(path, "{}")
+    assert watch.file_signature(str(path)) != signature
+
+
+def test_watch_files_runs_once_per_settled_change(tmp_path):
+    manifest = tmp_path / "manifest.json"
+    project = tmp_path / "dbt_project.yml"
+    _touch(manifest, "{}")
+    # What happens to the files before each poll: a manifest written over two
+    # polls, nothing, a new project file and the manifest rewritten as it was
+    writes = iter([
+        lambda: _touch(manifest, '{"nodes"'),
+        lambda: _touch(manifest, '{"nodes": {}}'),
+        lambda: None,
+        lambda: None,
+        lambda: _touch(project, "name: p"),
+        lambda: None,
+    ])
+    sleep = MagicMock(side_effect=lambda interval: next(writes)())
+    on_change = MagicMock()
+
+    runs = watch.watch_files([str(manifest), str(project)], on_change, interval=0.5, max_runs=3, sleep=sleep)
+
+    assert runs == 3
+    assert on_change.call_count == 3
+    assert sleep.call_count == 6
+    sleep.assert_called_with(0.5)
+
+
+def test_watch_files_ignores_changes_reverted_before_settling(tmp_path):
+    manifest = tmp_path / "manifest.json"
+    _touch(manifest, "{}")
+    signature = watch.file_signature(str(manifest))
+
+    def revert():
+        os.utime(manifest, ns=(signature[0], signature[0]))
+
+    writes = iter([
+        lambda: _touch(manifest, "{ }"),
+        lambda: (manifest.write_text("{}"), revert()),
+        lambda: None,
+        lambda: _touch(manifest, "{ }"),
+        lambda: None,
+    ])
+    on_change = MagicMock()
+
+    watch.watch_files(
+        [str(manifest)], on_change, max_runs=2, sleep=lambda interval: next(writes)()
+    )
+
+    assert on_change.call_count == 2
@@ -0,0 +1,81 @@
+import os
+import stat
+import tarfile
+import zipfile
+from unittest.mock import patch
+
+import pytest
+from yoda_dbt2looker import writer
+
+
+def test_write_file_atomic_creates_file(tmp_path):
+    file_path = str(tmp_path / "view.view.lkml")
+    assert writer.write_file_atomic(file_path, "view: a {}")
+    with open(file_path) as f:
+        assert f.read() == "view: a {}"
+    assert stat.S_IMODE(os.stat(file_path).st_mode) == writer._FILE_MODE
+    assert os.listdir(tmp_path) == ["view.view.lkml"]
+
+
+def test_write_file_atomic_skips_identical_contents(tmp_path):
+    file_path = tmp_path / "view.view.lkml"
+    file_path.write_text("view: a {}")
+    os.utime(file_path, (0, 0))
+    assert not writer.write_file_atomic(str(file_path), "view: a {}")
+    assert os.stat(file_path).st_mtime == 0
+
+    assert writer.write_file_atomic(str(file_path), "view: b {}")
+    assert file_path.read_text() == "view: b {}"
+
+
+def test_write_file_atomic_keeps_previous_file_on_failure(tmp_path):
+    file_path = tmp_path / "view.view.lkml"
+    file_path.write_text("view: a {}")
+    with patch("yoda_dbt2looker.writer.os.replace", side_effect=OSError("disk full")):
+        with pytest.raises(OSError):
+            writer.write_file_atomic(str(file_path), "view: b {}")
+    assert file_path.read_text() == "view: a {}"
+    assert os.listdir(tmp_path) == ["view.view.lkml"]
+
+
+def test_write_files_reports_written_and_unchanged(tmp_path):
+    (tmp_path / "a.view.lkml").write_text("a")
+    files = [
+        (str(tmp_path / f"{name}.view.lkml"), name) for name in ["a", "b", "c"]
+    ]
+    report = writer.write_files(files, threads=2)
+    assert report.written == [files[1][0], files[2][0]]
+    assert report.unchanged == [files[0][0]]
+    assert sorted(os.listdir(tmp_path)) == ["a.view.lkml", "b.view.lkml", "c.view.lkml"]
+    assert writer.write_files([]).written == []
+
+
+@pytest.mark.parametrize("archive_name", ["lookml.zip", "lookml.tar", "lookml.tar.gz", "lookml.tar.xz"])
+def test_write_archive(tmp_path, archive_name):
+    files = {"views/a.view.lkml": "view: a {}", "a.model.lkml": "explore: a {}"}
+    archive_path = str(tmp_path / archive_name)
+    writer.write_archive(files, archive_path)
+    assert os.listdir(tmp_path) == [archive_name]
+    if archive_name.endswith(".zip"):
+        with zipfile.ZipFile(archive_path) as archive:
+            assert {name: archive.read(name).decode() for name in archive.namelist()} == files
+    else:
+        with tarfile.open(archive_path) as archive:
+            assert {
+                member.name: archive.extractfile(member).read().decode()
+                for member in archive.getmembers()
+            } == files
+
+
+def test_write_archive_unsupported_extension(tmp_path):
+    with pytest.raises(ValueError):
+        writer.write_archive({"a.view.lkml": "a"}, str(tmp_path / "lookml.rar"))
+    assert os.listdir(tmp_path) == []
+
+
+def test_write_to_directory(tmp_path):
+    files = {"views/a.view.lkml": "view: a {}", "a.model.lkml": "explore: a {}"}
+    report = writer.write_to_directory(files, str(tmp_path / "lookml"))
+    assert len(report.written) == 2
+    assert (tmp_path / "lookml" / "views" / "a.view.lkml").read_text() == "view: a {}"
+    assert (tmp_path / "lookml" / "a.model.lkml").read_text() == "explore: a {}"
@@ -1,5 +1,5 @@
 import argparse
-import json
+import functools
 import logging
 import pathlib
 import os
@@ -18,24 +18,45 @@ except ImportError:
 
 from . import parser
 from . import generator
+from . import incremental
+from . import loader
 from . import models
+from . import parallel
+from . import profiling
+from . import selection
+from . import validation_cache
+from . import watch
+from . import writer
 
 MANIFEST_PATH = './manifest.json'
 DEFAULT_LOOKML_OUTPUT_DIR = './lookml'
 
 
-def get_manifest(prefix: str):
-    manifest_path = os.path.join(prefix, 'manifest.json')
+def get_manifest(prefix: str, streaming: bool = False, profiler=profiling.NULL_PROFILER, json_decoder=None,
+                 use_mmap: bool = False, full_validation: bool = False, jobs: int = 1,
+                 validation_cache_dir: str = None,
+                 validation_cache_size: int = validation_cache.DEFAULT_MAX_ENTRIES):
+    def load(manifest_path, streaming, decoder, use_mmap):
+        try:
+            return loader.load_manifest(manifest_path, streaming=streaming, decoder=decoder, use_mmap=use_mmap)
+        except FileNotFoundError as e:
+            logging.error(f'Could not find manifest file at {manifest_path}. Use --target-dir to change the search path for the manifest.json file.')
+            raise SystemExit('Failed')
+
+    return validation_cache.load_validated_manifest(
+        os.path.join(prefix, 'manifest.json'), load, streaming=streaming, profiler=profiler,
+        json_decoder=json_decoder, use_mmap=use_mmap, full_validation=full_validation, jobs=jobs,
+        validation_cache_dir=validation_cache_dir, validation_cache_size=validation_cache_size,
+    )
+
+
+def get_state_manifest(state_dir: str):
+    manifest_path = os.path.join(state_dir, 'manifest.json')
     try:
-        with open(manifest_path, 'r') as f:
-            raw_manifest = json.load(f)
+        return loader.load_manifest(manifest_path)
     except FileNotFoundError as e:
-        logging.error(f'Could not find manifest file at {manifest_path}. Use --target-dir to change the search path for the manifest.json file.')
+        logging.error(f'Could not find the manifest of the previous run at {manifest_path}. Use --state to change the search path.')
         raise SystemExit('Failed')
-    parser.validate_manifest(raw_manifest)
-    logging.debug(f'Detected valid manifest at {manifest_path}')
-    return raw_manifest
-
 
 
 def get_dbt_project_config(prefix: str):
@@ -74,6 +95,24 @@ def run():
         help='Filter to dbt models using this tag',
         type=str,
     )
+    argparser.add_argument(
+        '--select',
+        help='Only convert the models and exposures matching these dbt style selectors: names, tag:, path:, '
+             'state:modified and state:new, with + graph operators, e.g. "+tag:finance orders+"',
+        nargs='+',
+        type=str,
+    )
+    argparser.add_argument(
+        '--exclude',
+        help='Skip the models and exposures matching these dbt style selectors',
+        nargs='+',
+        type=str,
+    )
+    argparser.add_argument(
+        '--state',
+        help='Path to a directory containing the manifest.json of a previous run, compared to by state: selectors',
+        type=str,
+    )
     argparser.add_argument(
         '--log-level',
         help='Set level of logs. Default is INFO',
@@ -87,58 +126,357 @@ def run():
         default=DEFAULT_LOOKML_OUTPUT_DIR,
         type=str,
     )
+    argparser.add_argument(
+        '--streaming-manifest',
+        help='Stream manifest.json and keep only model nodes, exposures and metadata in memory',
+        action='store_true',
+    )
+    argparser.add_argument(
+        '--mmap-manifest',
+        help='Memory map manifest.json and decode it from the mapping instead of reading it into memory first',
+        action='store_true',
+    )
+    argparser.add_argument(
+        '--json-decoder',
+        help='JSON decoder used to read manifest.json, "auto" picks the fastest installed one. '
+             f'Default is auto, installed: {", ".join(loader.available_decoders())}',
+        choices=[loader.AUTO_DECODER, *loader.KNOWN_DECODERS],
+        default=loader.AUTO_DECODER,
+        type=str,
+    )
+    argparser.add_argument(
+        '--full-validation',
+        help='Validate the whole manifest against the dbt manifest schema. By default only the metadata, '
+             'model nodes and exposures dbt2looker reads are validated',
+        action='store_true',
+    )
+    argparser.add_argument(
+        '--validation-cache',
+        help='Skip validating a manifest that passed validation in a previous run, recorded in this directory. '
+             f'Without a directory the results are kept in {validation_cache.default_cache_dir()}',
+        nargs='?',
+        const=validation_cache.default_cache_dir(),
+        type=str,
+    )
+    argparser.add_argument(
+        '--validation-cache-size',
+        help='Number of validated manifests remembered in --validation-cache, the least recently used are removed. '
+             f'Default is {validation_cache.DEFAULT_MAX_ENTRIES}',
+        default=validation_cache.DEFAULT_MAX_ENTRIES,
+        type=int,
+    )
+    argparser.add_argument(
+        '--incremental',
+        help=f'Only regenerate lookml files whose dbt model or exposure changed since the last run, '
+             f'using the {incremental.STATE_FILENAME} state file in the output directory',
+        action='store_true',
+    )
+    argparser.add_argument(
+        '--jobs',
+        help='Number of processes used to validate the manifest and generate lookml files, 0 uses one per CPU. Default is 1',
+        default=1,
+        type=int,
+    )
+    argparser.add_argument(
+        '--output-archive',
+        help='Write all lookml files into this archive instead of --output-dir. '
+             f'The format follows the extension: .zip, {", ".join(writer.TAR_MODES)}',
+        type=str,
+    )
+    argparser.add_argument(
+        '--watch',
+        help='Keep running and regenerate the lookml files of the changed dbt models and exposures '
+             'every time manifest.json or dbt_project.yml changes. Implies --incremental',
+        action='store_true',
+    )
+    argparser.add_argument(
+        '--watch-interval',
+        help=f'Seconds between two checks for changes in --watch mode. Default is {watch.DEFAULT_POLL_INTERVAL}',
+        default=watch.DEFAULT_POLL_INTERVAL,
+        type=float,
+    )
+    argparser.add_argument(
+        '--profile-report',
+        help='Write the wall time, CPU time, peak RSS and item counts of each stage to this json file',
+        type=str,
+    )
+    argparser.add_argument(
+        '--cprofile',
+        help='Run the conversion under cProfile and write the pstats data to this file',
+        type=str,
+    )
+    argparser.add_argument(
+        '--tracemalloc',
+        help='Trace memory allocations during the conversion and write the top allocation sites to this file',
+        type=str,
+    )
+    argparser.add_argument(
+        '--tracemalloc-top',
+        help=f'Number of allocation sites in the --tracemalloc report. Default is {profiling.DEFAULT_TRACEMALLOC_TOP}',
+        default=profiling.DEFAULT_TRACEMALLOC_TOP,
+        type=int,
+    )
     args = argparser.parse_args()
-    run_convert(args.target_dir, args.project_dir, args.output_dir, args.tag, args.log_level)
+    convert_kwargs = dict(
+        output_dir=args.output_dir,
+        tag=args.tag,
+        log_level=args.log_level,
+        streaming_manifest=args.streaming_manifest,
+        json_decoder=args.json_decoder,
+        mmap_manifest=args.mmap_manifest,
+        full_validation=args.full_validation,
+        validation_cache_dir=args.validation_cache,
+        validation_cache_size=args.validation_cache_size,
+        jobs=args.jobs,
+        output_archive=args.output_archive,
+        profile_report=args.profile_report,
+        select=args.select,
+        exclude=args.exclude,
+        state_dir=args.state,
+        cprofile_output=args.cprofile,
+        tracemalloc_output=args.tracemalloc,
+        tracemalloc_top=args.tracemalloc_top,
+    )
+    if args.watch:
+        watch_convert(args.target_dir, args.project_dir, interval=args.watch_interval, **convert_kwargs)
+    else:
+        run_convert(args.target_dir, args.project_dir, incremental_run=args.incremental, **convert_kwargs)
+
 
-   
-def run_convert(target_dir='./target', project_dir='./', output_dir=DEFAULT_LOOKML_OUTPUT_DIR, tag=None, log_level='INFO'):
+def configure_logging(log_level: str):
     logging.basicConfig(
         level=getattr(logging, log_level),
         format='%(asctime)s %(levelname)-6s %(message)s',
         datefmt='%H:%M:%S',
     )
 
+
+def watch_convert(target_dir='./target', project_dir='./', interval=watch.DEFAULT_POLL_INTERVAL, max_runs=None,
+                  **convert_kwargs):
+    """Run ``run_convert`` incrementally every time manifest.json or dbt_project.yml changes.
+
+    The process stays warm between runs: imports and the compiled manifest
+    schema are reused, and so are the typed dbt models and exposures whose
+    raw node did not change. A failed conversion is logged and the next
+    change is waited for. ``max_runs`` stops watching after that many runs.
+    """
+    configure_logging(convert_kwargs.get('log_level', 'INFO'))
+    if convert_kwargs.get('output_archive') or convert_kwargs.get('in_memory'):
+        logging.error('--watch only works when writing to an output directory')
+        raise SystemExit('Failed')
+    parsed_nodes = parser.ParsedNodeCache()
+
+    def convert():
+        try:
+            run_convert(target_dir, project_dir, incremental_run=True, parsed_nodes=parsed_nodes, **convert_kwargs)
+        except SystemExit:
+            logging.error('Conversion failed, waiting for the next change')
+        except Exception:
+            logging.exception('Conversion failed, waiting for the next change')
+
+    paths = [os.path.join(target_dir, 'manifest.json'), os.path.join(project_dir, 'dbt_project.yml')]
+    logging.info(f'Watching {" and ".join(paths)} for changes, press Ctrl+C to stop')
+    try:
+        return watch.watch_files(paths, convert, interval=interval, max_runs=max_runs)
+    except KeyboardInterrupt:
+        logging.info('Stopped watching')
+
+
+@profiling.profiled
+def run_convert(target_dir='./target', project_dir='./', output_dir=DEFAULT_LOOKML_OUTPUT_DIR, tag=None, log_level='INFO',
+                streaming_manifest=False, incremental_run=False, jobs=1, output_archive=None, in_memory=False,
+                profile_report=None, select=None, exclude=None, state_dir=None, parsed_nodes=None,
+                raw_manifest=None, json_decoder=None, mmap_manifest=False,
+                full_validation=False, validation_cache_dir=None,
+                validation_cache_size=validation_cache.DEFAULT_MAX_ENTRIES):
+    """Convert the dbt manifest to lookml files.
+
+    Files are written below ``output_dir``, or into the zip/tar ``output_archive``
+    when given. With ``in_memory`` nothing is written and the files are returned
+    as a ``{relative path: contents}`` mapping. ``profile_report`` is the path of
+    a json report of the time and memory spent in each stage.
+
+    ``select`` and ``exclude`` are lists of dbt style selectors restricting the
+    run to part of the project, ``state_dir`` holds the manifest.json the
+    ``state:`` selectors compare to. Lookml files of the other nodes are left
+    as they are. ``parsed_nodes`` is a ``parser.ParsedNodeCache`` reused
+    across the runs of a long running process, which can also pass an already
+    validated ``raw_manifest`` instead of having it read from ``target_dir``.
+    ``json_decoder`` names the decoder of manifest.json, see ``loader.get_decoder``,
+    and ``mmap_manifest`` decodes it from a memory mapping of the file.
+    ``full_validation`` validates every section of the manifest, not only the
+    metadata, model nodes and exposures. A manifest that passed validation is
+    not validated again when ``validation_cache_dir`` is given, the directory
+    keeps the ``validation_cache_size`` most recently used results.
+
+    ``cprofile_output``, ``tracemalloc_output`` and ``tracemalloc_top`` run the
+    conversion under cProfile and tracemalloc, see ``profiling.profiled_run``.
+    """
+    configure_logging(log_level)
+    if incremental_run and (output_archive or in_memory):
+        logging.error('--incremental only works when writing to an output directory')
+        raise SystemExit('Failed')
+    if output_archive:
+        try:
+            writer.archive_format(output_archive)
+        except ValueError as e:
+            logging.error(str(e))
+            raise SystemExit('Failed')
+
+    profiler = profiling.stage_profiler('run_convert', profile_report)
+
     # Load raw manifest file
-    raw_manifest = get_manifest(prefix=target_dir)
+    if raw_manifest is None:
+        raw_manifest = get_manifest(
+            prefix=target_dir, streaming=streaming_manifest, profiler=profiler, json_decoder=json_decoder,
+            use_mmap=mmap_manifest, full_validation=full_validation, jobs=jobs,
+            validation_cache_dir=validation_cache_dir, validation_cache_size=validation_cache_size,
+        )
     raw_config = get_dbt_project_config(prefix=project_dir)
 
+    partial_run = bool(select or exclude)
+    selected_names = selected_exposure_ids = None
+    if partial_run:
+        with profiler.stage('select') as stage:
+            previous_manifest = get_state_manifest(state_dir) if state_dir else None
+            graph = selection.ManifestGraph(raw_manifest)
+            try:
+                selected = selection.select_nodes(graph, select, exclude, previous_manifest)
+            except ValueError as e:
+                logging.error(str(e))
+                raise SystemExit('Failed')
+            selected_names, selected_exposure_ids = selection.split_selection(graph, selected)
+            stage.count(models=len(selected_names), exposures=len(selected_exposure_ids))
+        logging.info(f'Selected {len(selected_names)} models and {len(selected_exposure_ids)} exposures')
+
     # Get dbt models from manifestpo
-    dbt_project_config = parser.parse_dbt_project_config(raw_config)
-    typed_dbt_models = parser.parse_typed_models(raw_manifest, dbt_project_config.name, tag=tag)
-    typed_dbt_exposures: List[models.DbtExposure] = parser.parse_exposures(raw_manifest, tag=tag)
-    adapter_type = parser.parse_adapter_type(raw_manifest)
+    with profiler.stage('parse') as stage:
+        dbt_project_config = parser.parse_dbt_project_config(raw_config)
+        parse_manifest = parsed_nodes.parse_manifest if parsed_nodes is not None else parser.parse_manifest
+        manifest = parse_manifest(parser.select_raw_manifest(
+            raw_manifest, tag=tag, names=selected_names, exposure_ids=selected_exposure_ids,
+        ))
+        typed_dbt_models = parser.parse_typed_models(manifest, dbt_project_config.name, tag=tag)
+        typed_dbt_exposures: List[models.DbtExposure] = parser.parse_exposures(manifest, tag=tag)
+        adapter_type = parser.parse_adapter_type(manifest)
+        if profiler.enabled:
+            stage.count(
+                models=len(typed_dbt_models),
+                columns=sum(len(model.columns) for model in typed_dbt_models),
+                exposures=len(typed_dbt_exposures),
+            )
+    state = incremental.IncrementalState.load(output_dir) if incremental_run else None
 
 
     # Generate lookml views
-    lookml_views = [
-        generator.lookml_view_from_dbt_model(model, adapter_type)
-        for model in typed_dbt_models
-    ]
-        
-    pathlib.Path(os.path.join(output_dir, 'views')).mkdir(parents=True, exist_ok=True)
-    for view in lookml_views:
-        with open(os.path.join(output_dir, 'views', view.filename), 'w') as f:
-            f.write(view.contents)
+    with profiler.stage('views') as stage:
+        generate_view = functools.partial(generator.lookml_view_from_dbt_model, adapter_type=adapter_type)
+        if state is None:
+            lookml_views = parallel.map_in_pool(generate_view, typed_dbt_models, jobs)
+        else:
+            lookml_views = state.generate(
+                typed_dbt_models,
+                # Keyed by the view file, models of the same name overwrite it
+                key=lambda model: f'view.{model.name}',
+                fingerprint=lambda model: incremental.fingerprint(model, adapter_type),
+                generate=generate_view,
+                directory='views',
+                jobs=jobs,
+            )
+        generator.log_unsupported_column_types(lookml_views, adapter_type)
+        stage.count(views=len(lookml_views))
+
+    # Output paths are relative to the output directory and use '/' so the
+    # same bundle can be written to disk or into an archive
+    lookml_files = {f'views/{view.filename}': view.contents for view in lookml_views}
 
     logging.info(f'Generated {len(lookml_views)} lookml views in {os.path.join(output_dir, "views")}')
 
     # Generate Lookml models
-    manifest = models.DbtManifest(**raw_manifest)
-    lookml_models = [
-        generator.lookml_model_from_dbt_model(manifest, model, dbt_project_config.name)
-        for model in typed_dbt_models
-        if parser.tags_match(tag, model) and model.create_explorer
-    ]
-    lookml_models_exposures = [
-        generator.lookml_model_from_dbt_model(manifest, exposure, dbt_project_config.name)
-        for exposure in typed_dbt_exposures
-    ]
-    for model in lookml_models + lookml_models_exposures:
-        with open(os.path.join(output_dir, model.filename), 'w') as f:
-            f.write(model.contents)
+    with profiler.stage('explores') as stage:
+        # Every explore is named after its exposure. Models only get an explore
+        # of their own when they carry the requested tag, untagged runs build
+        # explores from exposures alone.
+        model_filenames = generator.exposure_model_filenames(manifest, dbt_project_config.name)
+        explore_models, unmatched_models = generator.split_by_exposure(
+            (model for model in typed_dbt_models if parser.tags_match(tag, model) and model.create_explorer),
+            model_filenames,
+        )
+        explore_exposures, unmatched_exposures = generator.split_by_exposure(typed_dbt_exposures, model_filenames)
+        if unmatched_models:
+            logging.warning(
+                f'No exposure found for {len(unmatched_models)} models tagged {tag}, skipping their lookml models: '
+                f'{", ".join(model.name for model in unmatched_models)}'
+            )
+        for node in unmatched_exposures:
+            logging.warning(
+                f'No exposure exposure.{dbt_project_config.name}.{node.name} found for {node.unique_id}, '
+                f'skipping its lookml model'
+            )
+        generate_explore = functools.partial(
+            generator.lookml_model_from_index,
+            model_filenames=model_filenames,
+            dbt_project_name=dbt_project_config.name,
+        )
+        if state is None:
+            lookml_models = parallel.map_in_pool(generate_explore, explore_models, jobs)
+            lookml_models_exposures = parallel.map_in_pool(generate_explore, explore_exposures, jobs)
+        else:
+            def explore_fingerprint(node):
+                return incremental.fingerprint(node, dbt_project_config.name, model_filenames[node.name])
+
+            # A model and the exposure of the same name write the same file, keyed
+            # by that file the exposure wins as it does when both are written
+            explores = state.generate(
+                explore_models + explore_exposures,
+                key=lambda node: f'explore.{model_filenames[node.name]}',
+                fingerprint=explore_fingerprint,
+                generate=generate_explore,
+                jobs=jobs,
+            )
+            exposure_filenames = {model_filenames[exposure.name] for exposure in explore_exposures}
+            lookml_models = [model for model in explores if model.filename not in exposure_filenames]
+            lookml_models_exposures = [model for model in explores if model.filename in exposure_filenames]
+        stage.count(explores=len(lookml_models) + len(lookml_models_exposures))
+    lookml_files.update(
+        (model.filename, model.contents)
+        for model in lookml_models + lookml_models_exposures
+    )
 
 
     logging.info(f'Generated {len(lookml_models)} lookml models in {output_dir}')
     logging.info(f'Generated {len(lookml_models_exposures)} lookml exposure models in {output_dir}')
+    if in_memory:
+        profiler.write(profile_report)
+        logging.info('Success')
+        return lookml_files
+    with profiler.stage('write') as stage:
+        if output_archive:
+            writer.write_archive(lookml_files, output_archive)
+            logging.info(f'Wrote {len(lookml_files)} lookml files to {output_archive}')
+            if profiler.enabled:
+                stage.count(files_written=len(lookml_files), bytes_written=os.path.getsize(output_archive))
+        else:
+            pathlib.Path(os.path.join(output_dir, 'views')).mkdir(parents=True, exist_ok=True)
+            report = writer.write_to_directory(lookml_files, output_dir)
+            if profiler.enabled:
+                written = set(report.written)
+                stage.count(
+                    files_written=len(report.written),
+                    files_unchanged=len(report.unchanged),
+                    bytes_written=sum(
+                        len(contents.encode())
+                        for path, contents in lookml_files.items()
+                        if os.path.join(output_dir, path) in written
+                    ),
+                )
+        if state is not None:
+            # Models filtered out by tag or selector are still in the project,
+            # the files an earlier run wrote for them are kept
+            if partial_run or tag:
+                state.keep_unvisited()
+            else:
+                state.remove_stale()
+            state.save()
+    profiler.write(profile_report)
     logging.info('Success')
-
@@ -5,16 +5,24 @@ from .utils import (
     configure_logging
 )
 from .config import config
-from ..parser import (
-    parse_dbt_project_config,
+from yoda_dbt2looker.core.parser import (
+    parse_manifest,
+    parse_typed_models,
     parse_adapter_type,
+    select_raw_manifest,
 )
-from yoda_dbt2looker.core.parser import parse_typed_models
 from yoda_dbt2looker.core.generator import generate_lookml_views
+from yoda_dbt2looker.profiling import profiled, stage_profiler
+from yoda_dbt2looker.validation_cache import DEFAULT_MAX_ENTRIES
+from yoda_dbt2looker.writer import archive_format
 
 
+@profiled
 def convert(target_dir=config.TARGET_DIR, project_dir=config.PROJECT_DIR, output_dir=config.LOOKML_OUTPUT_DIR,
-            tag=None, log_level=config.LOG_LEVEL):
+            tag=None, log_level=config.LOG_LEVEL, streaming_manifest=False, jobs=1,
+            output_archive=None, in_memory=False, profile_report=None, parsed_nodes=None, raw_manifest=None,
+            json_decoder=None, mmap_manifest=False, full_validation=False, validation_cache_dir=None,
+            validation_cache_size=DEFAULT_MAX_ENTRIES):
     """
     Convert dbt models to LookML views and models.
 
@@ -35,15 +43,71 @@ def convert(target_dir=config.TARGET_DIR, project_dir=config.PROJECT_DIR, output
     :type tag: str, optional
     :param log_level: The level of logging detail (default: config.LOG_LEVEL).
     :type log_level: str
+    :param streaming_manifest: Stream the manifest and keep only model nodes, exposures and metadata (default: False).
+    :type streaming_manifest: bool
+    :param jobs: The number of processes used to validate the manifest and generate the views, 0 uses one per CPU (default: 1).
+    :type jobs: int
+    :param output_archive: A .zip or .tar(.gz|.bz2|.xz) archive to write the LookML files into instead of output_dir (default: None).
+    :type output_archive: str, optional
+    :param in_memory: Return the LookML files instead of writing them (default: False).
+    :type in_memory: bool
+    :param profile_report: A json file to write the wall time, CPU time, peak RSS and item counts of each stage to (default: None).
+    :type profile_report: str, optional
+    :param parsed_nodes: A yoda_dbt2looker.parser.ParsedNodeCache of core nodes reused across the runs of a long running process (default: None).
+    :type parsed_nodes: yoda_dbt2looker.parser.ParsedNodeCache, optional
+    :param raw_manifest: An already validated manifest to convert instead of reading it from target_dir (default: None).
+    :type raw_manifest: dict, optional
+    :param json_decoder: The json decoder of the manifest, one of yoda_dbt2looker.loader.JSON_DECODERS, the fastest installed one by default (default: None).
+    :type json_decoder: str, optional
+    :param mmap_manifest: Memory map the manifest and decode it from the mapping instead of reading it into memory first (default: False).
+    :type mmap_manifest: bool
+    :param full_validation: Validate every section of the manifest instead of only the metadata, model nodes and exposures (default: False).
+    :type full_validation: bool
+    :param validation_cache_dir: A directory recording the manifests that passed validation, which are not validated again (default: None).
+    :type validation_cache_dir: str, optional
+    :param validation_cache_size: The number of validated manifests kept in validation_cache_dir (default: 32).
+    :type validation_cache_size: int
+    :param cprofile_output: A file to write the cProfile pstats data of the conversion to (default: None).
+    :type cprofile_output: str, optional
+    :param tracemalloc_output: A file to write the top memory allocation sites of the conversion to (default: None).
+    :type tracemalloc_output: str, optional
+    :param tracemalloc_top: The number of allocation sites in the tracemalloc report (default: 25).
+    :type tracemalloc_top: int
 
-    :returns: None
+    :returns: A mapping of file name to LookML contents when in_memory is set, None otherwise.
+    :rtype: dict, optional
 
     :raises SystemExit: If there is an error in loading, parsing, or processing the dbt files, the function will terminate the program.
     """
     configure_logging(log_level)
-    raw_manifest = get_manifest(prefix=target_dir)
-    typed_dbt_models = parse_typed_models(raw_manifest, tag=tag)
-    adapter_type = parse_adapter_type(raw_manifest)
+    if output_archive:
+        try:
+            archive_format(output_archive)
+        except ValueError as e:
+            logging.error(str(e))
+            raise SystemExit('Failed')
+    profiler = stage_profiler('convert', profile_report)
+    if raw_manifest is None:
+        raw_manifest = get_manifest(
+            prefix=target_dir, streaming=streaming_manifest, profiler=profiler, json_decoder=json_decoder,
+            use_mmap=mmap_manifest, full_validation=full_validation, jobs=jobs,
+            validation_cache_dir=validation_cache_dir, validation_cache_size=validation_cache_size,
+        )
+    with profiler.stage('parse') as stage:
+        parse = parsed_nodes.parse_manifest if parsed_nodes is not None else parse_manifest
+        manifest = parse(select_raw_manifest(raw_manifest, tag=tag))
+        typed_dbt_models = parse_typed_models(manifest, tag=tag)
+        adapter_type = parse_adapter_type(manifest)
+        if profiler.enabled:
+            stage.count(
+                models=len(typed_dbt_models),
+                columns=sum(len(model.columns) for model in typed_dbt_models),
+            )
 
-    generate_lookml_views(typed_dbt_models, adapter_type, output_dir)
+    lookml_files = generate_lookml_views(
+        typed_dbt_models, adapter_type, output_dir, jobs=jobs,
+        output_archive=output_archive, in_memory=in_memory, profiler=profiler,
+    )
+    profiler.write(profile_report)
     logging.info('Convertion finished successfully')
+    return lookml_files
@@ -1,5 +1,6 @@
 import logging
-from typing import List
+from functools import partial
+from typing import Dict, List, Optional
 from yoda_dbt2looker.core.models import DbtModel
 import lkml
 
@@ -8,31 +9,54 @@ from yoda_dbt2looker.models import (
     LookViewFile
 )
 from yoda_dbt2looker.generator import (
+    ClassifiedColumns,
+    classify_columns,
+    count_unsupported_columns,
+    log_unsupported_column_types,
     lookml_date_time_dimension_group,
-    map_adapter_type_to_looker,
     lookml_date_dimension_group,
-    looker_date_time_types,
-    looker_date_types,
-    looker_scalar_types,
     _generate_compound_primary_key_if_needed
 )
 from yoda_dbt2looker.core.utils import write_list_of_lookml_views
+from yoda_dbt2looker.parallel import map_in_pool
+from yoda_dbt2looker.profiling import NULL_PROFILER
+from yoda_dbt2looker.writer import write_archive
 from yoda_dbt2looker.core.config import config
 
 
-def generate_lookml_views(dbt_models: List[DbtModel], adapter_type: str, output_dir: str) -> None:
-    views = [lookml_view_from_dbt_model(model, SupportedDbtAdapters(adapter_type)) for model in dbt_models]
-    write_list_of_lookml_views(views, output_dir)
+def generate_lookml_views(
+        dbt_models: List[DbtModel], adapter_type: str, output_dir: str, jobs: int = 1,
+        output_archive: Optional[str] = None, in_memory: bool = False, profiler=NULL_PROFILER,
+) -> Optional[Dict[str, str]]:
+    with profiler.stage('views') as stage:
+        views = map_in_pool(partial(_lookml_view_for_adapter, SupportedDbtAdapters(adapter_type)), dbt_models, jobs)
+        log_unsupported_column_types(views, adapter_type)
+        stage.count(views=len(views))
+    if in_memory:
+        return {view.filename: view.contents for view in views}
+    with profiler.stage('write') as stage:
+        if output_archive:
+            write_archive({view.filename: view.contents for view in views}, output_archive)
+        else:
+            write_list_of_lookml_views(views, output_dir)
+        if profiler.enabled:
+            stage.count(files_written=len(views), bytes_written=sum(len(view.contents.encode()) for view in views))
+    return None
+
+
+def _lookml_view_for_adapter(adapter_type: SupportedDbtAdapters, model: DbtModel) -> LookViewFile:
+    return lookml_view_from_dbt_model(model, adapter_type)
 
 
 def lookml_view_from_dbt_model(model: DbtModel, adapter_type: SupportedDbtAdapters) -> LookViewFile:
     view_name = model.meta.migrated_from_model or model.name
+    classified = classify_columns(model, adapter_type)
     lookml = {
         "view": {
             "name": view_name,
             "sql_table_name": get_model_relation_name(model),
-            "dimension_groups": lookml_dimension_groups_from_model(model, adapter_type),
-            "dimensions": lookml_dimensions_from_model(model, adapter_type),
+            "dimension_groups": lookml_dimension_groups_from_model(model, adapter_type, classified),
+            "dimensions": lookml_dimensions_from_model(model, adapter_type, classified),
             # no measures will be created based on dbt models.
             "measures": [],
         }
@@ -48,7 +72,11 @@ def lookml_view_from_dbt_model(model: DbtModel, adapter_type: SupportedDbtAdapte
     except Exception as e:
         logging.error(f"Error dumping lookml for model {model.name}")
         raise e
-    return LookViewFile(filename=f"{view_name}.view.lkml", contents=contents)
+    return LookViewFile(
+        filename=f"{view_name}.view.lkml",
+        contents=contents,
+        unsupported_column_types=count_unsupported_columns(classified),
+    )
 
 
 def get_model_relation_name(model: DbtModel):
@@ -60,44 +88,42 @@ def get_model_relation_name(model: DbtModel):
 
 
 def lookml_dimension_groups_from_model(
-        model: DbtModel, adapter_type: SupportedDbtAdapters
+        model: DbtModel, adapter_type: SupportedDbtAdapters, classified: Optional[ClassifiedColumns] = None
 ):
+    if classified is None:
+        classified = classify_columns(model, adapter_type)
     date_times = [
-        lookml_date_time_dimension_group(column, adapter_type)
-        for column in model.columns.values()
-        if map_adapter_type_to_looker(adapter_type, column.data_type)
-           in looker_date_time_types
+        lookml_date_time_dimension_group(column, adapter_type, looker_type)
+        for column, looker_type in classified.date_times
     ]
     dates = [
-        lookml_date_dimension_group(column, adapter_type)
-        for column in model.columns.values()
+        lookml_date_dimension_group(column, adapter_type, looker_type)
+        for column, looker_type in classified.dates
         if column.meta.dimension.enabled
-           and map_adapter_type_to_looker(adapter_type, column.data_type)
-           in looker_date_types
     ]
 
     return date_times + dates
 
 
-def lookml_dimensions_from_model(model: DbtModel, adapter_type: SupportedDbtAdapters):
+def lookml_dimensions_from_model(model: DbtModel, adapter_type: SupportedDbtAdapters,
+                                 classified: Optional[ClassifiedColumns] = None):
+    if classified is None:
+        classified = classify_columns(model, adapter_type)
     dimensions = [
         {
             'name': column.meta.dimension.name or column.name,
-            'type': map_adapter_type_to_looker(adapter_type, column.data_type),
+            'type': looker_type,
             'sql': column.meta.dimension.sql or f'${{TABLE}}.{column.name}',
             'description': column.meta.dimension.description or column.description,
             **({"primary_key": "yes"} if model.meta.primary_key == column.name else {}),
             **(
                 {'value_format_name': column.meta.dimension.value_format_name.value}
-                if (column.meta.dimension.value_format_name
-                    and map_adapter_type_to_looker(adapter_type, column.data_type) == 'number')
+                if (column.meta.dimension.value_format_name and looker_type == 'number')
                 else {}
             )
         }
-        for column in model.columns.values()
+        for column, looker_type in classified.scalars
         if column.meta.dimension.enabled
-           and map_adapter_type_to_looker(adapter_type, column.data_type)
-           in looker_scalar_types
     ]
     compound_key = _generate_compound_primary_key_if_needed(model)
     if compound_key:
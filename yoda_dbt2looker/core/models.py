@@ -10,7 +10,9 @@ from yoda_dbt2looker.models import (
     DbtNode,
     DbtModelColumn,
     ModelIntegrationConfigMetadata,
-    DbtManifestMetadata
+    DbtManifestMetadata,
+    lowercase_column_names,
+    parse_nodes_by_resource_type,
 )
 
 
@@ -35,14 +37,18 @@ class DbtModel(DbtNode):
     meta: DbtModelMeta
     config: DbtModelConfig
 
-    @validator("columns")
-    def case_insensitive_column_names(cls, v: Dict[str, DbtModelColumn]):
-        return {
-            name.lower(): column.copy(update={"name": column.name.lower()})
-            for name, column in v.items()
-        }
+    @validator("columns", pre=True)
+    def case_insensitive_column_names(cls, v):
+        return lowercase_column_names(v)
 
 
 class DbtManifest(BaseModel):
     nodes: Dict[str, Union[DbtModel, DbtNode]]
     metadata: DbtManifestMetadata
+
+    class Config:
+        smart_union = True
+
+    @validator("nodes", pre=True)
+    def nodes_by_resource_type(cls, v):
+        return parse_nodes_by_resource_type(v, {"model": DbtModel})
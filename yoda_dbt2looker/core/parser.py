@@ -1,17 +1,47 @@
 import logging
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Union
 from functools import reduce
 from yoda_dbt2looker.core.models import (
     DbtModel,
     DbtManifest
 )
+from yoda_dbt2looker.parser import select_raw_models
+
+
+def parse_manifest(raw_manifest: Dict) -> DbtManifest:
+    return DbtManifest(**raw_manifest)
+
+
+def _raw_config_tags(raw_node: Dict) -> Optional[List[str]]:
+    return (raw_node.get("config") or {}).get("tags")
+
+
+def select_raw_manifest(raw_manifest: Dict, tag: Optional[str] = None) -> Dict:
+    """Shallow copy of the raw manifest with only the models matching ``tag``,
+    so only those are validated into ``DbtModel``."""
+    if tag is None:
+        return raw_manifest
+    return {
+        **raw_manifest,
+        "nodes": select_raw_models(raw_manifest["nodes"], tag, get_tags=_raw_config_tags),
+    }
+
+
+def _ensure_manifest(manifest: Union[Dict, DbtManifest], tag: Optional[str] = None) -> DbtManifest:
+    if isinstance(manifest, DbtManifest):
+        return manifest
+    return parse_manifest(select_raw_manifest(manifest, tag=tag))
+
+
+def parse_adapter_type(manifest: Union[Dict, DbtManifest]) -> str:
+    return _ensure_manifest(manifest).metadata.adapter_type
 
 
 def parse_typed_models(
-        raw_manifest: dict,
+        manifest: Union[Dict, DbtManifest],
         tag: Optional[str] = None,
 ):
-    dbt_models = parse_models(raw_manifest, tag=tag)
+    dbt_models = parse_models(manifest, tag=tag)
     logging.debug("Parsed %d models from manifest.json", len(dbt_models))
     if logging.getLogger().isEnabledFor(logging.DEBUG):
         for model in dbt_models:
@@ -34,8 +64,8 @@ def parse_typed_models(
     return dbt_models
 
 
-def parse_models(raw_manifest: Dict, tag: str = None) -> List[DbtModel]:
-    manifest = DbtManifest(**raw_manifest)
+def parse_models(manifest: Union[Dict, DbtManifest], tag: str = None) -> List[DbtModel]:
+    manifest = _ensure_manifest(manifest, tag=tag)
     all_models: List[DbtModel] = [
         node for node in manifest.nodes.values() if node.resource_type == "model"
     ]
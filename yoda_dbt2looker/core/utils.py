@@ -1,8 +1,7 @@
-import json
 import logging
 import os
 import yaml
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from pathlib import Path
 
 try:
@@ -10,7 +9,10 @@ try:
 except ImportError:
     from yaml import Loader
 
-from .. import parser
+from .. import loader
+from .. import profiling
+from .. import validation_cache
+from .. import writer
 from ..models import LookViewFile
 from .config import config
 
@@ -23,23 +25,23 @@ def configure_logging(log_level: str = config.LOG_LEVEL):
     )
 
 
-def write_lookml_file(file_path: str, contents: str) -> None:
-    with open(file_path, 'w') as f:
-        f.write(contents)
-
-
 def write_list_of_lookml_views(views: List[LookViewFile], output_dir: str = config.LOOKML_OUTPUT_DIR) -> None:
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
-    for view in views:
-        file_path = os.path.join(output_dir, view.filename)
-        write_lookml_file(file_path, view.contents)
+    writer.write_files((os.path.join(output_dir, view.filename), view.contents) for view in views)
 
 
-def load_json_file(file_path: Path) -> Dict[str, Any]:
+def load_json_file(file_path: Path, decoder: Optional[str] = None, use_mmap: bool = False) -> Dict[str, Any]:
     try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
+        return loader.load_json(file_path, decoder, use_mmap=use_mmap)
+    except FileNotFoundError:
+        logging.error(f'Could not find file at {file_path}.')
+        raise SystemExit(f'Failed to load json file: {file_path}')
+
+
+def load_streamed_manifest(file_path: Path) -> Dict[str, Any]:
+    try:
+        return loader.load_manifest(file_path, streaming=True)
     except FileNotFoundError:
         logging.error(f'Could not find file at {file_path}.')
         raise SystemExit(f'Failed to load json file: {file_path}')
@@ -54,12 +56,20 @@ def load_yaml_file(file_path: Path) -> Dict[str, Any]:
         raise SystemExit(f'Failed to load yaml file: {file_path}')
 
 
-def get_manifest(prefix: str) -> Dict[str, Any]:
-    manifest_path = os.path.join(prefix, config.MANIFEST_FILENAME)
-    raw_manifest = load_json_file(manifest_path)
-    parser.validate_manifest(raw_manifest)
-    logging.debug(f'Detected valid manifest at {manifest_path}')
-    return raw_manifest
+def get_manifest(prefix: str, streaming: bool = False, profiler=profiling.NULL_PROFILER,
+                 json_decoder: Optional[str] = None, use_mmap: bool = False,
+                 full_validation: bool = False, jobs: int = 1, validation_cache_dir: Optional[str] = None,
+                 validation_cache_size: int = validation_cache.DEFAULT_MAX_ENTRIES) -> Dict[str, Any]:
+    def load(manifest_path: str, streaming: bool, decoder: str, use_mmap: bool) -> Dict[str, Any]:
+        if streaming:
+            return load_streamed_manifest(manifest_path)
+        return load_json_file(manifest_path, decoder, use_mmap=use_mmap)
+
+    return validation_cache.load_validated_manifest(
+        os.path.join(prefix, config.MANIFEST_FILENAME), load, streaming=streaming, profiler=profiler,
+        json_decoder=json_decoder, use_mmap=use_mmap, full_validation=full_validation, jobs=jobs,
+        validation_cache_dir=validation_cache_dir, validation_cache_size=validation_cache_size,
+    )
 
 
 def get_dbt_project_config(prefix: str) -> Dict[str, Any]:
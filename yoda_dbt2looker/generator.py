@@ -1,10 +1,14 @@
 import logging
 import re
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 import lkml
 
 from . import models
+from .refs import OPERATOR_PATTERN, replace_operator_match, resolve_refs
 
 LOOKER_DTYPE_MAP = {
     "bigquery": {
@@ -216,11 +220,11 @@ def normalise_spark_types(column_type: str) -> str:
     return re.match(r"^[^\(]*", column_type).group(0)
 
 
-def map_adapter_type_to_looker(
+@lru_cache(maxsize=None)
+def _resolve_looker_type(
     adapter_type: models.SupportedDbtAdapters, column_type: str
-):
-    if column_type is None:
-        return None
+) -> Optional[str]:
+    # Each distinct (adapter, raw type) pair is resolved once per process
     normalised_column_type = (
         normalise_spark_types(column_type)
         if adapter_type in
@@ -228,23 +232,83 @@ def map_adapter_type_to_looker(
          models.SupportedDbtAdapters.databricks.value]
         else column_type
     )
-    looker_type = LOOKER_DTYPE_MAP[adapter_type].get(normalised_column_type)
-    if (column_type is not None) and (looker_type is None):
+    return LOOKER_DTYPE_MAP[adapter_type].get(normalised_column_type)
+
+
+def map_adapter_type_to_looker(
+    adapter_type: models.SupportedDbtAdapters, column_type: str
+):
+    if column_type is None:
+        return None
+    return _resolve_looker_type(adapter_type, column_type)
+
+
+@dataclass
+class ClassifiedColumns:
+    """Columns of a model bucketed by their looker type, in column order."""
+
+    date_times: List[Tuple[models.DbtModelColumn, str]] = field(default_factory=list)
+    dates: List[Tuple[models.DbtModelColumn, str]] = field(default_factory=list)
+    scalars: List[Tuple[models.DbtModelColumn, str]] = field(default_factory=list)
+    unsupported: List[models.DbtModelColumn] = field(default_factory=list)
+
+
+def classify_columns(
+    model: models.DbtModel, adapter_type: models.SupportedDbtAdapters
+) -> ClassifiedColumns:
+    classified = ClassifiedColumns()
+    for column in model.columns.values():
+        looker_type = map_adapter_type_to_looker(adapter_type, column.data_type)
+        if looker_type in looker_date_time_types:
+            classified.date_times.append((column, looker_type))
+        elif looker_type in looker_date_types:
+            classified.dates.append((column, looker_type))
+        elif looker_type in looker_scalar_types:
+            classified.scalars.append((column, looker_type))
+        elif column.data_type is not None:
+            classified.unsupported.append(column)
+    return classified
+
+
+def count_unsupported_columns(classified: ClassifiedColumns) -> Dict[str, int]:
+    return dict(Counter(column.data_type for column in classified.unsupported))
+
+
+def unsupported_column_types(views: Iterable[models.LookViewFile]) -> Dict[str, int]:
+    """Number of columns per column type that has no looker type.
+
+    Counted from the classification the views were generated with, each view
+    file once even when its model was converted twice.
+    """
+    unique_views = {view.filename: view for view in views}
+    counts = Counter()
+    for view in unique_views.values():
+        counts.update(view.unsupported_column_types)
+    return dict(counts)
+
+
+def log_unsupported_column_types(
+    views: Iterable[models.LookViewFile], adapter_type: models.SupportedDbtAdapters
+) -> None:
+    for column_type, count in unsupported_column_types(views).items():
         logging.warning(
-            f"Column type {column_type} not supported for conversion from {adapter_type} to looker. No dimension will be created."
+            f"Column type {column_type} not supported for conversion from {adapter_type} to looker. "
+            f"No dimension will be created for {count} column{'s' if count > 1 else ''}."
         )
-    return looker_type
 
 
 def lookml_date_time_dimension_group(
-    column: models.DbtModelColumn, adapter_type: models.SupportedDbtAdapters
+    column: models.DbtModelColumn,
+    adapter_type: models.SupportedDbtAdapters,
+    looker_type: Optional[str] = None,
 ):
     return {
         "name": column.meta.dimension.name or column.name,
         "type": "time",
         "sql": column.meta.dimension.sql or f"${{TABLE}}.{column.name}",
         "description": column.meta.dimension.description or column.description,
-        "datatype": map_adapter_type_to_looker(adapter_type, column.data_type),
+        "datatype": looker_type
+        or map_adapter_type_to_looker(adapter_type, column.data_type),
         "timeframes": [
             "raw",
             "time",
@@ -259,33 +323,36 @@ def lookml_date_time_dimension_group(
 
 
 def lookml_date_dimension_group(
-    column: models.DbtModelColumn, adapter_type: models.SupportedDbtAdapters
+    column: models.DbtModelColumn,
+    adapter_type: models.SupportedDbtAdapters,
+    looker_type: Optional[str] = None,
 ):
     return {
         "name": column.meta.dimension.name or column.name,
         "type": "time",
         "sql": column.meta.dimension.sql or f"${{TABLE}}.{column.name}",
         "description": column.meta.dimension.description or column.description,
-        "datatype": map_adapter_type_to_looker(adapter_type, column.data_type),
+        "datatype": looker_type
+        or map_adapter_type_to_looker(adapter_type, column.data_type),
         "timeframes": ["raw", "date", "week", "month", "quarter", "year"],
     }
 
 
 def lookml_dimension_groups_from_model(
-    model: models.DbtModel, adapter_type: models.SupportedDbtAdapters
+    model: models.DbtModel,
+    adapter_type: models.SupportedDbtAdapters,
+    classified: Optional[ClassifiedColumns] = None,
 ):
+    if classified is None:
+        classified = classify_columns(model, adapter_type)
     date_times = [
-        lookml_date_time_dimension_group(column, adapter_type)
-        for column in model.columns.values()
-        if map_adapter_type_to_looker(adapter_type, column.data_type)
-        in looker_date_time_types
+        lookml_date_time_dimension_group(column, adapter_type, looker_type)
+        for column, looker_type in classified.date_times
     ]
     dates = [
-        lookml_date_dimension_group(column, adapter_type)
-        for column in model.columns.values()
+        lookml_date_dimension_group(column, adapter_type, looker_type)
+        for column, looker_type in classified.dates
         if column.meta.dimension.enabled
-        and map_adapter_type_to_looker(adapter_type, column.data_type)
-        in looker_date_types
     ]
 
     exposure_dimension_groups = [
@@ -296,10 +363,12 @@ def lookml_dimension_groups_from_model(
 
 
 def lookml_dimensions_from_model(
-    model: models.DbtModel, adapter_type: models.SupportedDbtAdapters
+    model: models.DbtModel,
+    adapter_type: models.SupportedDbtAdapters,
+    classified: Optional[ClassifiedColumns] = None,
 ):
     compound_key = _generate_compound_primary_key_if_needed(model)
-    dimensions = _generate_dimensions(model, adapter_type)
+    dimensions = _generate_dimensions(model, adapter_type, classified)
     for calculated_dimension in model.calculated_dimension:
         dimensions.append(lookml_calculated_dimension(calculated_dimension))
     if compound_key:
@@ -307,11 +376,17 @@ def lookml_dimensions_from_model(
     return dimensions
 
 
-def _generate_dimensions(model: models.DbtModel, adapter_type):
+def _generate_dimensions(
+    model: models.DbtModel,
+    adapter_type,
+    classified: Optional[ClassifiedColumns] = None,
+):
+    if classified is None:
+        classified = classify_columns(model, adapter_type)
     return [
         {
             "name": column.meta.dimension.name or column.name,
-            "type": map_adapter_type_to_looker(adapter_type, column.data_type),
+            "type": looker_type,
             "sql": column.meta.dimension.sql or f"${{TABLE}}.{column.name}",
             "description": column.meta.dimension.description or column.description,
             **({"primary_key": "yes"} if model.meta.primary_key == column.name else {}),
@@ -319,8 +394,7 @@ def _generate_dimensions(model: models.DbtModel, adapter_type):
                 {"value_format_name": column.meta.dimension.value_format_name.value}
                 if (
                     column.meta.dimension.value_format_name
-                    and map_adapter_type_to_looker(adapter_type, column.data_type)
-                    == "number"
+                    and looker_type == "number"
                 )
                 else {}
             ),
@@ -328,10 +402,8 @@ def _generate_dimensions(model: models.DbtModel, adapter_type):
                 _extract_column_label(model, column)
             ),
         }
-        for column in model.columns.values()
+        for column, looker_type in classified.scalars
         if column.meta.dimension.enabled
-        and map_adapter_type_to_looker(adapter_type, column.data_type)
-        in looker_scalar_types
     ]
 
 
@@ -511,15 +583,21 @@ def lookml_exposure_dimension_group_duration(
     return tmp_dimension_group_duration
 
 
-def lookml_view_from_dbt_model(
-    model: models.DbtModel, adapter_type: models.SupportedDbtAdapters
-):
+def lookml_view_data_from_dbt_model(
+    model: models.DbtModel,
+    adapter_type: models.SupportedDbtAdapters,
+    classified: Optional[ClassifiedColumns] = None,
+) -> dict:
+    if classified is None:
+        classified = classify_columns(model, adapter_type)
     lookml = {
         "view": {
             "name": model.name,
             "sql_table_name": _get_model_relation_name(model),
-            "dimension_groups": lookml_dimension_groups_from_model(model, adapter_type),
-            "dimensions": lookml_dimensions_from_model(model, adapter_type),
+            "dimension_groups": lookml_dimension_groups_from_model(
+                model, adapter_type, classified
+            ),
+            "dimensions": lookml_dimensions_from_model(model, adapter_type, classified),
             "measures": lookml_measures_from_model(model),
         }
     }
@@ -543,13 +621,25 @@ def lookml_view_from_dbt_model(
         len(lookml["view"]["measures"]),
         len(lookml["view"]["dimensions"]),
     )
+    return lookml
+
+
+def lookml_view_from_dbt_model(
+    model: models.DbtModel, adapter_type: models.SupportedDbtAdapters
+):
+    classified = classify_columns(model, adapter_type)
+    lookml = lookml_view_data_from_dbt_model(model, adapter_type, classified)
     try:
         contents = lkml.dump(lookml)
     except Exception as e:
         logging.error(f"Error dumping lookml for model {model.name}")
         raise e
     filename = f"{model.name}.view.lkml"
-    return models.LookViewFile(filename=filename, contents=contents)
+    return models.LookViewFile(
+        filename=filename,
+        contents=contents,
+        unsupported_column_types=count_unsupported_columns(classified),
+    )
 
 
 def _generate_view_label_if_needed(model: models.DbtModel, lookml):
@@ -587,43 +677,18 @@ def lookml_view_from_dbt_exposure(model: models.DbtModel, dbt_project_name: str)
 
 
 def _convert_all_refs_to_relation_name(ref_str: str, handle_spaces: bool = True) -> str:
-    reg_ref = r"ref\(\s*\'(\w*)\'\s*\)"
-    matches = re.findall(reg_ref, ref_str)
-    if not matches or len(matches) == 0:
-        return ref_str
-
-    if handle_spaces:
-        ref_str = _add_leading_spaces_before_and_after_operators(
-            ref_str.replace(" ", "")
-        )
-    for group_value in matches:
-        ref_str = ref_str.replace(f"ref('{group_value}')", group_value)
-    # in case of a compound expression with logical operator , i.e : ${join1} and ${join2} - we would like
-    # to add a space between the logical operator so all elements between }...$ are captured and added a pre and post space
-    ref_str = re.sub(r"}(.*?)\$", r"} \1 $", ref_str)
-    return ref_str
+    return resolve_refs(ref_str, handle_spaces).sql
 
 
 def _add_leading_spaces_before_and_after_operators(sql: str) -> str:
-    pattern = re.compile(r"\b(\w+)\s*([=<>!]+)\s*(\w+)\b")
-    return pattern.sub(replace_operator_match, sql)
-
-
-def replace_operator_match(match) -> str:
-    return f"{match.group(1)} {match.group(2)} {match.group(3)}"
+    return OPERATOR_PATTERN.sub(replace_operator_match, sql)
 
 
 def _extract_all_refs(ref_str: str) -> list[str]:
-    reg_ref = r"ref\(\s*\'(\w*)\'\s*\)"
-    matches = re.findall(reg_ref, ref_str)
-    if not matches or len(matches) == 0:
+    refs = resolve_refs(ref_str).refs
+    if not refs:
         return None
-    refs = []
-    ref_str = ref_str.replace(" ", "")
-    for group_value in matches:
-        refs.append(group_value)
-
-    return refs
+    return list(refs)
 
 
 def lookml_model_data_from_dbt_model(model: models.DbtModel, dbt_project_name: str):
@@ -679,15 +744,57 @@ def lookml_model_data_from_dbt_model(model: models.DbtModel, dbt_project_name: s
     return lkml.dump(lookml)
 
 
+def _exposure_model_filename(exposure: models.DbtExposure) -> str:
+    return f"{Path(exposure.original_file_path).stem}.model.lkml"
+
+
+def exposure_model_filenames(
+    manifest: models.DbtManifest, dbt_project_name: str
+) -> Dict[str, str]:
+    """Lookml model filename for every node name with an exposure in the project.
+
+    A node named ``name`` gets its explore written to the file named after the
+    ``exposure.<dbt_project_name>.<name>`` exposure.
+    """
+    prefix = f"exposure.{dbt_project_name}."
+    return {
+        unique_id[len(prefix):]: _exposure_model_filename(exposure)
+        for unique_id, exposure in manifest.exposures.items()
+        if unique_id.startswith(prefix)
+    }
+
+
+def split_by_exposure(
+    nodes: Iterable[models.DbtNode], model_filenames: Dict[str, str]
+) -> Tuple[List[models.DbtNode], List[models.DbtNode]]:
+    """Split nodes into those with an exposure in ``model_filenames`` and the rest."""
+    matched, unmatched = [], []
+    for node in nodes:
+        (matched if node.name in model_filenames else unmatched).append(node)
+    return matched, unmatched
+
+
+def lookml_model_from_index(
+    model: models.DbtModel, model_filenames: Dict[str, str], dbt_project_name: str
+) -> models.LookModelFile:
+    filename = model_filenames.get(model.name)
+    if filename is None:
+        raise ValueError(
+            f"Cannot name the lookml model of {model.name}: "
+            f"no exposure exposure.{dbt_project_name}.{model.name} in the manifest"
+        )
+    contents = lookml_model_data_from_dbt_model(model, dbt_project_name)
+    return models.LookModelFile(filename=filename, contents=contents)
+
+
 def lookml_model_from_dbt_model(
     manifest: models.DbtManifest, model: models.DbtModel, dbt_project_name: str
 ):
-    contents = lookml_model_data_from_dbt_model(model, dbt_project_name)
-    model_loopup = f"exposure.{dbt_project_name}.{model.name}"
-    exposure_node = manifest.exposures.get(model_loopup)
-    file_name = Path(exposure_node.original_file_path).stem
-    filename = f"{file_name}.model.lkml"
-    return models.LookModelFile(filename=filename, contents=contents)
+    exposure_node = manifest.exposures.get(f"exposure.{dbt_project_name}.{model.name}")
+    model_filenames = (
+        {model.name: _exposure_model_filename(exposure_node)} if exposure_node else {}
+    )
+    return lookml_model_from_index(model, model_filenames, dbt_project_name)
 
 
 def _remove_escape_characters(input_str: str, escape_char: str = "\\") -> str:
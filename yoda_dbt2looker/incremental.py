@@ -0,0 +1,159 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Callable, Dict, Iterable, List, Optional, TypeVar, Union
+
+from pydantic import BaseModel
+
+try:
+    from importlib.metadata import PackageNotFoundError, version
+except ImportError:
+    from importlib_metadata import PackageNotFoundError, version
+
+from . import models
+from . import parallel
+
+STATE_FILENAME = ".dbt2looker_state.json"
+STATE_VERSION = 1
+
+T = TypeVar("T")
+LookFile = Union[models.LookViewFile, models.LookModelFile]
+
+
+def _generator_version() -> str:
+    # Output of a new release may differ for the same node, so the state of
+    # another release is never reused
+    try:
+        return version("yoda-dbt2looker")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def fingerprint(*parts: Union[BaseModel, str, None]) -> str:
+    """Hash of everything a generated LookML file depends on.
+
+    Key order is kept as is: column order drives the order of the generated
+    dimensions, so reordering columns must change the fingerprint.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, BaseModel):
+            part = part.json()
+        digest.update(json.dumps(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class IncrementalState:
+    """Fingerprints of the LookML files written by the previous run.
+
+    Entries are keyed by the dbt node that produced them and hold the
+    fingerprint of that node and the output path relative to ``output_dir``.
+    """
+
+    def __init__(self, output_dir: str, entries: Optional[Dict[str, dict]] = None):
+        self.output_dir = output_dir
+        self._previous = entries or {}
+        self._current: Dict[str, dict] = {}
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.output_dir, STATE_FILENAME)
+
+    @classmethod
+    def load(cls, output_dir: str) -> "IncrementalState":
+        state_path = os.path.join(output_dir, STATE_FILENAME)
+        try:
+            with open(state_path, "r") as f:
+                raw_state = json.load(f)
+        except FileNotFoundError:
+            logging.info(f"No incremental state at {state_path}, generating all files")
+            return cls(output_dir)
+        except ValueError:
+            logging.warning(f"Ignoring unreadable incremental state at {state_path}")
+            return cls(output_dir)
+        if (
+            raw_state.get("version") != STATE_VERSION
+            or raw_state.get("generator") != _generator_version()
+        ):
+            logging.info(f"Incremental state at {state_path} is outdated, generating all files")
+            return cls(output_dir)
+        return cls(output_dir, raw_state.get("entries", {}))
+
+    def unchanged(self, key: str, node_fingerprint: str) -> bool:
+        previous = self._previous.get(key)
+        if (
+            previous
+            and previous["fingerprint"] == node_fingerprint
+            and os.path.exists(os.path.join(self.output_dir, previous["path"]))
+        ):
+            self._current[key] = previous
+            return True
+        return False
+
+    def record(self, key: str, node_fingerprint: str, path: str) -> None:
+        self._current[key] = {"fingerprint": node_fingerprint, "path": path}
+
+    def generate(
+        self,
+        nodes: Iterable[T],
+        key: Callable[[T], str],
+        fingerprint: Callable[[T], str],
+        generate: Callable[[T], LookFile],
+        directory: str = "",
+        jobs: int = 1,
+    ) -> List[LookFile]:
+        """Generate the files of the nodes that changed since the last run.
+
+        Nodes writing the same file must share a key. The last one wins, as it
+        would when every file is written in order. ``generate`` must be
+        picklable when ``jobs`` is more than one.
+        """
+        latest = {key(node): node for node in nodes}
+        changed = []
+        for node_key, node in latest.items():
+            node_fingerprint = fingerprint(node)
+            if not self.unchanged(node_key, node_fingerprint):
+                changed.append((node_key, node_fingerprint, node))
+        generated = parallel.map_in_pool(generate, [node for _, _, node in changed], jobs)
+        for (node_key, node_fingerprint, _), look_file in zip(changed, generated):
+            self.record(node_key, node_fingerprint, os.path.join(directory, look_file.filename))
+        logging.info(
+            f"Incremental run: {len(generated)} changed, {len(latest) - len(generated)} unchanged"
+        )
+        return generated
+
+    def remove_stale(self) -> List[str]:
+        """Delete outputs of nodes that are no longer generated."""
+        current_paths = {entry["path"] for entry in self._current.values()}
+        removed = []
+        for entry in self._previous.values():
+            path = entry["path"]
+            if path in current_paths or path in removed:
+                continue
+            file_path = os.path.join(self.output_dir, path)
+            if os.path.exists(file_path):
+                os.remove(file_path)
+                logging.info(f"Removed stale lookml file {file_path}")
+            removed.append(path)
+        return removed
+
+    def keep_unvisited(self) -> None:
+        """Carry over the entries of nodes this run did not look at, for runs
+        that only convert part of the project."""
+        for key, entry in self._previous.items():
+            self._current.setdefault(key, entry)
+
+    def save(self) -> None:
+        with open(self.path, "w") as f:
+            json.dump(
+                {
+                    "version": STATE_VERSION,
+                    "generator": _generator_version(),
+                    "entries": self._current,
+                },
+                f,
+                indent=2,
+                sort_keys=True,
+            )
@@ -0,0 +1,270 @@
+import json
+import logging
+import mmap
+import os
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+STREAM_CHUNK_SIZE = 1024 * 1024
+NUMBER_CHARS = "+-.0123456789eE"
+
+# Top level manifest keys dbt2looker reads. Every other top level section is
+# skipped entry by entry and kept as an empty object, so the manifest keeps
+# the shape expected by the json schema.
+STREAMED_MANIFEST_KEYS = ("metadata", "nodes", "exposures")
+
+
+AUTO_DECODER = "auto"
+
+
+def _decode_stdlib(data: Union[bytes, memoryview]) -> Any:
+    if isinstance(data, memoryview):
+        # json.loads only takes str and bytes, it would decode bytes to str first
+        data = str(data, "utf-8-sig")
+    # json.loads detects the utf-8/16/32 encoding of bytes itself
+    return json.loads(data)
+
+
+# Decoders taking the raw bytes of a json document, tried in this order by
+# the "auto" decoder. Only the installed ones are registered.
+JSON_DECODERS: Dict[str, Callable[[bytes], Any]] = {}
+if orjson is not None:
+    JSON_DECODERS["orjson"] = orjson.loads
+if simdjson is not None:
+    JSON_DECODERS["simdjson"] = simdjson.loads
+JSON_DECODERS["json"] = _decode_stdlib
+
+# Decoders that may be installed, for command line choices and messages
+KNOWN_DECODERS = ("orjson", "simdjson", "json")
+# Decoders that parse a memoryview of a memory mapped file without copying it
+BUFFER_DECODERS = ("orjson", "json")
+
+
+def available_decoders() -> List[str]:
+    return list(JSON_DECODERS)
+
+
+def get_decoder(name: Optional[str] = None) -> Tuple[str, Callable[[bytes], Any]]:
+    """The name and function of a json decoder, the fastest installed one by
+    default. Raises ``ValueError`` when ``name`` is not installed."""
+    if name is None or name == AUTO_DECODER:
+        name = next(iter(JSON_DECODERS))
+    decode = JSON_DECODERS.get(name)
+    if decode is None:
+        raise ValueError(
+            f"JSON decoder {name} is not available, installed decoders: {', '.join(JSON_DECODERS)}"
+        )
+    return name, decode
+
+
+def decode_json(data: Union[bytes, memoryview], decoder: Optional[str] = None) -> Any:
+    name, decode = get_decoder(decoder)
+    if name == "json":
+        return decode(data)
+    try:
+        return decode(data)
+    except ValueError:
+        # Accelerated decoders are stricter than json, e.g. on integers that do
+        # not fit 64 bits. json decodes those, and reports truly invalid files.
+        logging.debug(f"{name} could not decode the document, falling back to json")
+        return _decode_stdlib(data)
+
+
+def _load_mapped_json(f, name: str) -> Any:
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if name == "json":
+            # Decode to str straight from the mapping and unmap the file before
+            # parsing, the file is never held as bytes next to the parsed objects
+            with memoryview(mapped) as view:
+                text = str(view, "utf-8-sig")
+        elif name in BUFFER_DECODERS:
+            with memoryview(mapped) as view:
+                return decode_json(view, name)
+        else:
+            return decode_json(mapped[:], name)
+    return json.loads(text)
+
+
+def load_json(file_path: str, decoder: Optional[str] = None, use_mmap: bool = False) -> Any:
+    """Read a json file as bytes and decode it with ``decoder``, see ``get_decoder``.
+
+    With ``use_mmap`` the file is memory mapped and decoded from the mapping,
+    without first copying it into a bytes object.
+    """
+    name, _ = get_decoder(decoder)
+    with open(file_path, "rb") as f:
+        # Empty files cannot be mapped, json reports them as invalid
+        if use_mmap and os.fstat(f.fileno()).st_size:
+            return _load_mapped_json(f, name)
+        data = f.read()
+    return decode_json(data, name)
+
+
+def _is_model_node(unique_id: str, node: Any) -> bool:
+    return isinstance(node, dict) and node.get("resource_type") == "model"
+
+
+def _keep_all(key: str, value: Any) -> bool:
+    return True
+
+
+STREAMED_NODE_FILTERS: Dict[str, Callable[[str, Any], bool]] = {
+    "nodes": _is_model_node,
+    "exposures": _keep_all,
+}
+
+
+class _JsonStream:
+    """Incremental reader over a text file holding one json document.
+
+    Only the structure of the two outermost objects is walked by hand, every
+    member below that is decoded on its own with ``json.JSONDecoder`` so only
+    one entry is held in memory at a time.
+    """
+
+    def __init__(self, f: TextIO, chunk_size: int = STREAM_CHUNK_SIZE):
+        self._file = f
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _read_more(self) -> bool:
+        if self._eof:
+            return False
+        if self._pos:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        # Grow geometrically so a single huge value is not re-decoded many times
+        chunk = self._file.read(max(self._chunk_size, len(self._buffer)))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer += chunk
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in " \t\n\r":
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read_more():
+                raise ValueError("Unexpected end of manifest file")
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' in manifest file, found '{found}'")
+        self._pos += 1
+
+    def _ensure_number_end(self) -> None:
+        # A bare number is only complete once a character that cannot be part
+        # of it has been read, otherwise "12" may really be "123" split by a chunk
+        end = self._pos
+        while True:
+            while end < len(self._buffer) and self._buffer[end] in NUMBER_CHARS:
+                end += 1
+            if end < len(self._buffer):
+                return
+            end -= self._pos
+            if not self._read_more():
+                return
+            end += self._pos
+
+    def value(self) -> Any:
+        if self.peek() in NUMBER_CHARS:
+            self._ensure_number_end()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._read_more():
+                    continue
+                raise
+            self._pos = end
+            return value
+
+    def members(self):
+        """Yield the key of each member of the object at the cursor.
+
+        The caller must consume the member value (``value()`` or
+        ``members()``) before asking for the next key.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+            self.expect("}")
+            return
+
+
+def stream_manifest(
+    f: TextIO,
+    keys=STREAMED_MANIFEST_KEYS,
+    node_filters: Optional[Dict[str, Callable[[str, Any], bool]]] = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """Read a manifest keeping only the sections dbt2looker uses.
+
+    Members of the ``keys`` sections are kept when the matching entry of
+    ``node_filters`` accepts them (by default: model nodes and all exposures).
+    Other top level objects are read one member at a time and dropped.
+    """
+    node_filters = STREAMED_NODE_FILTERS if node_filters is None else node_filters
+    stream = _JsonStream(f, chunk_size=chunk_size)
+    manifest: Dict[str, Any] = {}
+    for key in stream.members():
+        if stream.peek() != "{":
+            manifest[key] = stream.value()
+            continue
+        if key in keys and key not in node_filters:
+            manifest[key] = stream.value()
+            continue
+        keep = node_filters.get(key) if key in keys else None
+        section = {}
+        for member_key in stream.members():
+            member = stream.value()
+            if keep is not None and keep(member_key, member):
+                section[member_key] = member
+        manifest[key] = section
+    logging.debug(
+        "Streamed manifest with %d nodes and %d exposures",
+        len(manifest.get("nodes") or {}),
+        len(manifest.get("exposures") or {}),
+    )
+    return manifest
+
+
+def load_manifest(
+    manifest_path: str,
+    streaming: bool = False,
+    decoder: Optional[str] = None,
+    use_mmap: bool = False,
+) -> Dict[str, Any]:
+    """Read manifest.json, whole with the json ``decoder`` or streamed.
+
+    The streaming reader decodes one entry at a time with ``json`` and ignores
+    ``decoder`` and ``use_mmap``.
+    """
+    if not streaming:
+        return load_json(manifest_path, decoder, use_mmap=use_mmap)
+    with open(manifest_path, "r") as f:
+        return stream_manifest(f)
@@ -1,11 +1,11 @@
 from enum import Enum
-from typing import Union, Dict, List, Optional
+from typing import Any, Union, Dict, List, Optional, Type
 
 try:
     from typing import Literal
 except ImportError:
     from typing_extensions import Literal
-from pydantic import BaseModel, Field, PydanticValueError, validator
+from pydantic import BaseModel, Field, PydanticValueError, ValidationError, validator
 
 
 # dbt2looker utility types
@@ -180,6 +180,8 @@ class Dbt2LookerMeta(BaseModel):
 class LookViewFile(BaseModel):
     filename: str
     contents: str
+    # Columns per type that got no dimension, reported once per run
+    unsupported_column_types: Dict[str, int] = {}
 
 
 class LookModelFile(BaseModel):
@@ -203,6 +205,26 @@ class DbtModelColumn(BaseModel):
     meta: DbtModelColumnMeta
 
 
+def lowercase_column_names(columns: Any) -> Any:
+    """Lowercase the keys and names of raw columns before they are validated.
+
+    Only columns whose name is not lowercase already are copied, raw columns
+    as a plain dict, so no ``DbtModelColumn`` is built twice.
+    """
+    if not isinstance(columns, dict):
+        return columns
+    lowercase_columns = {}
+    for name, column in columns.items():
+        if isinstance(column, dict):
+            column_name = column.get("name")
+            if isinstance(column_name, str) and column_name.lower() != column_name:
+                column = {**column, "name": column_name.lower()}
+        elif isinstance(column, DbtModelColumn) and column.name.lower() != column.name:
+            column = column.copy(update={"name": column.name.lower()})
+        lowercase_columns[name.lower()] = column
+    return lowercase_columns
+
+
 class DbtNode(BaseModel):
     unique_id: str
     resource_type: str
@@ -328,12 +350,9 @@ class DbtModel(DbtNode):
     filters_exposure: Optional[List[Dbt2LookerExploreFilter]] = []
     model_labels: Optional[Dbt2LookerModelLabels]
 
-    @validator("columns")
-    def case_insensitive_column_names(cls, v: Dict[str, DbtModelColumn]):
-        return {
-            name.lower(): column.copy(update={"name": column.name.lower()})
-            for name, column in v.items()
-        }
+    @validator("columns", pre=True)
+    def case_insensitive_column_names(cls, v):
+        return lowercase_column_names(v)
 
 
 class DbtExposureDependsOn(BaseModel):
@@ -364,7 +383,48 @@ class DbtManifestMetadata(BaseModel):
         return v
 
 
+def parse_nodes_by_resource_type(
+    raw_nodes: Any, node_classes: Dict[str, Type[DbtNode]]
+) -> Any:
+    """Validate each raw node as the class registered for its resource_type.
+
+    Gives the same nodes as ``Union[<node class>, DbtNode]`` without trying
+    every test, seed or snapshot as a model first: nodes of other resource
+    types, and nodes that fail their class (e.g. an empty model file), become
+    plain ``DbtNode``.
+    """
+    if not isinstance(raw_nodes, dict):
+        return raw_nodes
+    nodes = {}
+    for unique_id, raw_node in raw_nodes.items():
+        if not isinstance(raw_node, dict):
+            nodes[unique_id] = raw_node
+            continue
+        node_class = node_classes.get(raw_node.get("resource_type"))
+        if node_class is not None:
+            try:
+                nodes[unique_id] = node_class(**raw_node)
+                continue
+            except ValidationError:
+                pass
+        nodes[unique_id] = DbtNode(**raw_node)
+    return nodes
+
+
 class DbtManifest(BaseModel):
     nodes: Dict[str, Union[DbtModel, DbtNode]]
     exposures: Dict[str, Union[DbtExposure, DbtNode]]
-    metadata: DbtManifestMetadata
\ No newline at end of file
+    metadata: DbtManifestMetadata
+
+    class Config:
+        # Nodes are already typed by the validators below, smart_union keeps
+        # them as they are instead of trying them against every member again
+        smart_union = True
+
+    @validator("nodes", pre=True)
+    def nodes_by_resource_type(cls, v):
+        return parse_nodes_by_resource_type(v, {"model": DbtModel})
+
+    @validator("exposures", pre=True)
+    def exposures_by_resource_type(cls, v):
+        return parse_nodes_by_resource_type(v, {"exposure": DbtExposure})
\ No newline at end of file
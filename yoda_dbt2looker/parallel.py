@@ -0,0 +1,36 @@
+import logging
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Enough chunks per worker to balance uneven models, few enough to keep the
+# per chunk pickling of ``fn`` cheap
+CHUNKS_PER_JOB = 4
+
+
+def resolve_jobs(jobs: Optional[int]) -> int:
+    """Number of worker processes, ``0`` or ``None`` means one per CPU."""
+    if not jobs:
+        return os.cpu_count() or 1
+    return max(1, jobs)
+
+
+def map_in_pool(fn: Callable[[T], R], items: Iterable[T], jobs: int = 1) -> List[R]:
+    """``[fn(item) for item in items]`` spread over ``jobs`` processes.
+
+    Results keep the order of ``items`` so the output does not depend on the
+    number of jobs. ``fn`` and the items must be picklable, so pass module level
+    functions or ``functools.partial`` objects rather than lambdas.
+    """
+    items = list(items)
+    jobs = min(resolve_jobs(jobs), len(items))
+    if jobs <= 1:
+        return [fn(item) for item in items]
+    chunksize = max(1, math.ceil(len(items) / (jobs * CHUNKS_PER_JOB)))
+    logging.debug(f"Generating {len(items)} items in {jobs} processes")
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(fn, items, chunksize=chunksize))
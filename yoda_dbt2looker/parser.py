@@ -2,23 +2,107 @@ import logging
 import json
 import jsonschema
 import importlib.resources
-from typing import Dict, Optional, List, Union
-from functools import reduce
+from typing import Callable, Collection, Dict, Iterator, Optional, List, Union
+from functools import partial, reduce, lru_cache
 
 from pydantic.main import BaseModel
 
 from .generator import _extract_all_refs
+from .refs import REF_PATTERN
 from . import models
+from . import parallel
 
 
-def validate_manifest(raw_manifest: dict):
+MANIFEST_SCHEMA = "manifest_dbt2looker.json"
+# Metadata, model nodes and exposures of MANIFEST_SCHEMA, the parts dbt2looker reads
+SLIM_MANIFEST_SCHEMA = "manifest_dbt2looker_slim.json"
+
+
+def manifest_schema(full_validation: bool = False) -> str:
+    return MANIFEST_SCHEMA if full_validation else SLIM_MANIFEST_SCHEMA
+
+
+def get_manifest_validator(
+    schema_name: str = MANIFEST_SCHEMA,
+) -> jsonschema.Draft7Validator:
+    return _load_manifest_validator(schema_name)
+
+
+@lru_cache(maxsize=None)
+def _load_manifest_validator(schema_name: str) -> jsonschema.Draft7Validator:
+    # Loaded and compiled once per process, schema files are versioned by name
     with importlib.resources.open_text(
-        "yoda_dbt2looker.dbt_json_schemas", "manifest_dbt2looker.json"
+        "yoda_dbt2looker.dbt_json_schemas", schema_name
     ) as f:
         schema = json.load(f)
-    v = jsonschema.Draft7Validator(schema)
+    return jsonschema.Draft7Validator(schema)
+
+
+def _portable_error(error: jsonschema.ValidationError) -> jsonschema.ValidationError:
+    # Errors reference the validator's type checker, which can't be pickled
+    # back from a worker process. Keep what raise_error_context reports.
+    return jsonschema.ValidationError(
+        error.message,
+        validator=error.validator,
+        path=error.path,
+        schema_path=error.schema_path,
+        context=[_portable_error(e) for e in error.context],
+    )
+
+
+def _sharded_sections(schema: dict, raw_manifest: dict) -> List[str]:
+    # Sections like nodes and exposures whose entries all share one schema
+    sections = []
+    for name, section_schema in schema.get("properties", {}).items():
+        if (
+            isinstance(raw_manifest.get(name), dict)
+            and isinstance(section_schema.get("additionalProperties"), dict)
+            and "properties" not in section_schema
+            and "patternProperties" not in section_schema
+        ):
+            sections.append(name)
+    return sections
+
+
+def _validate_entry(schema_name: str, entry: tuple) -> List[jsonschema.ValidationError]:
+    section, key, instance = entry
+    v = get_manifest_validator(schema_name)
+    entry_schema = v.schema["properties"][section]["additionalProperties"]
+    errors = []
+    for error in v.descend(instance, entry_schema, path=key, schema_path="additionalProperties"):
+        error.path.appendleft(section)
+        error.schema_path.extendleft([section, "properties"])
+        errors.append(_portable_error(error))
+    return errors
+
+
+def _iter_sharded_errors(raw_manifest: dict, schema_name: str, jobs: int) -> Iterator[jsonschema.ValidationError]:
+    v = get_manifest_validator(schema_name)
+    sections = _sharded_sections(v.schema, raw_manifest)
+    # Everything but the entries of the sharded sections, section level
+    # keywords still see an object
+    yield from v.iter_errors({**raw_manifest, **{section: {} for section in sections}})
+    entries = [
+        (section, key, instance)
+        for section in sections
+        for key, instance in raw_manifest[section].items()
+    ]
+    for errors in parallel.map_in_pool(partial(_validate_entry, schema_name), entries, jobs):
+        yield from errors
+
+
+def validate_manifest(raw_manifest: dict, schema_name: str = MANIFEST_SCHEMA, jobs: int = 1):
+    """Log every schema error of ``raw_manifest`` and raise ``ValueError`` if any.
+
+    With more than one job, the entries of sections like nodes and exposures
+    are validated in ``jobs`` processes, ``0`` uses one per CPU.
+    """
+    if parallel.resolve_jobs(jobs) > 1:
+        errors = _iter_sharded_errors(raw_manifest, schema_name, jobs)
+    else:
+        errors = get_manifest_validator(schema_name).iter_errors(raw_manifest)
     hasError = False
-    for error in v.iter_errors(raw_manifest):
+    for error in errors:
         raise_error_context(error)
         hasError = True
     if hasError:
@@ -37,8 +121,217 @@ def parse_dbt_project_config(raw_config: dict):
     return models.DbtProjectConfig(**raw_config)
 
 
-def parse_adapter_type(raw_manifest: dict):
-    manifest = models.DbtManifest(**raw_manifest)
+def parse_manifest(raw_manifest: dict) -> models.DbtManifest:
+    return models.DbtManifest(**raw_manifest)
+
+
+class ParsedNodeCache:
+    """Typed nodes and exposures of the previous parse, kept by a long running
+    process to skip validating the raw nodes that did not change since.
+
+    ``parse`` and ``sections`` default to this module's manifest, pass
+    ``core.parser.parse_manifest`` and ``("nodes",)`` for the core one.
+    """
+
+    def __init__(
+        self,
+        parse: Callable[[dict], BaseModel] = parse_manifest,
+        sections: Collection[str] = ("nodes", "exposures"),
+    ):
+        self._parse = parse
+        self._parsed: Dict[str, Dict[str, tuple]] = {section: {} for section in sections}
+
+    def parse_manifest(self, raw_manifest: dict) -> BaseModel:
+        reused = dict(raw_manifest)
+        for section, cached in self._parsed.items():
+            # Typed nodes pass through the manifest validators as they are
+            reused[section] = {
+                unique_id: (
+                    cached[unique_id][1]
+                    if unique_id in cached and cached[unique_id][0] == raw_node
+                    else raw_node
+                )
+                for unique_id, raw_node in (raw_manifest.get(section) or {}).items()
+            }
+        manifest = self._parse(reused)
+        for section in self._parsed:
+            raw_nodes = raw_manifest.get(section) or {}
+            self._parsed[section] = {
+                unique_id: (raw_nodes[unique_id], node)
+                for unique_id, node in getattr(manifest, section).items()
+            }
+        return manifest
+
+
+def _ensure_manifest(
+    manifest: Union[dict, models.DbtManifest], tag: Optional[str] = None
+) -> models.DbtManifest:
+    # Callers that already hold a parsed manifest pass it through so the raw
+    # dict is validated by pydantic only once per run
+    if isinstance(manifest, models.DbtManifest):
+        return manifest
+    return parse_manifest(select_raw_manifest(manifest, tag=tag))
+
+
+def _raw_tags(raw_node: dict):
+    return raw_node.get("tags")
+
+
+def path_selected(raw_node: dict, paths: Collection[str]) -> bool:
+    node_path = raw_node.get("original_file_path") or ""
+    return any(
+        node_path == path or node_path.startswith(path.rstrip("/") + "/")
+        for path in paths
+    )
+
+
+def raw_model_selected(
+    raw_node: dict,
+    tag: Optional[str] = None,
+    names: Optional[Collection[str]] = None,
+    paths: Optional[Collection[str]] = None,
+    get_tags: Callable[[dict], Optional[list]] = _raw_tags,
+) -> bool:
+    """Whether a raw model node matches the tag, name and path selection.
+
+    ``paths`` are prefixes of the node's original_file_path, e.g.
+    ``models/marts``. Nodes whose name or tags cannot be read are selected, so
+    the typed parse still reports them.
+    """
+    name = raw_node.get("name")
+    if not isinstance(name, str):
+        return True
+    if names is not None and name not in names:
+        return False
+    if paths is not None and not path_selected(raw_node, paths):
+        return False
+    if tag is not None:
+        tags = get_tags(raw_node)
+        if not isinstance(tags, list):
+            return True
+        return tag in tags
+    return True
+
+
+def select_raw_models(
+    raw_nodes: Dict[str, dict],
+    tag: Optional[str] = None,
+    names: Optional[Collection[str]] = None,
+    paths: Optional[Collection[str]] = None,
+    get_tags: Callable[[dict], Optional[list]] = _raw_tags,
+    required_names: Collection[str] = (),
+) -> Dict[str, dict]:
+    """The selected raw model nodes, plus the models named in ``required_names``.
+
+    Nodes of other resource types are never parsed into models and are left out.
+    """
+    return {
+        unique_id: raw_node
+        for unique_id, raw_node in raw_nodes.items()
+        if raw_node.get("resource_type") == "model"
+        and (
+            raw_node.get("name") in required_names
+            or raw_model_selected(raw_node, tag, names, paths, get_tags)
+        )
+    }
+
+
+def raw_refs(value) -> set:
+    """Names of every ``ref('...')`` in a raw json value and its children."""
+    if isinstance(value, str):
+        return set(REF_PATTERN.findall(value))
+    if isinstance(value, dict):
+        value = value.values()
+    elif not isinstance(value, list):
+        return set()
+    refs = set()
+    for item in value:
+        refs |= raw_refs(item)
+    return refs
+
+
+def _tag_matches(raw_node: dict, tag: Optional[str]) -> bool:
+    return tag is None or tag in (raw_node.get("tags") or [])
+
+
+def _exposures_for_models(
+    exposures: Dict[str, dict],
+    tag: Optional[str],
+    names: Collection[str],
+    exposure_ids: Collection[str],
+) -> Dict[str, dict]:
+    # A view of a model referenced by exposures holds the overlays of all of
+    # them, so every exposure touching a kept model is kept, and its models
+    # in turn, until nothing is added
+    exposure_refs = {
+        unique_id: raw_refs(raw_exposure.get("meta"))
+        for unique_id, raw_exposure in exposures.items()
+        if _tag_matches(raw_exposure, tag)
+    }
+    kept = {
+        unique_id
+        for unique_id, raw_exposure in exposures.items()
+        # Explores of selected models are named after their exposure
+        if unique_id in exposure_ids or raw_exposure.get("name") in names
+    }
+    kept_names = set(names)
+    for unique_id in kept:
+        kept_names |= exposure_refs.get(unique_id, set())
+    added = True
+    while added:
+        added = False
+        for unique_id, refs in exposure_refs.items():
+            if unique_id not in kept and refs & kept_names:
+                kept.add(unique_id)
+                kept_names |= refs
+                added = True
+    return {
+        unique_id: raw_exposure
+        for unique_id, raw_exposure in exposures.items()
+        if unique_id in kept
+    }
+
+
+def select_raw_manifest(
+    raw_manifest: dict,
+    tag: Optional[str] = None,
+    names: Optional[Collection[str]] = None,
+    paths: Optional[Collection[str]] = None,
+    exposure_ids: Optional[Collection[str]] = None,
+) -> dict:
+    """Shallow copy of the raw manifest keeping only the nodes a run needs.
+
+    Done on the raw dicts so a selective run only pays pydantic validation for
+    the models it converts: the selected models and every model referenced by
+    an exposure matching ``tag``. Exposures are few and all of them are kept,
+    they also name the lookml model files.
+
+    With ``exposure_ids`` only part of the project is converted: the listed
+    exposures are kept, along with the exposures sharing models with them or
+    with the models in ``names``, so the views of those models come out as in
+    a full run.
+    """
+    if tag is None and names is None and paths is None and exposure_ids is None:
+        return raw_manifest
+    exposures = raw_manifest.get("exposures") or {}
+    if exposure_ids is not None:
+        exposures = _exposures_for_models(exposures, tag, names or (), exposure_ids)
+    referenced_models = raw_refs([
+        raw_exposure.get("meta")
+        for raw_exposure in exposures.values()
+        if _tag_matches(raw_exposure, tag)
+    ])
+    return {
+        **raw_manifest,
+        "nodes": select_raw_models(
+            raw_manifest["nodes"], tag, names, paths, required_names=referenced_models
+        ),
+        "exposures": exposures,
+    }
+
+
+def parse_adapter_type(manifest: Union[dict, models.DbtManifest]):
+    manifest = _ensure_manifest(manifest)
     return manifest.metadata.adapter_type
 
 
@@ -52,8 +345,10 @@ def tags_match(query_tag: str, model: models.DbtModel) -> bool:
         return query_tag == model.tags
 
 
-def parse_models(raw_manifest: dict, tag=None) -> List[models.DbtModel]:
-    manifest = models.DbtManifest(**raw_manifest)
+def parse_models(
+    manifest: Union[dict, models.DbtManifest], tag=None
+) -> List[models.DbtModel]:
+    manifest = _ensure_manifest(manifest, tag=tag)
     all_models: List[models.DbtModel] = [
         node for node in manifest.nodes.values() if node.resource_type == "model"
     ]
@@ -72,8 +367,10 @@ def parse_models(raw_manifest: dict, tag=None) -> List[models.DbtModel]:
     return [model for model in all_models if tags_match(tag, model)]
 
 
-def parse_exposures(raw_manifest: dict, tag=None) -> List[models.DbtExposure]:
-    manifest = models.DbtManifest(**raw_manifest)
+def parse_exposures(
+    manifest: Union[dict, models.DbtManifest], tag=None
+) -> List[models.DbtExposure]:
+    manifest = _ensure_manifest(manifest, tag=tag)
     # Empty model files have many missing parameters
     all_exposures = manifest.exposures.values()
     for exposure in all_exposures:
@@ -101,14 +398,14 @@ def check_models_for_missing_column_types(dbt_typed_models: List[models.DbtModel
 
 
 def parse_typed_models(
-    raw_manifest: dict,
+    manifest: Union[dict, models.DbtManifest],
     dbt_project_name: str,
     tag: Optional[str] = None,
 ):
-    dbt_models = parse_models(raw_manifest, tag=tag)
-    manifest = models.DbtManifest(**raw_manifest)
+    manifest = _ensure_manifest(manifest, tag=tag)
+    dbt_models = parse_models(manifest, tag=tag)
     typed_dbt_exposures: List[models.DbtExposure] = parse_exposures(
-        raw_manifest, tag=tag
+        manifest, tag=tag
     )
     exposure_nodes = []
 
@@ -132,19 +429,15 @@ def parse_typed_models(
 
         if exposure.meta.looker.joins:
             for join in exposure.meta.looker.joins:
-                if _extract_all_refs(join.sql_on) == None:
+                join_refs = _extract_all_refs(join.sql_on)
+                if join_refs == None:
                     logging.error(
                         f"Exposure join.sql_on {join.sql_on} should be ref('model_name')"
                     )
                     raise Exception(
                         f"Exposure join.sql_on {join.sql_on} should be ref('model_name')"
                     )
-
-            for item in reduce(
-                list.__add__,
-                [_extract_all_refs(join.sql_on) for join in exposure.meta.looker.joins],
-            ):
-                exposure_model_views.add(item)
+                exposure_model_views.update(join_refs)
         _extract_measures_models(exposure_model_views, model_to_measure, exposure)
         _extract_exposure_models(
             exposure_model_views, calculated_dimension, exposure.meta.looker.dimensions
@@ -172,6 +465,9 @@ def parse_typed_models(
         if not model_node:
             logging.error(f"Exposure join.sql_on model {model_loopup} missing")
             raise Exception(f"Exposure join.sql_on model {model_loopup} missing")
+        # The exposure overlays are applied to a copy, the node itself may also
+        # be returned by parse_models as a plain tagged model
+        model_node = model_node.copy()
         model_node.create_explorer = False
         if model in model_to_measure:
             model_node.measures_exposure = model_to_measure[model]
@@ -186,7 +482,6 @@ def parse_typed_models(
         _assign_model_labels(models_labels, model, model_node)
         exposure_nodes.append(model_node)
 
-    adapter_type = parse_adapter_type(raw_manifest)
     dbt_models = dbt_models + exposure_nodes
     logging.debug("Parsed %d models from manifest.json", len(dbt_models))
     for model in dbt_models:
@@ -230,26 +525,28 @@ def _extract_measures_models(
 ):
     if exposure.meta.looker.measures:
         for measure in exposure.meta.looker.measures:
-            if not _extract_all_refs(measure.model):
+            measure_model_refs = _extract_all_refs(measure.model)
+            if not measure_model_refs:
                 logging.error(
                     f"Exposure measure.model {measure.model} should be ref('model_name')"
                 )
                 raise Exception(
                     f"Exposure measure.model {measure.model} should be ref('model_name')"
                 )
-            if not _extract_all_refs(measure.sql):
+            measure_sql_refs = _extract_all_refs(measure.sql)
+            if not measure_sql_refs:
                 logging.error(
                     f"Exposure measure.sql {measure.sql} should be ref('model_name')"
                 )
                 raise Exception(
                     f"Exposure measure.sql {measure.sql} should be ref('model_name')"
                 )
-            main_measure_model = _extract_all_refs(measure.model)[0]
+            main_measure_model = measure_model_refs[0]
             exposure_model_views.add(main_measure_model)
             if not model_to_measure.get(main_measure_model):
                 model_to_measure[main_measure_model] = []
             model_to_measure[main_measure_model].append(measure)
-            exposure_model_views.update(_extract_all_refs(measure.sql))
+            exposure_model_views.update(measure_sql_refs)
 
 
 def _extract_exposure_models(
@@ -259,14 +556,15 @@ def _extract_exposure_models(
 ):
     if looker_exposure_objects:
         for looker_exposure_object in looker_exposure_objects:
-            if not _extract_all_refs(looker_exposure_object.model):
+            model_refs = _extract_all_refs(looker_exposure_object.model)
+            if not model_refs:
                 logging.error(
                     f"Exposure model {looker_exposure_object.model} should be ref('model_name')"
                 )
                 raise Exception(
                     f"Exposure model {looker_exposure_object.model} should be ref('model_name')"
                 )
-            main_model = _extract_all_refs(looker_exposure_object.model)[0]
+            main_model = model_refs[0]
             exposure_model_views.add(main_model)
             if not exposure_model.get(main_model):
                 exposure_model[main_model] = []
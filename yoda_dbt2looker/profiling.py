@@ -0,0 +1,225 @@
+import cProfile
+import datetime
+import functools
+import json
+import logging
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, peak RSS is left out of the report
+    resource = None
+
+REPORT_VERSION = 1
+DEFAULT_TRACEMALLOC_TOP = 25
+
+# (traced bytes, stage name, snapshot) of the stage boundary with the most
+# memory allocated while profiled_run traces allocations
+_largest_snapshot: Optional[Tuple[int, str, tracemalloc.Snapshot]] = None
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes everywhere else
+    return round(peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024, 1)
+
+
+class Stage:
+    """Item counts of a running stage, e.g. ``stage.count(models=10)``, and
+    the choices it made, e.g. ``stage.note(json_decoder="orjson")``."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.counts: Dict[str, int] = {}
+        self.info: Dict[str, str] = {}
+
+    def count(self, **counts: int) -> None:
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+
+    def note(self, **info: str) -> None:
+        self.info.update(info)
+
+
+class StageProfiler:
+    """Wall time, CPU time, peak RSS and item counts of each conversion stage."""
+
+    enabled = True
+
+    def __init__(self, command: str):
+        self.command = command
+        self.started = datetime.datetime.now(datetime.timezone.utc)
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self.stages: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Stage]:
+        stage = Stage(name)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield stage
+        finally:
+            _keep_largest_snapshot(name)
+            self.stages.append(
+                {
+                    "name": name,
+                    "wall_seconds": round(time.perf_counter() - wall_start, 6),
+                    "cpu_seconds": round(time.process_time() - cpu_start, 6),
+                    "peak_rss_mb": peak_rss_mb(),
+                    "counts": stage.counts,
+                    "info": stage.info,
+                }
+            )
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "version": REPORT_VERSION,
+            "command": self.command,
+            "started": self.started.isoformat(),
+            "wall_seconds": round(time.perf_counter() - self._wall_start, 6),
+            "cpu_seconds": round(time.process_time() - self._cpu_start, 6),
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": self.stages,
+        }
+
+    def write(self, report_path: Optional[str]) -> None:
+        if not report_path:
+            return
+        with open(report_path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+        logging.info(f"Wrote profile report to {report_path}")
+
+
+class _NullStage:
+    name = None
+    counts: Dict[str, int] = {}
+    info: Dict[str, str] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def count(self, **counts: int) -> None:
+        pass
+
+    def note(self, **info: str) -> None:
+        pass
+
+
+class NullProfiler:
+    """Stand in for ``StageProfiler`` when no report is requested.
+
+    Check ``enabled`` before computing counts that are not free.
+    """
+
+    enabled = False
+    _stage = _NullStage()
+
+    def stage(self, name: str) -> _NullStage:
+        return self._stage
+
+    def write(self, report_path: str) -> None:
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+def stage_profiler(command: str, profile_report: Optional[str]):
+    """A ``StageProfiler`` when a report path is given or allocations are
+    traced, ``NULL_PROFILER`` otherwise."""
+    if profile_report or tracemalloc.is_tracing():
+        return StageProfiler(command)
+    return NULL_PROFILER
+
+
+def _keep_largest_snapshot(stage_name: str) -> None:
+    # Most of what a stage allocates is freed by the end of the run, so the
+    # allocation sites are snapshotted when the most memory is in use
+    global _largest_snapshot
+    if not tracemalloc.is_tracing():
+        return
+    traced, _ = tracemalloc.get_traced_memory()
+    if _largest_snapshot is None or traced > _largest_snapshot[0]:
+        _largest_snapshot = (traced, stage_name, tracemalloc.take_snapshot())
+
+
+def _write_tracemalloc_report(peak: int, report_path: str, top: int) -> None:
+    traced, stage_name, snapshot = _largest_snapshot
+    statistics = snapshot.statistics("lineno")
+    with open(report_path, "w") as f:
+        f.write(f"Peak traced memory: {peak / 1024 / 1024:.1f} MB\n")
+        f.write(
+            f"Top {min(top, len(statistics))} allocation sites at the end of the {stage_name} stage, "
+            f"with {traced / 1024 / 1024:.1f} MB allocated:\n"
+        )
+        for statistic in statistics[:top]:
+            f.write(f"{statistic}\n")
+    logging.info(f"Wrote tracemalloc report to {report_path}")
+
+
+@contextmanager
+def profiled_run(
+    cprofile_output: Optional[str] = None,
+    tracemalloc_output: Optional[str] = None,
+    tracemalloc_top: int = DEFAULT_TRACEMALLOC_TOP,
+) -> Iterator[None]:
+    """Run the block under cProfile and/or tracemalloc and dump their results.
+
+    ``cprofile_output`` receives pstats data (``python -m pstats <file>``),
+    ``tracemalloc_output`` a text report of the top allocation sites. Only the
+    current process is traced, worker processes started for ``--jobs`` are not.
+    """
+    global _largest_snapshot
+    profile = cProfile.Profile() if cprofile_output else None
+    start_tracing = bool(tracemalloc_output) and not tracemalloc.is_tracing()
+    if start_tracing:
+        tracemalloc.start()
+    _largest_snapshot = None
+    if profile:
+        profile.enable()
+    try:
+        yield
+    finally:
+        if profile:
+            profile.disable()
+            profile.dump_stats(cprofile_output)
+            logging.info(f"Wrote cProfile stats to {cprofile_output}, read them with python -m pstats {cprofile_output}")
+        if tracemalloc_output:
+            _keep_largest_snapshot("last")
+            _, peak = tracemalloc.get_traced_memory()
+            if start_tracing:
+                tracemalloc.stop()
+            _write_tracemalloc_report(peak, tracemalloc_output, tracemalloc_top)
+            _largest_snapshot = None
+
+
+def profiled(fn):
+    """Add the ``cprofile_output``, ``tracemalloc_output`` and ``tracemalloc_top``
+    keyword arguments of ``profiled_run`` to an entry point."""
+
+    @functools.wraps(fn)
+    def wrapper(
+        *args,
+        cprofile_output: Optional[str] = None,
+        tracemalloc_output: Optional[str] = None,
+        tracemalloc_top: int = DEFAULT_TRACEMALLOC_TOP,
+        **kwargs,
+    ):
+        if not (cprofile_output or tracemalloc_output):
+            return fn(*args, **kwargs)
+        with profiled_run(cprofile_output, tracemalloc_output, tracemalloc_top):
+            return fn(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,48 @@
+import re
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+
+REF_PATTERN = re.compile(r"ref\(\s*\'(\w*)\'\s*\)")
+OPERATOR_PATTERN = re.compile(r"\b(\w+)\s*([=<>!]+)\s*(\w+)\b")
+# Everything between two field references, i.e. the "and" in ${join1} and ${join2}
+BETWEEN_FIELDS_PATTERN = re.compile(r"}(.*?)\$")
+
+# Exposures repeat the same ref('model') strings across their joins,
+# measures and dimensions
+REF_CACHE_SIZE = 4096
+
+
+class ResolvedRefs(NamedTuple):
+    refs: Tuple[str, ...]
+    sql: str
+
+
+def replace_operator_match(match) -> str:
+    return f"{match.group(1)} {match.group(2)} {match.group(3)}"
+
+
+@lru_cache(maxsize=REF_CACHE_SIZE)
+def _resolve_refs(ref_str: str, handle_spaces: bool) -> ResolvedRefs:
+    refs = tuple(REF_PATTERN.findall(ref_str))
+    if not refs:
+        return ResolvedRefs(refs, ref_str)
+
+    sql = ref_str
+    if handle_spaces:
+        sql = OPERATOR_PATTERN.sub(replace_operator_match, sql.replace(" ", ""))
+    for ref in dict.fromkeys(refs):
+        sql = sql.replace(f"ref('{ref}')", ref)
+    # in case of a compound expression with logical operator , i.e : ${join1} and ${join2} - we would like
+    # to add a space between the logical operator so all elements between }...$ are captured and added a pre and post space
+    sql = BETWEEN_FIELDS_PATTERN.sub(r"} \1 $", sql)
+    return ResolvedRefs(refs, sql)
+
+
+def resolve_refs(ref_str: str, handle_spaces: bool = True) -> ResolvedRefs:
+    """The ``ref('model')`` names in ``ref_str`` and the sql with every ref replaced by its model name.
+
+    Both come from a single scan of ``ref_str`` and are cached per string.
+    ``handle_spaces`` removes the spaces of the sql and puts one around each
+    comparison operator. A string without refs is returned unchanged.
+    """
+    return _resolve_refs(ref_str, handle_spaces)
@@ -0,0 +1,207 @@
+import re
+from typing import Collection, Dict, Iterable, NamedTuple, Optional, Set, Tuple
+
+from . import parser
+
+SELECTED_RESOURCE_TYPES = ("model", "exposure")
+# Keys that change between two compilations of the same node
+STATE_IGNORED_KEYS = frozenset(("created_at", "root_path", "build_path", "compiled_path", "deferred"))
+
+SELECTOR_PATTERN = re.compile(
+    r"^(?:(?P<parents_depth>\d*)(?P<parents>\+))?"
+    r"(?:(?P<method>[a-z_]+):)?(?P<value>[^+]+)"
+    r"(?:(?P<children>\+)(?P<children_depth>\d*))?$"
+)
+METHODS = ("name", "tag", "path", "state")
+STATES = ("modified", "new")
+
+
+class Selector(NamedTuple):
+    """One dbt style selector, e.g. ``2+tag:finance+``."""
+
+    method: str
+    value: str
+    parents: bool = False
+    parents_depth: Optional[int] = None
+    children: bool = False
+    children_depth: Optional[int] = None
+
+
+def parse_selector(selector: str) -> Selector:
+    match = SELECTOR_PATTERN.match(selector)
+    if not match:
+        raise ValueError(f"Invalid selector {selector}")
+    method = match.group("method") or "name"
+    value = match.group("value")
+    if method not in METHODS:
+        raise ValueError(f"Unsupported selector method {method}: in {selector}, use one of: {', '.join(METHODS)}")
+    if method == "state" and value not in STATES:
+        raise ValueError(f"Unsupported state {value} in {selector}, use one of: {', '.join(STATES)}")
+    return Selector(
+        method=method,
+        value=value,
+        parents=bool(match.group("parents")),
+        parents_depth=int(match.group("parents_depth")) if match.group("parents_depth") else None,
+        children=bool(match.group("children")),
+        children_depth=int(match.group("children_depth")) if match.group("children_depth") else None,
+    )
+
+
+def _node_parents(unique_id: str, raw_node: dict) -> Set[str]:
+    depends_on = raw_node.get("depends_on")
+    parents = set()
+    if isinstance(depends_on, dict) and isinstance(depends_on.get("nodes"), list):
+        parents.update(depends_on["nodes"])
+    if raw_node.get("resource_type") == "exposure":
+        # Looker exposures reference their models in meta, often without depends_on
+        project_name = unique_id.split(".")[1] if unique_id.count(".") >= 2 else None
+        if project_name:
+            parents.update(f"model.{project_name}.{name}" for name in parser.raw_refs(raw_node.get("meta")))
+    return parents
+
+
+class ManifestGraph:
+    """Parents and children of every node and exposure of a raw manifest.
+
+    Built once from ``depends_on``, the refs in exposure meta and the
+    manifest's ``child_map``, so graph selectors are set lookups. The streamed
+    manifest has no ``child_map`` and relies on ``depends_on`` alone.
+    """
+
+    def __init__(self, raw_manifest: dict):
+        self.nodes: Dict[str, dict] = {**raw_manifest["nodes"], **(raw_manifest.get("exposures") or {})}
+        self.parents: Dict[str, Set[str]] = {unique_id: set() for unique_id in self.nodes}
+        self.children: Dict[str, Set[str]] = {unique_id: set() for unique_id in self.nodes}
+        for unique_id, raw_node in self.nodes.items():
+            for parent in _node_parents(unique_id, raw_node):
+                self._add_edge(parent, unique_id)
+        for parent, children in (raw_manifest.get("child_map") or {}).items():
+            for child in children:
+                self._add_edge(parent, child)
+
+    def _add_edge(self, parent: str, child: str) -> None:
+        self.parents.setdefault(child, set()).add(parent)
+        self.children.setdefault(parent, set()).add(child)
+
+    @staticmethod
+    def _walk(edges: Dict[str, Set[str]], unique_ids: Iterable[str], depth: Optional[int]) -> Set[str]:
+        found: Set[str] = set()
+        frontier = set(unique_ids)
+        level = 0
+        while frontier and (depth is None or level < depth):
+            frontier = {
+                neighbour for unique_id in frontier for neighbour in edges.get(unique_id, ())
+            } - found
+            found |= frontier
+            level += 1
+        return found
+
+    def ancestors(self, unique_ids: Iterable[str], depth: Optional[int] = None) -> Set[str]:
+        return self._walk(self.parents, unique_ids, depth)
+
+    def descendants(self, unique_ids: Iterable[str], depth: Optional[int] = None) -> Set[str]:
+        return self._walk(self.children, unique_ids, depth)
+
+
+def _state_fields(raw_node: dict) -> dict:
+    return {key: value for key, value in raw_node.items() if key not in STATE_IGNORED_KEYS}
+
+
+def _state_selected(unique_id: str, raw_node: dict, state: str, previous_nodes: Dict[str, dict]) -> bool:
+    previous = previous_nodes.get(unique_id)
+    if previous is None:
+        return True
+    return state == "modified" and _state_fields(previous) != _state_fields(raw_node)
+
+
+def _matches(
+    graph: ManifestGraph, selector: Selector, previous_nodes: Optional[Dict[str, dict]]
+) -> Set[str]:
+    if selector.method == "state":
+        if previous_nodes is None:
+            raise ValueError(f"Selector state:{selector.value} needs the manifest of a previous run, see --state")
+        return {
+            unique_id
+            for unique_id, raw_node in graph.nodes.items()
+            if _state_selected(unique_id, raw_node, selector.value, previous_nodes)
+        }
+    return {
+        unique_id
+        for unique_id, raw_node in graph.nodes.items()
+        if isinstance(raw_node, dict) and _selector_matches(raw_node, selector)
+    }
+
+
+def _selector_matches(raw_node: dict, selector: Selector) -> bool:
+    # Strict, unlike parser.raw_model_selected: a node without readable tags
+    # or name matches no tag or name selector, nor any --exclude
+    if selector.method == "tag":
+        tags = raw_node.get("tags")
+        return isinstance(tags, list) and selector.value in tags
+    if selector.method == "path":
+        return parser.path_selected(raw_node, [selector.value])
+    return raw_node.get("name") == selector.value
+
+
+def _resolve(graph: ManifestGraph, selector: Selector, previous_nodes: Optional[Dict[str, dict]]) -> Set[str]:
+    unique_ids = _matches(graph, selector, previous_nodes)
+    selected = set(unique_ids)
+    if selector.parents:
+        selected |= graph.ancestors(unique_ids, selector.parents_depth)
+    if selector.children:
+        selected |= graph.descendants(unique_ids, selector.children_depth)
+    return selected
+
+
+def _resolve_all(
+    graph: ManifestGraph, selectors: Collection[str], previous_nodes: Optional[Dict[str, dict]]
+) -> Set[str]:
+    # As in dbt, space separated selectors are a union and comma separated
+    # ones an intersection
+    selected: Set[str] = set()
+    for union_part in (part for selector in selectors for part in selector.split()):
+        intersection = None
+        for selector in union_part.split(","):
+            unique_ids = _resolve(graph, parse_selector(selector), previous_nodes)
+            intersection = unique_ids if intersection is None else intersection & unique_ids
+        selected |= intersection
+    return selected
+
+
+def select_nodes(
+    graph: ManifestGraph,
+    select: Optional[Collection[str]] = None,
+    exclude: Optional[Collection[str]] = None,
+    previous_manifest: Optional[dict] = None,
+) -> Set[str]:
+    """Unique ids of the models and exposures picked by ``select`` minus ``exclude``.
+
+    Every model and exposure is selected when ``select`` is empty.
+    ``previous_manifest`` is the raw manifest the ``state:`` selectors compare to.
+    Raises ``ValueError`` on an invalid selector.
+    """
+    previous_nodes = None
+    if previous_manifest is not None:
+        previous_nodes = {**previous_manifest["nodes"], **(previous_manifest.get("exposures") or {})}
+    selected = _resolve_all(graph, select, previous_nodes) if select else set(graph.nodes)
+    if exclude:
+        selected -= _resolve_all(graph, exclude, previous_nodes)
+    return {
+        unique_id
+        for unique_id in selected
+        if isinstance(graph.nodes.get(unique_id), dict)
+        and graph.nodes[unique_id].get("resource_type") in SELECTED_RESOURCE_TYPES
+    }
+
+
+def split_selection(graph: ManifestGraph, unique_ids: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+    """Names of the selected models and unique ids of the selected exposures,
+    as taken by ``parser.select_raw_manifest``."""
+    model_names, exposure_ids = set(), set()
+    for unique_id in unique_ids:
+        raw_node = graph.nodes[unique_id]
+        if raw_node.get("resource_type") == "exposure":
+            exposure_ids.add(unique_id)
+        elif isinstance(raw_node.get("name"), str):
+            model_names.add(raw_node["name"])
+    return model_names, exposure_ids
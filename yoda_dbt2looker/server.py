@@ -0,0 +1,338 @@
+"""Local HTTP server converting dbt manifests to lookml bundles.
+
+Services that convert manifests over and over talk to one warm process
+instead of starting ``yoda_dbt2looker`` for every request:
+
+    yoda_dbt2looker_server --port 8765
+    yoda_dbt2looker_server --socket /tmp/dbt2looker.sock
+
+``POST /convert`` takes the manifest.json as the request body, or a
+``manifest_path`` query parameter, and answers ``{"files": {path: contents}}``.
+Other query parameters: ``engine`` (``cli`` or ``core``), ``tag``, ``select``
+and ``exclude`` (repeatable, ``cli`` only) and ``project_dir``.
+``GET /health`` answers the cache statistics.
+"""
+import argparse
+import hashlib
+import http.server
+import json
+import logging
+import os
+import socketserver
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from . import cli
+from . import loader
+from . import parser
+from . import watch
+from .core import converter as core_converter
+from .core import parser as core_parser
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_MANIFESTS = 4
+DEFAULT_MAX_RESULTS = 32
+ENGINES = ("cli", "core")
+
+
+class LRUCache:
+    """Thread safe mapping keeping the ``max_entries`` most recently used items."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+
+@dataclass
+class CachedManifest:
+    """A validated raw manifest and the typed nodes parsed from it per engine."""
+
+    raw_manifest: dict
+    parsed_nodes: Dict[str, parser.ParsedNodeCache] = field(default_factory=dict)
+
+
+class ConversionError(Exception):
+    """A conversion failed, ``errors`` holds the messages it logged."""
+
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors) or "Conversion failed")
+        self.errors = errors
+
+
+class _ErrorCollector(logging.Handler):
+    # Only collects the records of the thread it was created in, requests
+    # served by other threads log to the same root logger
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.errors: List[str] = []
+        self.thread = threading.get_ident()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.thread == self.thread:
+            self.errors.append(record.getMessage())
+
+
+@contextmanager
+def _conversion_errors() -> Iterator[None]:
+    # Conversions log what went wrong and exit, the logged errors are what
+    # the caller needs to see
+    collector = _ErrorCollector()
+    root = logging.getLogger()
+    root.addHandler(collector)
+    try:
+        yield
+    except (SystemExit, Exception) as e:
+        errors = collector.errors or [str(e)]
+        raise ConversionError(errors) from e
+    finally:
+        root.removeHandler(collector)
+
+
+class ConversionService:
+    """Converts manifests with cached validated manifests and results.
+
+    Manifests read from a path are keyed by path, modification time and size,
+    manifests sent as a body by the sha256 of the body. Results are also
+    keyed by the modification time and size of the project's dbt_project.yml.
+    Both caches evict the least recently used entry. Manifests are loaded one
+    at a time, so a manifest requested twice at once is only validated once.
+    Conversions run one at a time, the pipeline keeps per run state in the
+    process.
+    """
+
+    def __init__(
+        self,
+        project_dir: str = "./",
+        max_manifests: int = DEFAULT_MAX_MANIFESTS,
+        max_results: int = DEFAULT_MAX_RESULTS,
+    ):
+        self.project_dir = project_dir
+        self.manifests = LRUCache(max_manifests)
+        self.results = LRUCache(max_results)
+        self._manifest_lock = threading.Lock()
+        self._convert_lock = threading.Lock()
+
+    def _manifest(self, key: Hashable, load) -> CachedManifest:
+        with self._manifest_lock:
+            cached = self.manifests.get(key)
+            if cached is None:
+                with _conversion_errors():
+                    raw_manifest = load()
+                    parser.validate_manifest(raw_manifest, parser.SLIM_MANIFEST_SCHEMA)
+                cached = CachedManifest(raw_manifest)
+                self.manifests.put(key, cached)
+        return cached
+
+    def manifest_from_path(self, manifest_path: str) -> Tuple[Hashable, CachedManifest]:
+        manifest_path = os.path.abspath(manifest_path)
+        signature = watch.file_signature(manifest_path)
+        if signature is None:
+            raise ConversionError([f"Could not find manifest file at {manifest_path}"])
+        key = ("path", manifest_path, signature)
+        return key, self._manifest(key, lambda: loader.load_manifest(manifest_path))
+
+    def manifest_from_body(self, body: bytes) -> Tuple[Hashable, CachedManifest]:
+        key = ("body", hashlib.sha256(body).hexdigest())
+        return key, self._manifest(key, lambda: json.loads(body))
+
+    def convert(
+        self,
+        manifest_key: Hashable,
+        manifest: CachedManifest,
+        engine: str = "cli",
+        tag: Optional[str] = None,
+        select: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        project_dir: Optional[str] = None,
+    ) -> Dict[str, str]:
+        """The ``{relative path: contents}`` lookml bundle of a cached manifest."""
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine}, use one of: {', '.join(ENGINES)}")
+        if engine == "core" and (select or exclude):
+            raise ValueError("select and exclude only work with the cli engine")
+        project_dir = project_dir or self.project_dir
+        project_dir = os.path.abspath(project_dir)
+        project_signature = watch.file_signature(os.path.join(project_dir, "dbt_project.yml"))
+        result_key = (
+            manifest_key, engine, tag, tuple(select or ()), tuple(exclude or ()), project_dir, project_signature
+        )
+        files = self.results.get(result_key)
+        if files is not None:
+            return files
+        with self._convert_lock, _conversion_errors():
+            if engine == "cli":
+                parsed_nodes = manifest.parsed_nodes.setdefault(engine, parser.ParsedNodeCache())
+                files = cli.run_convert(
+                    project_dir=project_dir, tag=tag, select=select, exclude=exclude,
+                    in_memory=True, parsed_nodes=parsed_nodes, raw_manifest=manifest.raw_manifest,
+                    log_level=logging.getLevelName(logging.getLogger().getEffectiveLevel()),
+                )
+            else:
+                parsed_nodes = manifest.parsed_nodes.setdefault(
+                    engine, parser.ParsedNodeCache(core_parser.parse_manifest, sections=("nodes",))
+                )
+                files = core_converter.convert(
+                    project_dir=project_dir, tag=tag, in_memory=True,
+                    parsed_nodes=parsed_nodes, raw_manifest=manifest.raw_manifest,
+                    log_level=logging.getLevelName(logging.getLogger().getEffectiveLevel()),
+                )
+        self.results.put(result_key, files)
+        return files
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {"manifests": self.manifests.stats(), "results": self.results.stats()}
+
+
+class ConversionRequestHandler(http.server.BaseHTTPRequestHandler):
+    server_version = "dbt2looker"
+    # Set by make_server
+    service: ConversionService
+
+    def address_string(self) -> str:
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args) -> None:
+        logging.debug(f"{self.address_string()} {format % args}")
+
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if urlsplit(self.path).path != "/health":
+            self._send_json(404, {"errors": [f"Unknown path {self.path}"]})
+            return
+        self._send_json(200, {"status": "ok", "cache": self.service.stats()})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != "/convert":
+            self._send_json(404, {"errors": [f"Unknown path {url.path}"]})
+            return
+        params = parse_qs(url.query)
+
+        def param(name: str) -> Optional[str]:
+            return params[name][-1] if name in params else None
+
+        try:
+            manifest_path = param("manifest_path")
+            if manifest_path:
+                key, manifest = self.service.manifest_from_path(manifest_path)
+            else:
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if not body:
+                    self._send_json(400, {"errors": ["Send the manifest as the body or a manifest_path parameter"]})
+                    return
+                key, manifest = self.service.manifest_from_body(body)
+            files = self.service.convert(
+                key,
+                manifest,
+                engine=param("engine") or "cli",
+                tag=param("tag"),
+                select=params.get("select"),
+                exclude=params.get("exclude"),
+                project_dir=param("project_dir"),
+            )
+        except ValueError as e:
+            self._send_json(400, {"errors": [str(e)]})
+            return
+        except ConversionError as e:
+            self._send_json(422, {"errors": e.errors})
+            return
+        self._send_json(200, {"files": files})
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(
+    service: ConversionService,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: Optional[str] = None,
+) -> socketserver.BaseServer:
+    """An HTTP server for ``service`` on ``host:port``, or on the Unix socket
+    ``socket_path`` when given. Call ``serve_forever`` on it."""
+    handler = type("Handler", (ConversionRequestHandler,), {"service": service})
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        return ThreadingUnixHTTPServer(socket_path, handler)
+    return http.server.ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    argparser = argparse.ArgumentParser(description="Serve dbt manifest to lookml conversions over HTTP")
+    argparser.add_argument("--host", default=DEFAULT_HOST, help=f"Default is {DEFAULT_HOST}")
+    argparser.add_argument("--port", default=DEFAULT_PORT, type=int, help=f"Default is {DEFAULT_PORT}")
+    argparser.add_argument("--socket", help="Listen on this Unix socket instead of --host and --port")
+    argparser.add_argument(
+        "--project-dir",
+        default="./",
+        help='Default path to the dbt project directory containing dbt_project.yml. Default is "."',
+    )
+    argparser.add_argument(
+        "--max-manifests", default=DEFAULT_MAX_MANIFESTS, type=int,
+        help=f"Number of validated manifests kept in memory. Default is {DEFAULT_MAX_MANIFESTS}",
+    )
+    argparser.add_argument(
+        "--max-results", default=DEFAULT_MAX_RESULTS, type=int,
+        help=f"Number of generated lookml bundles kept in memory. Default is {DEFAULT_MAX_RESULTS}",
+    )
+    argparser.add_argument(
+        "--log-level", choices=["DEBUG", "INFO", "WARN", "ERROR"], default="INFO",
+        help="Set level of logs. Default is INFO",
+    )
+    args = argparser.parse_args()
+    cli.configure_logging(args.log_level)
+    service = ConversionService(args.project_dir, args.max_manifests, args.max_results)
+    server = make_server(service, args.host, args.port, args.socket)
+    logging.info(f"Serving lookml conversions on {args.socket or f'http://{args.host}:{args.port}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("Stopped serving")
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
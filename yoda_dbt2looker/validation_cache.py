@@ -0,0 +1,180 @@
+"""On disk record of the manifests that passed validation.
+
+Pipelines convert the same manifest.json several times, for different tags
+or output directories. A manifest is only validated once per schema: the
+cache keeps an empty ``.validated`` marker file per successful validation,
+named after the sha256 of the manifest bytes and of the schema file. The
+least recently used markers are removed beyond ``max_entries``, other files
+in the cache directory are left alone.
+"""
+import hashlib
+import importlib.resources
+import json
+import logging
+import os
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+from . import loader
+from . import parallel
+from . import parser
+from . import profiling
+from . import watch
+
+CACHE_VERSION = 1
+DEFAULT_MAX_ENTRIES = 32
+MARKER_SUFFIX = ".validated"
+_CHUNK_SIZE = 1024 * 1024
+
+
+def default_cache_dir() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "dbt2looker", "validation")
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def schema_digest(schema_name: str) -> str:
+    with importlib.resources.open_binary("yoda_dbt2looker.dbt_json_schemas", schema_name) as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class ValidationCache:
+    """Markers of validated manifests in ``cache_dir``, created on first use."""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_entries = max(1, max_entries)
+
+    def key(self, manifest_path: str, schema_name: str, streaming: bool = False) -> str:
+        # The streaming reader drops the sections dbt2looker does not read, a
+        # streamed manifest that passed validation may fail it when read whole
+        parts = [CACHE_VERSION, file_digest(manifest_path), schema_name, schema_digest(schema_name), streaming]
+        return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + MARKER_SUFFIX)
+
+    def contains(self, key: str) -> bool:
+        try:
+            # Touched on every hit, eviction goes by modification time
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def record(self, key: str) -> None:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._path(key), "w"):
+                pass
+            self.evict()
+        except OSError as e:
+            logging.warning(f"Could not record the manifest validation in {self.cache_dir}: {e}")
+
+    def evict(self) -> List[str]:
+        """Remove the least recently used markers beyond ``max_entries``.
+
+        Returns the keys of the removed markers.
+        """
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(MARKER_SUFFIX) and entry.is_file():
+                    entries.append((entry.stat().st_mtime_ns, entry.name[:-len(MARKER_SUFFIX)]))
+        entries.sort(reverse=True)
+        removed = []
+        for _, key in entries[self.max_entries:]:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                continue
+            removed.append(key)
+        return removed
+
+
+def validate_manifest(
+    raw_manifest: dict,
+    schema_name: str,
+    jobs: int = 1,
+    cache: Optional[ValidationCache] = None,
+    manifest_path: Optional[str] = None,
+    signature: watch.Signature = None,
+    streaming: bool = False,
+) -> bool:
+    """``parser.validate_manifest`` unless ``cache`` recorded a successful
+    validation of the same manifest file and schema. Returns whether the
+    validation was skipped.
+
+    ``signature`` is the ``watch.file_signature`` of ``manifest_path`` taken
+    before ``raw_manifest`` was read from it. The cache is not used when the
+    file changed since, its bytes may not be the ones that were decoded.
+    ``streaming`` tells whether ``raw_manifest`` was read with the streaming
+    reader, validations of streamed and whole manifests are kept apart.
+    """
+    key = None
+    if cache is not None and manifest_path and signature is not None:
+        try:
+            key = cache.key(manifest_path, schema_name, streaming)
+        except OSError:
+            key = None
+        if key is not None and watch.file_signature(manifest_path) != signature:
+            key = None
+    if key is not None and cache.contains(key):
+        logging.debug(f"Skipping validation of {manifest_path}, it passed validation against {schema_name} before")
+        return True
+    parser.validate_manifest(raw_manifest, schema_name, jobs)
+    if key is not None:
+        cache.record(key)
+    return False
+
+
+def load_validated_manifest(
+    manifest_path: str,
+    load: Callable[[str, bool, str, bool], Dict[str, Any]],
+    streaming: bool = False,
+    profiler=profiling.NULL_PROFILER,
+    json_decoder: Optional[str] = None,
+    use_mmap: bool = False,
+    full_validation: bool = False,
+    jobs: int = 1,
+    validation_cache_dir: Optional[str] = None,
+    validation_cache_size: int = DEFAULT_MAX_ENTRIES,
+) -> Dict[str, Any]:
+    """Read and validate manifest.json in the ``load`` and ``validate`` stages
+    of ``profiler``.
+
+    ``load(manifest_path, streaming, decoder_name, use_mmap)`` reads the file
+    and reports a missing one the way its caller does.
+    """
+    cache = ValidationCache(validation_cache_dir, validation_cache_size) if validation_cache_dir else None
+    with profiler.stage("load") as stage:
+        try:
+            decoder_name, _ = loader.get_decoder(json_decoder)
+        except ValueError as e:
+            logging.error(str(e))
+            raise SystemExit("Failed")
+        # The streaming reader always decodes with json
+        decoder_label = "json (streaming)" if streaming else decoder_name + (" (mmap)" if use_mmap else "")
+        stage.note(json_decoder=decoder_label)
+        signature = watch.file_signature(manifest_path) if cache else None
+        raw_manifest = load(manifest_path, streaming, decoder_name, use_mmap)
+        if profiler.enabled:
+            # Not validated yet, a manifest missing a section fails validation below
+            stage.count(
+                nodes=len(raw_manifest.get("nodes") or {}),
+                exposures=len(raw_manifest.get("exposures") or {}),
+            )
+    with profiler.stage("validate") as stage:
+        schema_name = parser.manifest_schema(full_validation)
+        skipped = validate_manifest(raw_manifest, schema_name, jobs, cache, manifest_path, signature, streaming)
+        stage.note(schema=schema_name, jobs=parallel.resolve_jobs(jobs), cached=skipped)
+    logging.debug(f"Detected valid manifest at {manifest_path}, decoded with {decoder_label}")
+    return raw_manifest
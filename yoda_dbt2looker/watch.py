@@ -0,0 +1,61 @@
+import logging
+import os
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+DEFAULT_POLL_INTERVAL = 1.0
+
+Signature = Optional[Tuple[int, int]]
+
+
+def file_signature(path: str) -> Signature:
+    """Modification time and size of a file, ``None`` when it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _signatures(paths: Iterable[str]) -> Dict[str, Signature]:
+    return {path: file_signature(path) for path in paths}
+
+
+def watch_files(
+    paths: Iterable[str],
+    on_change: Callable[[], None],
+    interval: float = DEFAULT_POLL_INTERVAL,
+    max_runs: Optional[int] = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> int:
+    """Call ``on_change`` once, then again whenever one of ``paths`` changes.
+
+    Files are polled every ``interval`` seconds, which works the same on every
+    platform and file system. A change is only acted on once the files stayed
+    the same for a whole interval, so a manifest dbt is still writing is not
+    read half way. Returns the number of runs once ``max_runs`` is reached,
+    otherwise polls until interrupted.
+    """
+    paths = list(paths)
+    signatures = _signatures(paths)
+    on_change()
+    runs = 1
+    while max_runs is None or runs < max_runs:
+        sleep(interval)
+        current = _signatures(paths)
+        if current == signatures:
+            continue
+        while True:
+            sleep(interval)
+            settled = _signatures(paths)
+            if settled == current:
+                break
+            current = settled
+        if current == signatures:
+            continue
+        changed = [path for path in paths if current[path] != signatures[path]]
+        signatures = current
+        logging.info(f'Detected changes in {", ".join(changed)}')
+        on_change()
+        runs += 1
+    return runs
@@ -0,0 +1,158 @@
+import io
+import logging
+import os
+import tarfile
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_WRITE_THREADS = 8
+
+TAR_MODES = {
+    ".tar": "w",
+    ".tar.gz": "w:gz",
+    ".tgz": "w:gz",
+    ".tar.bz2": "w:bz2",
+    ".tar.xz": "w:xz",
+}
+
+
+def _default_file_mode() -> int:
+    # Temporary files are created 0600, give the final file the mode a plain
+    # open(path, 'w') would have
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+_FILE_MODE = _default_file_mode()
+
+
+@dataclass
+class WriteReport:
+    written: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+
+
+def _has_contents(file_path: str, contents: str) -> bool:
+    try:
+        if os.path.getsize(file_path) < len(contents):
+            return False
+        with open(file_path, "r") as f:
+            return f.read() == contents
+    except (FileNotFoundError, IsADirectoryError):
+        return False
+
+
+def write_file_atomic(file_path: str, contents: str) -> bool:
+    """Write ``contents`` to ``file_path`` through a temporary file and a rename.
+
+    Readers see either the previous file or the complete new one. Returns
+    ``False`` without touching the file when it already holds ``contents``.
+    """
+    if _has_contents(file_path, contents):
+        return False
+    directory, filename = os.path.split(file_path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory or ".", prefix=f".{filename}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(contents)
+        os.chmod(tmp_path, _FILE_MODE)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return True
+
+
+def write_files(
+    files: Iterable[Tuple[str, str]], threads: Optional[int] = DEFAULT_WRITE_THREADS
+) -> WriteReport:
+    """Write ``(file_path, contents)`` pairs atomically over a thread pool."""
+    files = list(files)
+    report = WriteReport()
+    if not files:
+        return report
+    threads = max(1, min(threads or DEFAULT_WRITE_THREADS, len(files)))
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = executor.map(lambda file: write_file_atomic(*file), files)
+        for (file_path, _), written in zip(files, results):
+            (report.written if written else report.unchanged).append(file_path)
+    logging.debug(
+        f"Wrote {len(report.written)} files, {len(report.unchanged)} were already up to date"
+    )
+    return report
+
+
+def archive_format(archive_path: str) -> str:
+    """``zip`` or the ``tarfile`` write mode matching the archive extension."""
+    if archive_path.endswith(".zip"):
+        return "zip"
+    for extension, mode in TAR_MODES.items():
+        if archive_path.endswith(extension):
+            return mode
+    raise ValueError(
+        f"Unsupported archive {archive_path}, use one of: .zip, {', '.join(TAR_MODES)}"
+    )
+
+
+def _write_zip(f, files: Dict[str, str]) -> None:
+    date_time = time.localtime()[:6]
+    with zipfile.ZipFile(f, "w", zipfile.ZIP_DEFLATED) as archive:
+        for path, contents in files.items():
+            info = zipfile.ZipInfo(path, date_time=date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = (0o100000 | _FILE_MODE) << 16
+            archive.writestr(info, contents)
+
+
+def _write_tar(f, files: Dict[str, str], mode: str) -> None:
+    mtime = int(time.time())
+    with tarfile.open(fileobj=f, mode=mode) as archive:
+        for path, contents in files.items():
+            data = contents.encode()
+            info = tarfile.TarInfo(path)
+            info.size = len(data)
+            info.mtime = mtime
+            info.mode = _FILE_MODE
+            archive.addfile(info, io.BytesIO(data))
+
+
+def write_archive(files: Dict[str, str], archive_path: str) -> None:
+    """Write ``{relative path: contents}`` into a zip or tar archive.
+
+    The archive is built in a temporary file next to ``archive_path`` and
+    renamed into place once complete.
+    """
+    archive_mode = archive_format(archive_path)
+    directory, filename = os.path.split(os.path.abspath(archive_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{filename}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if archive_mode == "zip":
+                _write_zip(f, files)
+            else:
+                _write_tar(f, files, archive_mode)
+        os.chmod(tmp_path, _FILE_MODE)
+        os.replace(tmp_path, archive_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    logging.debug(f"Wrote {len(files)} files to {archive_path}")
+
+
+def write_to_directory(files: Dict[str, str], output_dir: str, threads: Optional[int] = DEFAULT_WRITE_THREADS) -> WriteReport:
+    """Write ``{relative path: contents}`` below ``output_dir``."""
+    directories = {os.path.dirname(path) for path in files}
+    for directory in directories:
+        os.makedirs(os.path.join(output_dir, directory), exist_ok=True)
+    return write_files(
+        ((os.path.join(output_dir, path), contents) for path, contents in files.items()),
+        threads=threads,
+    )